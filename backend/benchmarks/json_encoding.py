@@ -0,0 +1,79 @@
+"""Encode time of a 1000-ticket admin list: jsonable_encoder + json vs orjson
+
+Run from backend/: python benchmarks/json_encoding.py
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import sys
+import timeit
+import uuid
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fast_json import dumps  # noqa: E402
+
+TICKETS = 1000
+REPEAT = 5
+
+
+def make_tickets():
+    # Deterministic, so both encoders can be checked against each other
+    now = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    tickets = []
+    for i in range(TICKETS):
+        created = now - timedelta(hours=i)
+        tickets.append({
+            "_id": ObjectId(f"{i:024x}"),
+            "id": str(uuid.UUID(int=i)),
+            "ticket_number": f"TKT-{i:06d}",
+            "customer_name": "Jane Customer",
+            "customer_email": "jane@example.com",
+            "customer_phone": "+1 555 0100",
+            "category": "Technical",
+            "subject": "Website is loading slowly on mobile",
+            "description": "Pages take several seconds to render on 4G. " * 5,
+            "status": "open",
+            "priority": "medium",
+            "created_at": created,
+            "updated_at": created + timedelta(minutes=30),
+            "replies": [
+                {
+                    "author": "admin" if r % 2 else "Jane Customer",
+                    "message": "Thanks, we are looking into it. " * 3,
+                    "created_at": created + timedelta(minutes=10 * r),
+                    "is_admin": bool(r % 2)
+                }
+                for r in range(4)
+            ]
+        })
+    return tickets
+
+
+def before(tickets):
+    # What get_all_tickets did: stringify _id, then FastAPI's jsonable_encoder + JSONResponse.render
+    for ticket in tickets:
+        ticket["_id"] = str(ticket["_id"])
+    content = jsonable_encoder({"success": True, "count": len(tickets), "tickets": tickets})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def after(tickets):
+    return dumps({"success": True, "count": len(tickets), "tickets": tickets})
+
+
+def main():
+    assert json.loads(before(make_tickets())) == json.loads(after(make_tickets()))
+
+    for name, encode in (("jsonable_encoder + json", before), ("orjson (FastJSONResponse)", after)):
+        # Fresh documents each run, since the old path mutates them
+        best = min(timeit.repeat(lambda: encode(make_tickets()), number=1, repeat=REPEAT))
+        build = min(timeit.repeat(make_tickets, number=1, repeat=REPEAT))
+        print(f"{name:28s} {(best - build) * 1000:8.2f} ms per {TICKETS} tickets")
+
+
+if __name__ == "__main__":
+    main()
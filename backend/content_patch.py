@@ -0,0 +1,195 @@
+from copy import deepcopy
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Union, get_args, get_origin
+import types
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+class PatchError(Exception):
+    """An operation that does not fit the document or its model"""
+
+
+def parse_path(path: str) -> List[str]:
+    """Split a JSON Pointer ("/services/2/title") or dotted path ("services.2.title")"""
+    if path.startswith("/"):
+        segments = [s.replace("~1", "/").replace("~0", "~") for s in path[1:].split("/")]
+    else:
+        segments = path.split(".")
+    # Segments become Mongo field paths, so they must not smuggle in dots or operators
+    if any(not s or "." in s or s.startswith("$") for s in segments):
+        raise PatchError(f"Invalid path: {path}")
+    return segments
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_optional(annotation) -> bool:
+    return get_origin(annotation) in (Union, types.UnionType) and type(None) in get_args(annotation)
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def resolve_annotation(model: type, segments: List[str]) -> Any:
+    """Type expected at a path, walking model fields, list items and dict values"""
+    annotation = model
+    for segment in segments:
+        annotation = _unwrap_optional(annotation)
+        origin = get_origin(annotation)
+        if _is_model(annotation):
+            field = annotation.model_fields.get(segment)
+            if field is None:
+                raise PatchError(f"Unknown field: {segment}")
+            annotation = field.annotation
+        elif annotation is list or origin is list:
+            if segment != "-" and not segment.isdigit():
+                raise PatchError(f"Invalid list index: {segment}")
+            args = get_args(annotation)
+            annotation = args[0] if args else Any
+        elif annotation is dict or origin is dict:
+            args = get_args(annotation)
+            annotation = args[1] if args else Any
+        elif annotation is not Any:
+            raise PatchError(f"Cannot descend into {segment}")
+    return annotation
+
+
+@lru_cache(maxsize=128)
+def _adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _validate(annotation, value):
+    adapter = _adapter(annotation)
+    try:
+        return adapter.dump_python(adapter.validate_python(value))
+    except ValidationError as e:
+        raise PatchError(f"Invalid value: {e.errors()[0]['msg']}")
+
+
+def _index(container: list, segment: str, allow_end: bool = False) -> int:
+    limit = len(container) + 1 if allow_end else len(container)
+    if not segment.isdigit() or int(segment) >= limit:
+        raise PatchError(f"List index out of range: {segment}")
+    return int(segment)
+
+
+def _parent(document: dict, segments: List[str]):
+    target = document
+    for segment in segments[:-1]:
+        if isinstance(target, list):
+            target = target[_index(target, segment)]
+        elif isinstance(target, dict) and target.get(segment) is not None:
+            target = target[segment]
+        else:
+            raise PatchError(f"Path not found: {'.'.join(segments)}")
+    if not isinstance(target, (list, dict)):
+        raise PatchError(f"Path not found: {'.'.join(segments)}")
+    return target
+
+
+def _lookup(document: dict, segments: List[str]) -> Tuple[bool, Any]:
+    target = document
+    for segment in segments:
+        if isinstance(target, list) and segment.isdigit() and int(segment) < len(target):
+            target = target[int(segment)]
+        elif isinstance(target, dict) and segment in target:
+            target = target[segment]
+        else:
+            return False, None
+    return True, target
+
+
+def _overlaps(a: List[str], b: List[str]) -> bool:
+    size = min(len(a), len(b))
+    return a[:size] == b[:size]
+
+
+def build_update(
+    document: dict,
+    operations: Iterable,
+    model: type,
+    editable: Iterable[str]
+) -> Tuple[Dict[str, dict], dict]:
+    """Turn add/replace/remove operations into a minimal Mongo update, plus the patched document"""
+    working = deepcopy(document)
+    editable = set(editable)
+    # (operator, path segments, argument); $set values are read from the patched document at the end
+    changes: List[Tuple[str, List[str], Any]] = []
+
+    for operation in operations:
+        segments = parse_path(operation.path)
+        if segments[0] not in editable:
+            raise PatchError(f"Field cannot be patched: {segments[0]}")
+        annotation = resolve_annotation(model, segments)
+        parent = _parent(working, segments)
+        key = segments[-1]
+
+        if operation.op == "remove":
+            if isinstance(parent, list):
+                removed = parent.pop(_index(parent, key))
+                # $pull matches by value, so duplicates force a rewrite of the list
+                if removed in parent:
+                    changes.append(("$set", segments[:-1], None))
+                else:
+                    changes.append(("$pull", segments[:-1], removed))
+            else:
+                if key not in parent:
+                    raise PatchError(f"Path not found: {operation.path}")
+                owner = _unwrap_optional(resolve_annotation(model, segments[:-1]))
+                if _is_model(owner) and not _is_optional(owner.model_fields[key].annotation):
+                    raise PatchError(f"Field cannot be removed: {key}")
+                del parent[key]
+                changes.append(("$unset", segments, ""))
+            continue
+
+        value = _validate(annotation, operation.value)
+        if isinstance(parent, list):
+            if operation.op == "add":
+                index = len(parent) if key == "-" else _index(parent, key, allow_end=True)
+                parent.insert(index, value)
+                changes.append(("$push", segments[:-1], {"$each": [value], "$position": index}))
+            else:
+                parent[_index(parent, key)] = value
+                changes.append(("$set", segments, None))
+        else:
+            if operation.op == "replace" and key not in parent:
+                raise PatchError(f"Path not found: {operation.path}")
+            parent[key] = value
+            changes.append(("$set", segments, None))
+
+    # Mongo rejects two operators on overlapping paths; fold those into one $set of the ancestor
+    merged: List[Tuple[str, List[str], Any]] = []
+    for operator, segments, argument in changes:
+        i = 0
+        while i < len(merged):
+            other = merged.pop(i) if _overlaps(merged[i][1], segments) else None
+            if other is None:
+                i += 1
+                continue
+            operator, argument = "$set", None
+            segments = min(other[1], segments, key=len)
+            i = 0
+        merged.append((operator, segments, argument))
+
+    update: Dict[str, dict] = {}
+    for operator, segments, argument in merged:
+        path = ".".join(segments)
+        if operator == "$set":
+            found, value = _lookup(working, segments)
+            if found:
+                update.setdefault("$set", {})[path] = value
+            else:
+                update.setdefault("$unset", {})[path] = ""
+        else:
+            update.setdefault(operator, {})[path] = argument
+
+    return update, working
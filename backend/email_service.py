@@ -3,6 +3,10 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List
 import logging
+import time
+
+from metrics import EMAIL_FAILURES, EMAIL_LATENCY
+from server_timing import timed
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,7 @@ class EmailService:
             logger.warning("Email credentials not configured")
             return False
 
+        started = time.perf_counter()
         try:
             msg = MIMEMultipart('alternative')
             msg['From'] = f"{self.from_name} <{self.from_email}>"
@@ -38,15 +43,18 @@ class EmailService:
             msg.attach(MIMEText(html_body, 'html'))
 
             # Connect and send
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
+            with timed("smtp"), smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
                 server.starttls()
                 server.login(self.smtp_user, self.smtp_password)
                 server.send_message(msg)
 
-            logger.info(f"Email sent successfully to {to_emails}")
+            EMAIL_LATENCY.observe(("sent",), time.perf_counter() - started)
+            logger.info("Email sent successfully to %s", to_emails)
             return True
 
         except Exception as e:
+            EMAIL_LATENCY.observe(("failed",), time.perf_counter() - started)
+            EMAIL_FAILURES.inc()
             logger.error(f"Failed to send email: {str(e)}")
             return False
 
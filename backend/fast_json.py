@@ -0,0 +1,50 @@
+from typing import Any, Type
+
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from server_timing import timed
+
+# Integer dict keys are accepted by jsonable_encoder, keep accepting them
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not know natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to compact JSON; datetimes, ObjectIds and models need no pre-encoding"""
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; return it directly to skip jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return dumps(content)
+
+
+class ModelJSONResponse(JSONResponse):
+    """JSON response validated against a response model, then serialized by pydantic-core
+
+    FastAPI skips response_model for Response objects, so typed routes return this to keep the contract
+    enforced: unknown fields (e.g. secrets) are dropped and a payload that does not fit raises.
+    """
+
+    def __init__(self, model: Type[BaseModel], content: Any, **kwargs):
+        self.model = model
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return self.model.model_validate(content).model_dump_json().encode()
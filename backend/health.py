@@ -0,0 +1,125 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from fastapi import APIRouter
+
+from fast_json import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+# A check returns whether it passed and details worth showing (latencies, ratios)
+Check = Callable[[], Awaitable[Tuple[bool, dict]]]
+
+# Set when the worker is told to stop (run.py's signal handler), before uvicorn stops accepting and drains
+_draining = False
+
+
+def set_draining(draining: bool = True):
+    """Fail readiness from now on, so the load balancer stops routing here while in-flight requests finish"""
+    global _draining
+    _draining = draining
+
+
+def is_draining() -> bool:
+    return _draining
+
+
+class HealthChecker:
+    """Runs readiness checks concurrently and reuses the result for `ttl` seconds"""
+
+    def __init__(self, checks: Dict[str, Check], ttl: float = 2.0, timeout: float = 1.0):
+        self.checks = checks
+        self.ttl = ttl
+        self.timeout = timeout
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._running: Optional[asyncio.Future] = None
+
+    async def _run_check(self, name: str) -> dict:
+        started = time.perf_counter()
+        try:
+            ok, details = await asyncio.wait_for(self.checks[name](), self.timeout)
+        except asyncio.TimeoutError:
+            ok, details = False, {"error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            ok, details = False, {"error": str(e)}
+        return {"ok": ok, "took_ms": round((time.perf_counter() - started) * 1000, 2), **details}
+
+    async def _evaluate(self) -> dict:
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(name) for name in names))
+        checks = dict(zip(names, results))
+        failing = [name for name, result in checks.items() if not result["ok"]]
+        if failing:
+            logger.warning("Readiness failing: %s", ", ".join(failing))
+        return {"ready": not failing, "checks": checks}
+
+    async def result(self) -> dict:
+        """Fresh enough result; concurrent probes share a single evaluation"""
+        if _draining:
+            return {"ready": False, "draining": True, "checks": {}}
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._result
+        if self._running is None:
+            self._running = asyncio.ensure_future(self._evaluate())
+        running = self._running
+        try:
+            result = await asyncio.shield(running)
+        finally:
+            if self._running is running and running.done():
+                self._running = None
+        self._result, self._checked_at = result, time.monotonic()
+        return result
+
+    def reset(self):
+        """Forget the cached result, e.g. when shutdown starts"""
+        self._result = None
+
+
+class Warmup:
+    """Runs a warm-up until it succeeds, retrying on errors; readiness waits for it"""
+
+    def __init__(self, warm: Callable[[], Awaitable[int]], retry_seconds: float = 2.0):
+        self.warm = warm
+        self.retry_seconds = retry_seconds
+        self.warmed = False
+
+    async def run(self):
+        """Start as a task; `warm` returns how many pages it loaded"""
+        self.warmed = False
+        while True:
+            try:
+                started = time.perf_counter()
+                pages = await self.warm()
+                self.warmed = True
+                logger.info("Caches warmed (%d pages) in %.0fms", pages, (time.perf_counter() - started) * 1000)
+                return
+            except Exception as e:
+                logger.error(f"Cache warm-up failed: {str(e)}")
+                await asyncio.sleep(self.retry_seconds)
+
+
+def probe_router(checker: HealthChecker) -> APIRouter:
+    """/healthz and /readyz, outside /api like /metrics"""
+    router = APIRouter(include_in_schema=False)
+
+    @router.get("/healthz")
+    async def liveness():
+        """Liveness: the process is up and its event loop answers"""
+        return {"status": "ok"}
+
+    @router.get("/readyz")
+    async def readiness():
+        """Readiness: every check passes and the worker is not draining"""
+        result = await checker.result()
+        if result.get("draining"):
+            status = "draining"
+        else:
+            status = "ready" if result["ready"] else "not_ready"
+        return FastJSONResponse(
+            {"status": status, "checks": result["checks"]}, status_code=200 if result["ready"] else 503
+        )
+
+    return router
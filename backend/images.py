@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import multiprocessing
+import os
+
+from PIL import Image, ImageOps, features
+
+# Header and footer show the logo at 48px tall; render 1x, 2x and 4x
+LOGO_HEIGHTS = (48, 96, 192)
+FAVICON_ICO_SIZES = (16, 32, 48)
+FAVICON_PNG_SIZES = (16, 32, 180, 192, 512)
+
+# Formats that can be swapped in for a JPEG/PNG through Accept negotiation
+MODERN_FORMATS = {"avif": "image/avif", "webp": "image/webp"}
+
+SAVE_OPTIONS = {
+    "avif": {"quality": 60},
+    "webp": {"quality": 80, "method": 4},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+}
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg", "png": "png"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _modern_formats() -> List[str]:
+    return [fmt for fmt in MODERN_FORMATS if features.check(fmt)]
+
+
+def _save(image: Image.Image, path: Path, fmt: str, **options):
+    """Write through a temp file so a derivative is never served half-written"""
+    if fmt == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    tmp_path = path.with_name(f".{path.name}.part")
+    image.save(tmp_path, format=fmt.upper(), **SAVE_OPTIONS.get(fmt, {}), **options)
+    os.replace(tmp_path, path)
+
+
+def build_logo_variants(source: str) -> List[Dict]:
+    """Write resized and modern-format copies of a logo; runs in a worker process"""
+    path = Path(source)
+    variants = []
+
+    with Image.open(path) as opened:
+        has_alpha = opened.mode in ("RGBA", "LA", "P")
+        image = opened.convert("RGBA" if has_alpha else "RGB")
+
+    fallback = "png" if has_alpha or path.suffix in (".png", ".gif", ".webp") else "jpeg"
+    formats = _modern_formats() + [fallback]
+
+    # Full-size siblings, picked up by the static route when the client accepts them
+    for fmt in _modern_formats():
+        sibling = path.with_suffix(f".{EXTENSIONS[fmt]}")
+        if sibling != path:
+            _save(image, sibling, fmt)
+
+    for height in LOGO_HEIGHTS:
+        if height >= image.height:
+            break
+        width = max(round(image.width * height / image.height), 1)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            name = f"{path.stem}_h{height}.{EXTENSIONS[fmt]}"
+            _save(resized, path.parent / name, fmt)
+            variants.append({"url": name, "format": fmt, "width": width, "height": height})
+
+    return variants
+
+
+def build_favicon_variants(source: str) -> List[Dict]:
+    """Write a multi-size ICO and a set of square PNG icons; runs in a worker process"""
+    path = Path(source)
+    variants = []
+
+    with Image.open(path) as opened:
+        image = opened.convert("RGBA")
+
+    def square(size: int) -> Image.Image:
+        canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        fitted = ImageOps.contain(image, (size, size), Image.LANCZOS)
+        canvas.paste(fitted, ((size - fitted.width) // 2, (size - fitted.height) // 2))
+        return canvas
+
+    ico_name = f"{path.stem}_multi.ico"
+    _save(
+        square(max(FAVICON_ICO_SIZES)), path.parent / ico_name, "ico",
+        sizes=[(s, s) for s in FAVICON_ICO_SIZES]
+    )
+    variants.append({
+        "url": ico_name,
+        "type": "image/x-icon",
+        "sizes": " ".join(f"{s}x{s}" for s in FAVICON_ICO_SIZES)
+    })
+
+    for size in FAVICON_PNG_SIZES:
+        name = f"{path.stem}_{size}.png"
+        _save(square(size), path.parent / name, "png")
+        variants.append({"url": name, "type": "image/png", "sizes": f"{size}x{size}"})
+
+    return variants
+
+
+BUILDERS = {
+    "logo": build_logo_variants,
+    "favicon": build_favicon_variants,
+}
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool for image work, created on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv("IMAGE_WORKERS", "2")),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def generate_variants(kind: str, source: Path) -> List[Dict]:
+    """Build derivatives for an uploaded logo or favicon off the event loop"""
+    if source.suffix == ".svg":
+        return []
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), BUILDERS[kind], str(source))
+
+
+def build_srcset(variants: List[Dict]) -> Dict[str, str]:
+    """Group logo variants into density srcset strings per format"""
+    srcset: Dict[str, List[str]] = {}
+    for variant in variants:
+        density = variant["height"] // LOGO_HEIGHTS[0]
+        srcset.setdefault(variant["format"], []).append(f"{variant['url']} {density}x")
+    return {fmt: ", ".join(entries) for fmt, entries in srcset.items()}
@@ -0,0 +1,170 @@
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import atexit
+import logging
+import queue
+import random
+import sys
+import time
+import traceback
+import uuid
+
+import orjson
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import route_label
+
+# Fields of the request being handled: request_id, method, path, route, admin, sampled
+request_context: ContextVar[Optional[dict]] = ContextVar("request_context", default=None)
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def set_admin(username: str):
+    """Record the authenticated admin on the current request's log lines"""
+    context = request_context.get()
+    if context is not None:
+        context["admin"] = username
+
+
+class ContextFilter(logging.Filter):
+    """Copies the request context onto records and drops unsampled info lines"""
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if record.levelno <= logging.INFO and self.sample_rate < 1.0:
+            # Requests are sampled as a whole, so a kept request keeps all its lines
+            sampled = context["sampled"] if context else random.random() < self.sample_rate
+            if not sampled and not getattr(record, "always", False):
+                return False
+        if context:
+            for key, value in context.items():
+                if key != "sampled" and not hasattr(record, key):
+                    setattr(record, key, value)
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and key != "always":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = "".join(traceback.format_exception(*record.exc_info))
+        return orjson.dumps(entry, default=str).decode()
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues records unformatted, so the listener thread renders messages and tracebacks"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare formats on the caller's thread (the event loop) and drops exc_info;
+        # the queue is in-process, so the record can travel as is
+        return record
+
+
+def _stop_listener(listener: QueueListener):
+    if listener._thread is not None:
+        listener.stop()
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json", sample_rate: float = 1.0) -> QueueListener:
+    """Route all logging through a queue; a background thread formats and writes"""
+    output = logging.StreamHandler(sys.stderr)
+    if fmt == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(ContextFilter(sample_rate))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    # uvicorn's own handlers would write synchronously; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # RequestLogMiddleware already writes one access line per request
+    access_logger = logging.getLogger("uvicorn.access")
+    access_logger.handlers = [logging.NullHandler()]
+    access_logger.propagate = False
+
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    listener.start()
+    # Flush what is still queued when the process exits, unless the caller stopped it already
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+class RequestLogMiddleware:
+    """Assigns a request id and writes one access line per request"""
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.logger = logging.getLogger("access")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        context = {
+            "request_id": request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "sampled": self.sample_rate >= 1.0 or random.random() < self.sample_rate,
+        }
+        token = request_context.set(context)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            context["route"] = route_label(scope)
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    "%s %s %s", scope["method"], scope["path"], status,
+                    extra={
+                        "status": status,
+                        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+                        # Errors are always logged
+                        "always": status >= 500,
+                    }
+                )
+            request_context.reset(token)
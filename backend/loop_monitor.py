@@ -0,0 +1,65 @@
+from typing import Optional
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Delay of a scheduled event loop wakeup",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+LOOP_STALLS = REGISTRY.counter("event_loop_stalls_total", "Times the event loop was blocked past the threshold")
+
+
+class LoopWatchdog:
+    """Measures event loop lag and logs the stack of whatever blocks it"""
+
+    def __init__(self, threshold_ms: float = 100.0, interval: float = 0.05):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.lag = 0.0
+        self._last_beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def run(self):
+        """Heartbeat on the loop; start as a task"""
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lag = max(0.0, now - started - self.interval)
+            self._last_beat = now
+            LOOP_LAG.observe((), self.lag)
+
+    def _watch(self):
+        """Runs in its own thread, so it can look at the loop while the loop is stuck"""
+        reported_beat = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or beat == reported_beat:
+                continue
+            # One report per stall, taken while the offending code is still on the stack
+            reported_beat = beat
+            LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame else "unavailable"
+            logger.warning(f"Event loop blocked for {blocked * 1000:.0f}ms+, loop thread stack:\n{stack}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
@@ -0,0 +1,392 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+class Metric:
+    """A named metric with a fixed set of label names"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, Any] = {}
+        # Pool listeners report from driver threads
+        self._lock = threading.Lock()
+
+    def family(self) -> dict:
+        """Snapshot in the shape stored per worker and merged by merge_snapshots()"""
+        with self._lock:
+            samples = [[list(labels), self._copy(value)] for labels, value in self._values.items()]
+        return {
+            "name": self.name,
+            "type": self.kind,
+            "help": self.documentation,
+            "labels": list(self.labelnames),
+            "samples": samples
+        }
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1.0):
+        self.inc(labels, -amount)
+
+    def set(self, labels: Labels = (), value: float = 0.0):
+        with self._lock:
+            self._values[labels] = value
+
+    def values(self) -> Dict[Labels, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: Labels, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket (not cumulative) counts with a final +Inf slot, then sum and count
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def family(self) -> dict:
+        family = super().family()
+        family["buckets"] = list(self.buckets)
+        return family
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+
+class Registry:
+    """This worker's metrics, plus collectors that report values kept elsewhere"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], List[dict]]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], List[dict]]):
+        """Register a function returning metric families (see Metric.family) at snapshot time"""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> List[dict]:
+        families = [metric.family() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {str(e)}")
+        return families
+
+
+def counter_family(name: str, documentation: str, labelnames: Iterable[str], values: Dict[Labels, float]) -> dict:
+    """A counter family built from plain values, for collectors"""
+    return {
+        "name": name,
+        "type": "counter",
+        "help": documentation,
+        "labels": list(labelnames),
+        "samples": [[list(labels), value] for labels, value in values.items()]
+    }
+
+
+def label_snapshot(snapshot: List[dict], name: str, value: str) -> List[dict]:
+    """The same families with one more label on every sample"""
+    return [
+        {
+            **family,
+            "labels": list(family["labels"]) + [name],
+            "samples": [[list(labels) + [value], sample] for labels, sample in family["samples"]]
+        }
+        for family in snapshot
+    ]
+
+
+def merge_snapshots(snapshots: Iterable[List[dict]]) -> List[dict]:
+    """Sum the snapshots of several workers, sample by sample"""
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for family in snapshot:
+            target = merged.get(family["name"])
+            if target is None:
+                target = merged[family["name"]] = {**family, "samples": {}}
+            for labels, value in family["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif family["type"] == "histogram":
+                    target["samples"][key] = [
+                        [a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2]
+                    ]
+                else:
+                    target["samples"][key] = current + value
+    for family in merged.values():
+        family["samples"] = [[list(labels), value] for labels, value in family["samples"].items()]
+    return list(merged.values())
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render(families: Iterable[dict]) -> str:
+    """Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for family in sorted(families, key=lambda f: f["name"]):
+        name, names = family["name"], family["labels"]
+        lines.append(f"# HELP {name} {_escape(family['help'])}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for values, value in sorted(family["samples"], key=lambda s: s[0]):
+            if family["type"] == "histogram":
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(list(family["buckets"]) + [float("inf")], counts):
+                    cumulative += bucket_count
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f"{name}_bucket{_labels(names, values, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, values)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(names, values)} {count}")
+            else:
+                lines.append(f"{name}{_labels(names, values)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_IN_PROGRESS = REGISTRY.gauge("http_requests_in_progress", "HTTP requests being handled", ("method",))
+EMAIL_LATENCY = REGISTRY.histogram(
+    "email_send_duration_seconds", "SMTP send latency", ("result",), buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+EMAIL_FAILURES = REGISTRY.counter("email_send_failures_total", "Emails that failed to send")
+MONGO_POOL_CONNECTIONS = REGISTRY.gauge("mongo_pool_connections", "Open connections per server", ("address",))
+MONGO_POOL_CHECKED_OUT = REGISTRY.gauge(
+    "mongo_pool_checked_out_connections", "Connections in use per server", ("address",)
+)
+MONGO_POOL_CHECKOUT_FAILURES = REGISTRY.counter(
+    "mongo_pool_checkout_failures_total", "Failed connection checkouts", ("address", "reason")
+)
+
+
+def route_label(scope: Scope) -> str:
+    """Route template of a handled request, keeping label cardinality bounded"""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    if scope["path"].startswith("/static/"):
+        return "/static"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Counts requests and observes latency per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+        HTTP_IN_PROGRESS.inc((method,))
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec((method,))
+            route = route_label(scope)
+            HTTP_LATENCY.observe((method, route), time.perf_counter() - started)
+            HTTP_REQUESTS.inc((method, route, str(status)))
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Tracks Motor/pymongo connection pool usage"""
+
+    def _address(self, event) -> Labels:
+        host, port = event.address
+        return (f"{host}:{port}",)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        MONGO_POOL_CONNECTIONS.set(self._address(event), 0)
+        MONGO_POOL_CHECKED_OUT.set(self._address(event), 0)
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc(self._address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec(self._address(event))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CHECKOUT_FAILURES.inc(self._address(event) + (str(event.reason),))
+
+    def connection_checked_out(self, event):
+        MONGO_POOL_CHECKED_OUT.inc(self._address(event))
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.dec(self._address(event))
+
+
+class MetricsPublisher:
+    """Shares this worker's snapshot through Mongo so any worker can serve the series of all
+
+    Every series carries a `worker` label rather than being summed: a worker that restarts or is recycled
+    takes its series with it, which Prometheus treats as the series ending, not as a counter reset.
+    Aggregate in PromQL, e.g. `sum by (route) (rate(http_requests_total[5m]))`.
+    """
+
+    def __init__(self, collection, registry: Registry = REGISTRY, interval: float = 15.0, ttl: float = 120.0):
+        self.collection = collection
+        self.registry = registry
+        self.interval = interval
+        self.ttl = ttl
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def publish(self):
+        await self.collection.replace_one(
+            {"_id": self.worker_id},
+            {"updated_at": datetime.utcnow(), "metrics": self.registry.snapshot()},
+            upsert=True
+        )
+
+    def local(self) -> str:
+        """Exposition text of this worker alone (when Mongo is unavailable), labelled like collect()"""
+        return render(label_snapshot(self.registry.snapshot(), "worker", self.worker_id))
+
+    async def collect(self) -> str:
+        """Exposition text with the series of every worker that published recently"""
+        await self.publish()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        # Workers that died without withdrawing
+        await self.collection.delete_many({"updated_at": {"$lte": cutoff}})
+        snapshots = [
+            label_snapshot(doc["metrics"], "worker", doc["_id"])
+            async for doc in self.collection.find({"updated_at": {"$gt": cutoff}}, {"metrics": 1})
+        ]
+        return render(merge_snapshots(snapshots))
+
+    async def run(self):
+        """Background publish loop"""
+        while True:
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Metrics publish failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def withdraw(self):
+        """Remove this worker's snapshot on shutdown"""
+        await self.collection.delete_one({"_id": self.worker_id})
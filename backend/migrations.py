@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict
+import asyncio
+import logging
+import os
+import socket
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+Step = Callable[[], Awaitable[None]]
+
+
+class Lease:
+    """A named, expiring lock held through a Mongo document"""
+
+    def __init__(self, collection, name: str, ttl: float = 60.0):
+        self.collection = collection
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def acquire(self) -> bool:
+        now = datetime.utcnow()
+        try:
+            # Matches only a free, expired or already-ours lease; otherwise the upsert hits the _id
+            await self.collection.find_one_and_update(
+                {"_id": self.name, "$or": [{"expires_at": {"$lt": now}}, {"holder": self.holder}]},
+                {"$set": {"holder": self.holder, "expires_at": now + timedelta(seconds=self.ttl)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def release(self):
+        await self.collection.delete_one({"_id": self.name, "holder": self.holder})
+
+    async def keep_alive(self):
+        """Extend the lease every third of its ttl while the holder works; start as a task"""
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                if not await self.acquire():
+                    logger.warning(f"Lease {self.name} expired and was taken over")
+                    return
+            except Exception as e:
+                logger.warning(f"Lease {self.name} renewal failed: {str(e)}")
+
+
+async def current_version(collection) -> int:
+    marker = await collection.find_one({"_id": "schema"}, {"version": 1})
+    return marker.get("version", 0) if marker else 0
+
+
+async def run_migrations(
+    collection,
+    version: int,
+    steps: Dict[str, Step],
+    lease_ttl: float = 60.0,
+    first_boot_wait: float = 30.0
+) -> str:
+    """Run idempotent startup steps once per schema version; returns "current", "migrated", "running" or "failed"
+
+    Mongo errors reading the marker or taking the lease propagate; the caller decides when to retry.
+    """
+    installed = await current_version(collection)
+    if installed >= version:
+        return "current"
+
+    lease = Lease(collection, "lease:migrations", lease_ttl)
+    if not await lease.acquire():
+        if installed == 0:
+            # Empty database: wait for the migrating worker, so nothing serves without an admin or settings
+            deadline = asyncio.get_running_loop().time() + first_boot_wait
+            while await current_version(collection) == 0 and asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(0.5)
+        # Upgrades keep serving on the previous version while the lease holder migrates
+        return "running"
+
+    # Long index builds must not outlive the lease and let a second worker start the same steps
+    renewal = asyncio.create_task(lease.keep_alive())
+    try:
+        names = list(steps)
+        results = await asyncio.gather(*(steps[name]() for name in names), return_exceptions=True)
+        failed = [(name, result) for name, result in zip(names, results) if isinstance(result, Exception)]
+        for name, error in failed:
+            logger.error(f"Startup step {name} failed: {str(error)}")
+        if failed:
+            # The marker stays put, so the next worker boot retries
+            return "failed"
+
+        await collection.update_one(
+            {"_id": "schema"},
+            {"$set": {"version": version, "migrated_at": datetime.utcnow(), "migrated_by": lease.holder}},
+            upsert=True
+        )
+        logger.info("Schema migrated to version %d", version)
+        return "migrated"
+    finally:
+        renewal.cancel()
+        await lease.release()
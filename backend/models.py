@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Any, Literal, Optional, List
 from datetime import datetime
 import uuid
 
@@ -95,6 +95,11 @@ class SEOSettings(BaseModel):
     og_image: str = ""
     twitter_handle: str = ""
 
+class RecaptchaSettings(BaseModel):
+    enabled: bool = False
+    site_key: str = ""
+    secret_key: str = ""
+
 class SystemSettings(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     email_settings: EmailSettings = EmailSettings()
@@ -116,7 +121,7 @@ class SettingsUpdate(BaseModel):
     email_settings: Optional[EmailSettings] = None
     seo_settings: Optional[SEOSettings] = None
     branding: Optional[dict] = None
-    recaptcha_settings: Optional[dict] = None
+    recaptcha_settings: Optional[RecaptchaSettings] = None
 
 # Content Management Models
 class HeroContent(BaseModel):
@@ -187,9 +192,17 @@ class PageContent(BaseModel):
     industries: Optional[List[IndustryItem]] = None
     footer: Optional[FooterContent] = None
     cta_section: Optional[dict] = None
+    version: int = 1
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     updated_by: str = ""
 
+class PageSnapshot(BaseModel):
+    page: str
+    version: int
+    content: dict  # frozen copy of the draft at publish time
+    published_at: datetime = Field(default_factory=datetime.utcnow)
+    published_by: str = ""
+
 class ContentUpdate(BaseModel):
     page: str
     hero: Optional[HeroContent] = None
@@ -200,3 +213,87 @@ class ContentUpdate(BaseModel):
     industries: Optional[List[IndustryItem]] = None
     footer: Optional[FooterContent] = None
     cta_section: Optional[dict] = None
+    version: Optional[int] = None  # when set, the save fails if someone else saved first
+
+class ContentPatchOperation(BaseModel):
+    op: Literal["add", "replace", "remove"]
+    path: str  # JSON Pointer ("/services/2/title") or dotted ("services.2.title")
+    value: Any = None
+
+class ContentPatch(BaseModel):
+    page: str
+    version: int  # version the edits were made against
+    operations: List[ContentPatchOperation]
+
+# Response Models
+# Endpoints load these through projection(), so Mongo returns only their fields and never _id
+class TicketSummary(BaseModel):
+    id: str
+    ticket_number: str
+    customer_name: str
+    customer_email: str
+    category: str
+    subject: str
+    status: str
+    priority: str
+    created_at: datetime
+    updated_at: datetime
+    reply_count: int = 0
+
+class TicketListResponse(BaseModel):
+    success: bool
+    count: int
+    tickets: List[TicketSummary]
+
+class TicketResponse(BaseModel):
+    success: bool
+    ticket: SupportTicket
+
+class SubmissionListResponse(BaseModel):
+    success: bool
+    count: int
+    submissions: List[ContactSubmission]
+
+class PageSummary(BaseModel):
+    page: str
+    version: int = 1
+    published_version: Optional[int] = None
+    published_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    updated_by: str = ""
+
+class ContentListResponse(BaseModel):
+    success: bool
+    pages: List[PageSummary]
+
+class EmailSettingsView(BaseModel):
+    smtp_host: str = "smtp.gmail.com"
+    smtp_port: int = 587
+    smtp_user: str = ""
+    smtp_password_set: bool = False  # the password itself is never returned
+    from_email: str = ""
+    from_name: str = "IXA Digital"
+    notification_recipients: List[str] = []
+    enabled: bool = False
+
+class RecaptchaSettingsView(BaseModel):
+    enabled: bool = False
+    site_key: str = ""
+    secret_key_set: bool = False  # the secret itself is never returned
+
+class SettingsView(BaseModel):
+    email_settings: EmailSettingsView = EmailSettingsView()
+    seo_settings: SEOSettings = SEOSettings()
+    branding: dict = {}
+    recaptcha_settings: RecaptchaSettingsView = RecaptchaSettingsView()
+    updated_at: Optional[datetime] = None
+    updated_by: str = ""
+
+class SettingsResponse(BaseModel):
+    success: bool
+    settings: SettingsView
+
+def projection(model: type, **computed) -> dict:
+    """Mongo projection of exactly a model's fields, without _id; computed fields map to expressions"""
+    fields = {name: 1 for name in model.model_fields if name not in computed}
+    return {"_id": 0, **fields, **computed}
@@ -0,0 +1,110 @@
+from importlib.util import find_spec
+from typing import List, Literal, Optional, Union
+import logging
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+logger = logging.getLogger(__name__)
+
+# Wire compressors in order of preference, with the module each one needs
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+# Environment variable for each setting
+ENV = {
+    "url": "MONGO_URL",
+    "db_name": "DB_NAME",
+    "app_name": "MONGO_APP_NAME",
+    "min_pool_size": "MONGO_MIN_POOL_SIZE",
+    "max_pool_size": "MONGO_MAX_POOL_SIZE",
+    "max_idle_time_ms": "MONGO_MAX_IDLE_TIME_MS",
+    "compressors": "MONGO_COMPRESSORS",
+    "server_selection_timeout_ms": "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+    "connect_timeout_ms": "MONGO_CONNECT_TIMEOUT_MS",
+    "socket_timeout_ms": "MONGO_SOCKET_TIMEOUT_MS",
+    "timeout_ms": "MONGO_TIMEOUT_MS",
+    "read_concern": "MONGO_READ_CONCERN",
+    "write_concern": "MONGO_WRITE_CONCERN",
+}
+
+
+class MongoSettings(BaseModel):
+    """Motor client settings, validated before anything connects"""
+
+    url: str = Field(min_length=1)
+    db_name: str = Field(min_length=1)
+    app_name: str = "ixa-digital-backend"
+    min_pool_size: int = Field(default=0, ge=0)
+    max_pool_size: int = Field(default=50, ge=1)
+    max_idle_time_ms: int = Field(default=60000, ge=0)
+    compressors: List[str] = ["zstd", "snappy", "zlib"]
+    server_selection_timeout_ms: int = Field(default=5000, gt=0)
+    connect_timeout_ms: int = Field(default=5000, gt=0)
+    socket_timeout_ms: int = Field(default=20000, gt=0)
+    # Client-side operation timeout; pymongo also sends it to the server as maxTimeMS
+    timeout_ms: Optional[int] = Field(default=10000, gt=0)
+    read_concern: Literal["local", "available", "majority", "linearizable", "snapshot"] = "local"
+    write_concern: Union[int, Literal["majority"]] = "majority"
+
+    @field_validator("compressors", mode="before")
+    @classmethod
+    def split_compressors(cls, value):
+        if isinstance(value, str):
+            return [name.strip() for name in value.split(",") if name.strip()]
+        return value
+
+    @field_validator("compressors")
+    @classmethod
+    def known_compressors(cls, value: List[str]) -> List[str]:
+        unknown = [name for name in value if name not in COMPRESSOR_MODULES]
+        if unknown:
+            raise ValueError(f"Unknown compressors: {', '.join(unknown)}")
+        return value
+
+    @field_validator("write_concern", mode="before")
+    @classmethod
+    def numeric_write_concern(cls, value):
+        return int(value) if isinstance(value, str) and value.isdigit() else value
+
+    @model_validator(mode="after")
+    def pool_bounds(self) -> "MongoSettings":
+        if self.min_pool_size > self.max_pool_size:
+            raise ValueError("MONGO_MIN_POOL_SIZE cannot exceed MONGO_MAX_POOL_SIZE")
+        return self
+
+    @classmethod
+    def from_env(cls) -> "MongoSettings":
+        return cls(**{field: os.environ[name] for field, name in ENV.items() if name in os.environ})
+
+    def available_compressors(self) -> List[str]:
+        """Configured compressors whose library is installed; the server picks the first it supports"""
+        available = [name for name in self.compressors if find_spec(COMPRESSOR_MODULES[name])]
+        missing = set(self.compressors) - set(available)
+        if missing:
+            logger.info("Mongo compressors unavailable (library not installed): %s", ", ".join(sorted(missing)))
+        return available
+
+    def client_options(self) -> dict:
+        options = {
+            "appname": self.app_name,
+            "minPoolSize": self.min_pool_size,
+            "maxPoolSize": self.max_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+            "readConcernLevel": self.read_concern,
+            "w": self.write_concern,
+        }
+        compressors = self.available_compressors()
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        if self.timeout_ms:
+            options["timeoutMS"] = self.timeout_ms
+        return options
+
+
+def create_client(settings: MongoSettings, event_listeners: Optional[list] = None) -> AsyncIOMotorClient:
+    """Build the Motor client; it connects lazily on first use"""
+    return AsyncIOMotorClient(settings.url, event_listeners=event_listeners or [], **settings.client_options())
@@ -0,0 +1,177 @@
+from html import escape
+from typing import Iterable, Optional
+import json
+import re
+
+_TITLE = re.compile(r"<title>.*?</title>", re.S | re.I)
+_DESCRIPTION = re.compile(r"<meta\s+name=\"description\"[^>]*>", re.I)
+_ROOT = re.compile(r"<div id=\"root\">\s*</div>", re.I)
+
+
+def page_path(page: str) -> str:
+    """Public URL path of a page"""
+    return "/" if page == "homepage" else f"/{page}"
+
+
+def _absolute(url: str, base_url: str) -> str:
+    if not url or url.startswith(("http://", "https://")):
+        return url
+    return f"{base_url}{url}"
+
+
+def _text(value) -> str:
+    return escape(str(value or ""))
+
+
+def _list(tag: str, items: Iterable[str]) -> str:
+    entries = "".join(f"<li>{_text(item)}</li>" for item in items if item)
+    return f"<{tag}>{entries}</{tag}>" if entries else ""
+
+
+def render_head(page: str, seo: dict, branding: dict, base_url: str) -> str:
+    """Title, description, canonical, Open Graph/Twitter and verification tags"""
+    url = f"{base_url}{page_path(page)}"
+    title = _text(seo.get("site_title"))
+    description = _text(seo.get("site_description"))
+    image = _text(_absolute(seo.get("og_image") or branding.get("logo_url", ""), base_url))
+    company = branding.get("company_name", "")
+
+    tags = [
+        f"<title>{title}</title>",
+        f'<meta name="description" content="{description}" />',
+        f'<meta name="keywords" content="{_text(seo.get("keywords"))}" />',
+        f'<link rel="canonical" href="{_text(url)}" />',
+        '<meta property="og:type" content="website" />',
+        f'<meta property="og:url" content="{_text(url)}" />',
+        f'<meta property="og:title" content="{title}" />',
+        f'<meta property="og:description" content="{description}" />',
+        f'<meta property="og:site_name" content="{_text(company)}" />',
+        '<meta name="twitter:card" content="summary_large_image" />',
+        f'<meta name="twitter:title" content="{title}" />',
+        f'<meta name="twitter:description" content="{description}" />',
+    ]
+    if image:
+        tags.append(f'<meta property="og:image" content="{image}" />')
+        tags.append(f'<meta name="twitter:image" content="{image}" />')
+    if seo.get("twitter_handle"):
+        tags.append(f'<meta name="twitter:site" content="{_text(seo["twitter_handle"])}" />')
+    if seo.get("google_site_verification"):
+        tags.append(f'<meta name="google-site-verification" content="{_text(seo["google_site_verification"])}" />')
+
+    favicon = branding.get("favicon_url")
+    for variant in branding.get("favicon_variants") or []:
+        rel = "apple-touch-icon" if variant.get("sizes") == "180x180" else "icon"
+        tags.append(
+            f'<link rel="{rel}" type="{_text(variant.get("type"))}" sizes="{_text(variant.get("sizes"))}" '
+            f'href="{_text(_absolute(variant.get("url", ""), base_url))}" />'
+        )
+    if favicon and not branding.get("favicon_variants"):
+        tags.append(f'<link rel="icon" href="{_text(_absolute(favicon, base_url))}" />')
+
+    organization = {
+        "@context": "https://schema.org",
+        "@type": "Organization",
+        "name": company,
+        "url": base_url,
+        "logo": _absolute(branding.get("logo_url", ""), base_url),
+    }
+    # Escape "</" so content can never close the script element
+    json_ld = json.dumps(organization).replace("</", "<\\/")
+    tags.append(f'<script type="application/ld+json">{json_ld}</script>')
+    return "\n".join(tags)
+
+
+def render_body(content: dict, branding: dict, base_url: str) -> str:
+    """Semantic HTML of the page content, readable without JavaScript"""
+    parts = []
+    company = _text(branding.get("company_name"))
+    logo = branding.get("logo_url")
+    if logo:
+        parts.append(f'<header><img src="{_text(_absolute(logo, base_url))}" alt="{company}" height="48" /></header>')
+
+    parts.append("<main>")
+    hero = content.get("hero") or {}
+    if hero:
+        stats = "".join(
+            f"<li><strong>{_text(stat.get('value'))}</strong> {_text(stat.get('label'))}</li>"
+            for stat in hero.get("stats") or []
+        )
+        parts.append(
+            f"<section><h1>{_text(hero.get('headline'))}</h1><p>{_text(hero.get('subheadline'))}</p>"
+            f"{f'<ul>{stats}</ul>' if stats else ''}</section>"
+        )
+
+    about = content.get("about") or {}
+    if about:
+        paragraphs = "".join(f"<p>{_text(p)}</p>" for p in about.get("paragraphs") or [])
+        props = "".join(
+            f"<li><strong>{_text(prop.get('title'))}</strong> {_text(prop.get('description'))}</li>"
+            for prop in about.get("value_props") or []
+        )
+        parts.append(
+            f"<section><h2>{_text(about.get('title'))}</h2><p>{_text(about.get('subtitle'))}</p>"
+            f"<h3>{_text(about.get('headline'))}</h3>{paragraphs}{f'<ul>{props}</ul>' if props else ''}</section>"
+        )
+
+    services = content.get("services") or []
+    if services:
+        articles = "".join(
+            f"<article><h3>{_text(service.get('title'))}</h3><p>{_text(service.get('description'))}</p>"
+            f"{_list('ul', service.get('features') or [])}</article>"
+            for service in services
+        )
+        parts.append(f"<section><h2>Services</h2>{articles}</section>")
+
+    steps = content.get("process_steps") or []
+    if steps:
+        items = "".join(
+            f"<li><strong>{_text(step.get('name'))}</strong> {_text(step.get('description'))}</li>" for step in steps
+        )
+        parts.append(f"<section><h2>Our Process</h2><ol>{items}</ol></section>")
+
+    industries = content.get("industries") or []
+    if industries:
+        parts.append(
+            f"<section><h2>Industries</h2>{_list('ul', (industry.get('name') for industry in industries))}</section>"
+        )
+
+    cta = content.get("cta_section") or {}
+    if cta:
+        parts.append(f"<section><h2>{_text(cta.get('headline'))}</h2><p>{_text(cta.get('description'))}</p></section>")
+    parts.append("</main>")
+
+    footer = content.get("footer") or {}
+    if footer:
+        links = "".join(
+            f'<li><a href="{_text(url)}">{_text(name.title())}</a></li>'
+            for name, url in (footer.get("social_links") or {}).items()
+            if url and url != "#"
+        )
+        parts.append(f"<footer><p>{_text(footer.get('company_description'))}</p>{f'<ul>{links}</ul>' if links else ''}</footer>")
+
+    return "".join(parts)
+
+
+def render_page(
+    page: str,
+    content: dict,
+    seo: dict,
+    branding: dict,
+    base_url: str,
+    shell: Optional[str] = None
+) -> str:
+    """Full HTML document; injected into the frontend's index.html when one is given"""
+    head = render_head(page, seo, branding, base_url)
+    body = render_body(content, branding, base_url)
+
+    if shell and "</head>" in shell and _ROOT.search(shell):
+        # The app replaces the pre-rendered markup inside #root when it mounts
+        document = _DESCRIPTION.sub("", _TITLE.sub("", shell))
+        document = document.replace("</head>", f"{head}\n</head>", 1)
+        return _ROOT.sub(lambda _: f'<div id="root">{body}</div>', document, count=1)
+
+    return (
+        '<!doctype html>\n<html lang="en">\n<head>\n<meta charset="utf-8" />\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1" />\n'
+        f"{head}\n</head>\n<body>\n<div id=\"root\">{body}</div>\n</body>\n</html>\n"
+    )
@@ -0,0 +1,96 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import sys
+import threading
+import time
+
+MAX_SECONDS = 60
+MIN_INTERVAL = 0.001
+MAX_DEPTH = 128
+
+# One profile per worker at a time
+_busy = threading.Lock()
+
+Stack = Tuple[Tuple[str, str, int], ...]
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running in this worker"""
+
+
+def _stack(frame) -> Stack:
+    frames = []
+    while frame is not None and len(frames) < MAX_DEPTH:
+        code = frame.f_code
+        frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+def sample(seconds: float, interval: float, thread_ids: Optional[Iterable[int]] = None) -> Dict[Stack, int]:
+    """Sample the stacks of the given threads (all others than this one by default); blocks for `seconds`"""
+    seconds = min(max(seconds, 0.0), MAX_SECONDS)
+    interval = max(interval, MIN_INTERVAL)
+    wanted = set(thread_ids) if thread_ids is not None else None
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        me = threading.get_ident()
+        counts: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != me and (wanted is None or thread_id in wanted):
+                    counts[_stack(frame)] += 1
+            time.sleep(interval)
+        return counts
+    finally:
+        _busy.release()
+
+
+def _label(frame: Tuple[str, str, int]) -> str:
+    name, filename, line = frame
+    return f"{name} ({filename}:{line})"
+
+
+def collapsed(counts: Dict[Stack, int]) -> str:
+    """Brendan Gregg's collapsed format, for flamegraph.pl, speedscope or inferno"""
+    lines = [
+        f"{';'.join(_label(frame).replace(';', ':') for frame in stack)} {count}"
+        for stack, count in sorted(counts.items(), key=lambda item: -item[1])
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def speedscope(counts: Dict[Stack, int], interval: float, name: str = "profile") -> dict:
+    """Speedscope file format with a single sampled profile (weights in samples)"""
+    frame_index: Dict[Tuple[str, str, int], int] = {}
+    frames: List[dict] = []
+    samples: List[List[int]] = []
+    weights: List[int] = []
+    for stack, count in counts.items():
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indexes.append(frame_index[frame])
+        samples.append(indexes)
+        weights.append(count)
+    total = sum(weights)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "none",
+            "startValue": 0,
+            "endValue": total,
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": f"ixa-digital sampler ({interval * 1000:g}ms)",
+    }
@@ -0,0 +1,161 @@
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+import logging
+import threading
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from metrics import REGISTRY, route_label
+
+logger = logging.getLogger(__name__)
+
+MONGO_COMMAND_LATENCY = REGISTRY.histogram(
+    "mongo_command_duration_seconds", "Mongo command latency", ("command", "collection"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+MONGO_COMMAND_FAILURES = REGISTRY.counter(
+    "mongo_command_failures_total", "Mongo commands that failed", ("command", "collection")
+)
+ROUTE_DB_SECONDS = REGISTRY.histogram(
+    "http_request_db_seconds", "Mongo time per request by route template", ("method", "route"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+ROUTE_DB_CALLS = REGISTRY.histogram(
+    "http_request_db_calls", "Mongo commands per request by route template", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34)
+)
+
+# Keys whose value is the filter of a command, or the list of per-statement filters
+_FILTER_KEYS = ("filter", "query")
+_STATEMENT_KEYS = ("updates", "deletes")
+
+
+class RequestDBStats:
+    """Mongo calls made on behalf of one request"""
+
+    __slots__ = ("method", "path", "calls", "seconds", "documents")
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.calls = 0
+        self.seconds = 0.0
+        self.documents = 0
+
+
+# Motor copies the context into its executor threads, so the listener sees the request's stats
+current_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("current_db_stats", default=None)
+
+
+def shape(value: Any) -> Any:
+    """A query with its values blanked out, so similar queries log alike"""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Operator lists ($in, $and, pipelines) keep one representative element
+        return [shape(value[0])] if value else []
+    return "?"
+
+
+def command_shape(command_name: str, command: dict) -> Dict[str, Any]:
+    """Collection, filter, sort and pipeline of a command, with values blanked out"""
+    described: Dict[str, Any] = {}
+    for key in _FILTER_KEYS:
+        if key in command:
+            described["filter"] = shape(command[key])
+    for key in _STATEMENT_KEYS:
+        if command.get(key):
+            described["filter"] = shape(command[key][0].get("q", {}))
+    if "sort" in command:
+        described["sort"] = dict(command["sort"])
+    if "pipeline" in command:
+        described["pipeline"] = [list(stage)[0] for stage in command["pipeline"]]
+    if "projection" in command:
+        described["projection"] = list(command["projection"])
+    return described
+
+
+def returned_documents(command_name: str, reply: dict) -> int:
+    """Documents returned or written, read off the reply"""
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    n = reply.get("n")
+    # A count's n is the result, not documents handed back
+    return n if isinstance(n, int) and command_name != "count" else 0
+
+
+def _collection(command_name: str, command: dict) -> str:
+    target = command.get(command_name)
+    if command_name == "getMore":
+        target = command.get("collection")
+    return target if isinstance(target, str) else ""
+
+
+class QueryMonitor(monitoring.CommandListener):
+    """Attributes Mongo commands to the current request and logs slow ones"""
+
+    def __init__(self, slow_ms: float = 100.0):
+        self.slow_seconds = slow_ms / 1000
+        self._pending: Dict[Tuple[int, Any], Tuple[str, str, dict, Optional[RequestDBStats]]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        command_name = event.command_name
+        self._pending[(event.request_id, event.connection_id)] = (
+            command_name, _collection(command_name, event.command), event.command, current_db_stats.get()
+        )
+
+    def _finish(self, event, reply: Optional[dict]):
+        pending = self._pending.pop((event.request_id, event.connection_id), None)
+        if pending is None:
+            return
+        command_name, collection, command, stats = pending
+        seconds = event.duration_micros / 1_000_000
+        documents = returned_documents(command_name, reply) if reply is not None else 0
+
+        MONGO_COMMAND_LATENCY.observe((command_name, collection), seconds)
+        if reply is None:
+            MONGO_COMMAND_FAILURES.inc((command_name, collection))
+        if stats is not None:
+            # Commands of one request can run concurrently on several executor threads
+            with self._lock:
+                stats.calls += 1
+                stats.seconds += seconds
+                stats.documents += documents
+
+        if seconds >= self.slow_seconds:
+            request = f"{stats.method} {stats.path}" if stats else "background"
+            logger.warning(
+                f"Slow Mongo {command_name} on {collection or '-'}: {seconds * 1000:.1f}ms, "
+                f"{documents} docs, shape {command_shape(command_name, command)}, request {request}"
+            )
+
+    def succeeded(self, event):
+        self._finish(event, event.reply)
+
+    def failed(self, event):
+        self._finish(event, None)
+
+
+class QueryAccountingMiddleware:
+    """Collects the Mongo time and call count of each request per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats(scope["method"], scope["path"])
+        token = current_db_stats.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_db_stats.reset(token)
+            labels = (scope["method"], route_label(scope))
+            ROUTE_DB_SECONDS.observe(labels, stats.seconds)
+            ROUTE_DB_CALLS.observe(labels, stats.calls)
@@ -0,0 +1,231 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+import logging
+import math
+import os
+import time
+
+from fastapi import HTTPException, Request
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+# Default limits per scope and key type: (burst capacity, refill period in seconds)
+DEFAULT_LIMITS = {
+    "contact": {"ip": (5, 600), "email": (3, 600)},
+    "support_ticket": {"ip": (5, 600), "email": (3, 600)},
+    "track_ticket": {"ip": (30, 60), "email": (10, 60)},
+    "customer_reply": {"ip": (10, 60), "email": (10, 300)},
+    "admin_login": {"ip": (10, 300), "email": (5, 300)},
+}
+
+
+def parse_limit(value: Optional[str], default: Tuple[int, int]) -> Tuple[int, int]:
+    """Parse a "capacity/seconds" limit string, falling back to the default"""
+    if not value:
+        return default
+    try:
+        capacity, period = value.split("/", 1)
+        return max(int(capacity), 1), max(float(period), 1.0)
+    except ValueError:
+        logger.warning(f"Invalid rate limit '{value}', using {default[0]}/{default[1]}")
+        return default
+
+
+def load_limits() -> Dict[str, Dict[str, Tuple[int, int]]]:
+    """Build the limit table, allowing overrides such as RATE_LIMIT_CONTACT_IP=5/600"""
+    limits = {}
+    for scope, kinds in DEFAULT_LIMITS.items():
+        limits[scope] = {
+            kind: parse_limit(os.getenv(f"RATE_LIMIT_{scope.upper()}_{kind.upper()}"), default)
+            for kind, default in kinds.items()
+        }
+    return limits
+
+
+class MemoryBucketStore:
+    """Token buckets for this worker, kept in a bounded LRU dict"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def take(self, key: str, capacity: int, period: float, now: Optional[float] = None) -> float:
+        """Take one token; return 0 when allowed, otherwise seconds until a token is available"""
+        now = time.monotonic() if now is None else now
+        rate = capacity / period
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(capacity)
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / rate
+
+        if bucket is None:
+            self._buckets[key] = [tokens, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            bucket[0] = tokens
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        return retry_after
+
+    def refund(self, key: str, capacity: int):
+        """Give back a token taken for a request that was rejected by another bucket"""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket[0] = min(capacity, bucket[0] + 1)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class MongoBucketStore:
+    """Token buckets shared by all workers, updated atomically in a single round trip"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def take(self, key: str, capacity: int, period: float) -> float:
+        """Take one token; return 0 when allowed, otherwise seconds until a token is available"""
+        now = datetime.utcnow()
+        rate = capacity / period
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {
+            "$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [elapsed, rate]}]}]
+        }
+
+        bucket = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {
+                    "tokens": refilled,
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=period)
+                }},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}}
+            ],
+            projection={"tokens": 1, "allowed": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if bucket["allowed"]:
+            return 0.0
+        return (1 - bucket["tokens"]) / rate
+
+    async def refund(self, key: str, capacity: int):
+        """Give back a token taken for a request that was rejected by another bucket"""
+        await self.collection.update_one(
+            {"_id": key},
+            [{"$set": {"tokens": {"$min": [capacity, {"$add": ["$tokens", 1]}]}}}]
+        )
+
+
+class RateLimiter:
+    """Per-IP and per-email admission control for public write endpoints"""
+
+    def __init__(
+        self,
+        limits: Dict[str, Dict[str, Tuple[int, int]]],
+        shared_store: Optional[MongoBucketStore] = None,
+        trusted_proxy_hops: int = 0,
+        enabled: bool = True
+    ):
+        self.limits = limits
+        self.local_store = MemoryBucketStore()
+        self.shared_store = shared_store
+        self.trusted_proxy_hops = trusted_proxy_hops
+        self.enabled = enabled
+        self.counters = {scope: {"allowed": 0, "rejected": 0} for scope in limits}
+
+    def client_ip(self, request: Request) -> str:
+        """Resolve the client address, honouring X-Forwarded-For only from trusted proxies"""
+        if self.trusted_proxy_hops:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+                if hops:
+                    return hops[-min(self.trusted_proxy_hops, len(hops))]
+        return request.client.host if request.client else "unknown"
+
+    async def check(self, request: Request, scope: str, email: Optional[str] = None):
+        """Raise 429 with Retry-After when the caller is over its limit for this scope"""
+        if not self.enabled:
+            return
+
+        keys = [("ip", self.client_ip(request))]
+        if email:
+            keys.append(("email", email.strip().lower()))
+        buckets = [(f"{scope}:{kind}:{value}", *self.limits[scope][kind]) for kind, value in keys]
+
+        # A rejected request costs no bucket anything: tokens already taken are given back, so a caller
+        # throttled on its email does not also drain its IP allowance (and vice versa).
+        # Local buckets never allow more than the shared ones, so reject here first
+        retry_after = 0.0
+        taken = []
+        for key, capacity, period in buckets:
+            retry_after = self.local_store.take(key, capacity, period)
+            if retry_after:
+                for taken_key, taken_capacity in taken:
+                    self.local_store.refund(taken_key, taken_capacity)
+                break
+            taken.append((key, capacity))
+
+        if not retry_after and self.shared_store:
+            shared_taken = []
+            try:
+                for key, capacity, period in buckets:
+                    retry_after = await self.shared_store.take(key, capacity, period)
+                    if retry_after:
+                        for taken_key, taken_capacity in shared_taken:
+                            await self.shared_store.refund(taken_key, taken_capacity)
+                        break
+                    shared_taken.append((key, capacity))
+            except Exception as e:
+                logger.error(f"Shared rate limit check failed: {str(e)}")
+            if retry_after:
+                for taken_key, taken_capacity in taken:
+                    self.local_store.refund(taken_key, taken_capacity)
+
+        if retry_after:
+            self.counters[scope]["rejected"] += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+        self.counters[scope]["allowed"] += 1
+
+    def stats(self) -> dict:
+        """Counters for the admin dashboard"""
+        return {
+            "enabled": self.enabled,
+            "backend": "mongo" if self.shared_store else "memory",
+            "tracked_keys": len(self.local_store),
+            "scopes": self.counters
+        }
+
+
+def create_rate_limiter(db) -> RateLimiter:
+    """Create the rate limiter from environment settings"""
+    shared_store = None
+    if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "mongo":
+        shared_store = MongoBucketStore(db.rate_limits)
+
+    return RateLimiter(
+        load_limits(),
+        shared_store=shared_store,
+        trusted_proxy_hops=int(os.getenv("RATE_LIMIT_TRUSTED_PROXY_HOPS", "0")),
+        enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    )
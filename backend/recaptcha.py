@@ -0,0 +1,155 @@
+from typing import Optional
+import logging
+import os
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+
+
+class CircuitBreaker:
+    """Stop calling an unhealthy upstream until a cool-down has passed"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream; half-open lets a single probe through"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Free the half-open slot when a probe ends without an outcome (e.g. cancelled)"""
+        self._probe_in_flight = False
+
+
+class RecaptchaVerifier:
+    """reCAPTCHA verification over a pooled keep-alive client with a circuit breaker"""
+
+    def __init__(
+        self,
+        verify_url: str = GOOGLE_VERIFY_URL,
+        timeout: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.verify_url = verify_url
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.metrics = {
+            "passed": 0,
+            "rejected": 0,
+            "errors": 0,
+            "skipped_circuit_open": 0,
+            "upstream_calls": 0,
+            "upstream_seconds_total": 0.0
+        }
+
+    async def start(self):
+        """Open the shared client (called once at application startup)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+                transport=self._transport
+            )
+
+    async def close(self):
+        """Close the shared client (called at application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def verify(self, secret_key: str, token: Optional[str]) -> bool:
+        """Verify a token; fails open on upstream errors or while the circuit is open"""
+        if not self.breaker.allow():
+            self.metrics["skipped_circuit_open"] += 1
+            return True
+
+        if self._client is None:
+            await self.start()
+
+        started = time.perf_counter()
+        try:
+            response = await self._client.post(
+                self.verify_url,
+                data={'secret': secret_key, 'response': token or ''}
+            )
+            response.raise_for_status()
+            result = response.json()
+        except Exception as e:
+            self.breaker.record_failure()
+            self.metrics["errors"] += 1
+            logger.error(f"reCAPTCHA verification error: {str(e)}")
+            return True
+        except BaseException:
+            # Cancelled by a client disconnect or an outer timeout; otherwise the breaker stays half-open for good
+            self.breaker.release_probe()
+            raise
+        finally:
+            self.metrics["upstream_calls"] += 1
+            self.metrics["upstream_seconds_total"] += time.perf_counter() - started
+
+        self.breaker.record_success()
+        if result.get('success', False):
+            self.metrics["passed"] += 1
+            return True
+        self.metrics["rejected"] += 1
+        return False
+
+    def stats(self) -> dict:
+        """Counters and breaker state for the admin dashboard"""
+        return {
+            **self.metrics,
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures
+        }
+
+
+def create_recaptcha_verifier() -> RecaptchaVerifier:
+    """Create the verifier from environment settings"""
+    return RecaptchaVerifier(
+        verify_url=os.getenv("RECAPTCHA_VERIFY_URL", GOOGLE_VERIFY_URL),
+        timeout=float(os.getenv("RECAPTCHA_TIMEOUT", "2.0")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("RECAPTCHA_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("RECAPTCHA_BREAKER_RESET_SECONDS", "30"))
+        )
+    )
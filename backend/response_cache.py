@@ -0,0 +1,237 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+import asyncio
+import hashlib
+import logging
+
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+from starlette.requests import Request
+from starlette.responses import Response
+
+from fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+
+def key_family(key: str) -> str:
+    """Metrics label for a cache key: settings keep their name, everything else its prefix"""
+    if key.startswith("settings:"):
+        return key
+    return key.split(":", 1)[0]
+
+
+class CachedResponse:
+    """A pre-serialized JSON body, its ETag and the keys it was built from"""
+
+    __slots__ = ("body", "etag", "tags", "last_modified")
+
+    def __init__(self, body: bytes, etag: str, tags: Iterable[str] = (), last_modified: Optional[datetime] = None):
+        self.body = body
+        self.etag = etag
+        self.tags = frozenset(tags)
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """Bounded in-process cache of pre-serialized public responses"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        # Hit/miss counts per key family, e.g. "settings:branding" or "page"
+        self.family_hits: Dict[str, int] = {}
+        self.family_misses: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        family = key_family(key)
+        if entry is None:
+            self.misses += 1
+            self.family_misses[family] = self.family_misses.get(family, 0) + 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.family_hits[family] = self.family_hits.get(family, 0) + 1
+        return entry
+
+    def generation(self) -> int:
+        """Take before loading from the DB and pass to put(), so a racing invalidation wins"""
+        return self._generation
+
+    def put(
+        self,
+        key: str,
+        payload: Any,
+        etag: Optional[str] = None,
+        generation: Optional[int] = None,
+        tags: Iterable[str] = ()
+    ) -> CachedResponse:
+        """Serialize and store a payload; skipped if anything was invalidated since `generation`"""
+        return self.put_body(key, dumps(payload), etag, generation, tags)
+
+    def put_body(
+        self,
+        key: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        generation: Optional[int] = None,
+        tags: Iterable[str] = (),
+        last_modified: Optional[datetime] = None
+    ) -> CachedResponse:
+        """Store an already rendered body (e.g. HTML)"""
+        # Without an explicit ETag, the body hash serves as one
+        etag = etag or f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        entry = CachedResponse(body, etag, tags, last_modified)
+        if generation is None or generation == self._generation:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, key: str):
+        """Drop a key, keys nested under it ("page:home" drops "page:home:current") and entries tagged with it"""
+        self._generation += 1
+        prefix = f"{key}:"
+        stale = [
+            cached_key for cached_key, entry in self._entries.items()
+            if cached_key == key or cached_key.startswith(prefix) or key in entry.tags
+        ]
+        for cached_key in stale:
+            del self._entries[cached_key]
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class CacheInvalidator:
+    """Propagates cache invalidations to every worker through a small Mongo collection
+
+    Workers follow a change stream on the collection, so other workers drop a key as soon as it is
+    published. Change streams need a replica set; on a standalone server they fall back to polling
+    every `interval` seconds, which leaves other workers stale for up to that long.
+    """
+
+    def __init__(self, collection, cache: ResponseCache, interval: float = 2.0):
+        self.collection = collection
+        self.cache = cache
+        self.interval = interval
+        self._seen: Dict[str, int] = {}
+        self._synced = False
+        self.mode = "starting"
+
+    async def publish(self, key: str):
+        """Invalidate a key here now, and in other workers as soon as they see the version move"""
+        self.cache.invalidate(key)
+        result = await self.collection.find_one_and_update(
+            {"_id": key}, {"$inc": {"version": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        if result:
+            self._seen[key] = result["version"]
+
+    def _observe(self, key: str, version: Optional[int]):
+        # The first poll only records a baseline; after that a new key is a change too
+        if self._synced and self._seen.get(key) != version:
+            self.cache.invalidate(key)
+        self._seen[key] = version
+
+    async def sync(self):
+        """Invalidate every key whose version moved since the last poll"""
+        async for doc in self.collection.find({}, {"version": 1}):
+            self._observe(doc["_id"], doc.get("version", 0))
+        self._synced = True
+
+    async def watch(self):
+        """Invalidate keys as their version documents change; raises OperationFailure without a replica set"""
+        async with self.collection.watch(full_document="updateLookup") as stream:
+            # Opens the cursor, then a poll covers anything published before it was open
+            change = await stream.try_next()
+            await self.sync()
+            self.mode = "change_stream"
+            while True:
+                if change is not None:
+                    version = (change.get("fullDocument") or {}).get("version")
+                    self._observe(change["documentKey"]["_id"], version)
+                change = await stream.next()
+
+    async def poll(self):
+        self.mode = "polling"
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Cache invalidation sync failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def run(self):
+        """Background task: follow the change stream, reopening it after errors, or poll where unsupported"""
+        while True:
+            try:
+                await self.watch()
+            except (OperationFailure, NotImplementedError) as e:
+                if self.mode == "change_stream":
+                    # An open stream that broke (e.g. its resume point fell off the oplog): reopen it
+                    logger.error(f"Cache invalidation stream failed: {str(e)}")
+                    await asyncio.sleep(self.interval)
+                    continue
+                logger.info("Change streams unavailable (%s); polling cache versions every %ss", e, self.interval)
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Cache invalidation stream failed: {str(e)}")
+                await asyncio.sleep(self.interval)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match covers the given ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: gzip in front of these responses changes bytes but not meaning
+    return etag.removeprefix("W/") in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified_since(request: Request, last_modified: Optional[datetime]) -> bool:
+    """Whether If-Modified-Since is at or after last_modified (only consulted without If-None-Match)"""
+    header = request.headers.get("if-modified-since")
+    if not header or last_modified is None or "if-none-match" in request.headers:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Mongo hands back naive UTC datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def cached_json_response(
+    entry: CachedResponse,
+    request: Request,
+    cache_control: str,
+    media_type: str = "application/json"
+) -> Response:
+    """Serve a cached body, or a bodiless 304 when the client already has it"""
+    headers = {"ETag": entry.etag, "Cache-Control": cache_control}
+    last_modified = _as_utc(entry.last_modified) if entry.last_modified else None
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if etag_matches(request, entry.etag) or not_modified_since(request, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=media_type, headers=headers)
@@ -0,0 +1,249 @@
+# Production launcher: python run.py (settings from the environment, see WorkerSettings)
+from importlib.util import find_spec
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+from dotenv import load_dotenv
+
+from health import set_draining
+from log_config import configure_logging
+
+logger = logging.getLogger("run")
+
+
+def default_workers() -> int:
+    """One worker per core this process may run on (respects CPU affinity/cpusets)"""
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class WorkerSettings:
+    """Launcher settings read from the environment"""
+
+    def __init__(self):
+        self.host = os.getenv("HOST", "0.0.0.0")
+        self.port = int(os.getenv("PORT", "8001"))
+        self.workers = int(os.getenv("WEB_CONCURRENCY") or default_workers())
+        # Above the load balancer's idle timeout, so the proxy closes idle connections first
+        self.keep_alive = int(os.getenv("KEEPALIVE_SECONDS", "65"))
+        self.backlog = int(os.getenv("BACKLOG", "2048"))
+        # In-flight requests get this long to finish after SIGTERM
+        self.graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", "30"))
+        # After SIGTERM, keep accepting this long with /readyz failing so the load balancer can stop routing here
+        self.drain_delay = float(os.getenv("DRAIN_DELAY_SECONDS", "0"))
+        # Replacing crashed workers waits 1s, 2s, 4s... up to the max; a worker that stayed up this long resets it
+        self.restart_backoff_max = float(os.getenv("RESTART_BACKOFF_MAX_SECONDS", "60"))
+        self.restart_backoff_reset = float(os.getenv("RESTART_BACKOFF_RESET_SECONDS", "60"))
+        # Stop the launcher (exit 3) after this many failed worker startups in a row (0 keeps retrying)
+        self.max_startup_failures = int(os.getenv("MAX_STARTUP_FAILURES", "5"))
+        # Recycle a worker after this many requests (0 disables), plus up to the jitter so they do not all restart at once
+        self.max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+        self.max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+        self.limit_concurrency = int(os.getenv("LIMIT_CONCURRENCY", "0")) or None
+        self.forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+        self.loop = "uvloop" if find_spec("uvloop") else "asyncio"
+        self.http = "httptools" if find_spec("httptools") else "h11"
+        if self.workers < 1:
+            raise ValueError("WEB_CONCURRENCY must be at least 1")
+
+    def uvicorn_config(self) -> uvicorn.Config:
+        limit_max_requests = None
+        if self.max_requests > 0:
+            limit_max_requests = self.max_requests + random.randint(0, max(self.max_requests_jitter, 0))
+        return uvicorn.Config(
+            "server:app",
+            host=self.host,
+            port=self.port,
+            loop=self.loop,
+            http=self.http,
+            backlog=self.backlog,
+            timeout_keep_alive=self.keep_alive,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            limit_max_requests=limit_max_requests,
+            limit_concurrency=self.limit_concurrency,
+            proxy_headers=True,
+            forwarded_allow_ips=self.forwarded_allow_ips,
+            lifespan="on",
+            # RequestLogMiddleware writes access lines; server.py configures logging
+            access_log=False,
+            log_config=None,
+        )
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server whose readiness fails as soon as a stop signal arrives, before it drains"""
+
+    def __init__(self, config: uvicorn.Config, drain_delay: float = 0.0):
+        super().__init__(config)
+        self.drain_delay = drain_delay
+        self.draining = False
+        self.delayed_exit: Optional[asyncio.TimerHandle] = None
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if not self.draining:
+            self.draining = True
+            set_draining()
+            if self.drain_delay > 0 and sig == signal.SIGTERM:
+                self.delayed_exit = asyncio.get_event_loop().call_later(
+                    self.drain_delay, super().handle_exit, sig, frame
+                )
+                return
+        elif sig == signal.SIGTERM and self.delayed_exit is not None:
+            # Supervisor and supervisord (stopasgroup) both send SIGTERM; the first one scheduled the stop
+            return
+        super().handle_exit(sig, frame)
+
+
+# Exit code of a worker whose lifespan startup failed
+EXIT_STARTUP_FAILED = 3
+
+
+def serve(config: uvicorn.Config, sockets: List[socket.socket], drain_delay: float = 0.0):
+    """Worker process body"""
+    server = DrainingServer(config, drain_delay)
+    server.run(sockets=sockets)
+    if not server.started:
+        # uvicorn returns normally when startup fails; exiting 0 would look like a recycle to the supervisor
+        sys.exit(EXIT_STARTUP_FAILED)
+
+
+class RestartPolicy:
+    """What the supervisor does when a worker exits on its own, and after how long"""
+
+    RECYCLE = "recycle"
+    RESTART = "restart"
+    ABORT = "abort"
+
+    def __init__(self, backoff_max: float = 60.0, backoff_reset: float = 60.0, max_startup_failures: int = 5):
+        self.backoff_max = backoff_max
+        self.backoff_reset = backoff_reset
+        self.max_startup_failures = max_startup_failures
+        # Consecutive crashes, and how many of them in a row were failed startups
+        self.failures = 0
+        self.startup_failures = 0
+
+    def on_exit(self, exitcode: Optional[int], uptime: float) -> Tuple[str, float]:
+        """Return (action, seconds to wait) for a worker that exited with `exitcode` after `uptime` seconds"""
+        if exitcode == 0:
+            # Recycled after MAX_REQUESTS: it served, so the app starts fine
+            self.failures = self.startup_failures = 0
+            return self.RECYCLE, 0.0
+        if uptime >= self.backoff_reset:
+            self.failures = 0
+        self.failures += 1
+        if exitcode == EXIT_STARTUP_FAILED:
+            # Bad configuration does not fix itself; stop so the process manager reports it
+            self.startup_failures += 1
+            if self.max_startup_failures and self.startup_failures >= self.max_startup_failures:
+                return self.ABORT, 0.0
+        else:
+            self.startup_failures = 0
+        # Do not spin if workers crash on boot or right after it: 1s, 2s, 4s... up to the max
+        return self.RESTART, min(2 ** (self.failures - 1), self.backoff_max)
+
+
+class Supervisor:
+    """Keeps `workers` processes serving the shared socket, replacing any that exit"""
+
+    def __init__(self, settings: WorkerSettings):
+        self.settings = settings
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.started_at: Dict[int, float] = {}
+        self.stopping = False
+        self.exit_code = 0
+        self.policy = RestartPolicy(
+            settings.restart_backoff_max, settings.restart_backoff_reset, settings.max_startup_failures
+        )
+        # Times the replacements for crashed workers are due
+        self.respawn_at: List[float] = []
+
+    def spawn(self, sock: socket.socket):
+        process = self.context.Process(
+            target=serve, args=(self.settings.uvicorn_config(), [sock], self.settings.drain_delay)
+        )
+        process.start()
+        self.processes[process.pid] = process
+        self.started_at[process.pid] = time.monotonic()
+        logger.info("Started worker %d", process.pid)
+
+    def handle_signal(self, signum, frame):
+        self.stopping = True
+
+    def run(self) -> int:
+        """Serve until a stop signal (or repeated startup failures); return the launcher's exit code"""
+        config = self.settings.uvicorn_config()
+        sock = config.bind_socket()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.handle_signal)
+
+        logger.info(
+            "Serving on %s:%d with %d workers (%s, %s)",
+            self.settings.host, self.settings.port, self.settings.workers, self.settings.loop, self.settings.http
+        )
+        for _ in range(self.settings.workers):
+            self.spawn(sock)
+
+        while not self.stopping:
+            time.sleep(0.5)
+            now = time.monotonic()
+            for pid, process in list(self.processes.items()):
+                if not process.is_alive() and not self.stopping:
+                    del self.processes[pid]
+                    uptime = now - self.started_at.pop(pid)
+                    action, delay = self.policy.on_exit(process.exitcode, uptime)
+                    if action == RestartPolicy.RECYCLE:
+                        logger.info("Worker %d recycled, replacing it", pid)
+                        self.spawn(sock)
+                    elif action == RestartPolicy.ABORT:
+                        logger.error(
+                            "Worker %d failed to start %d times in a row, stopping",
+                            pid, self.policy.startup_failures
+                        )
+                        self.stopping = True
+                        self.exit_code = EXIT_STARTUP_FAILED
+                    else:
+                        logger.warning(
+                            "Worker %d exited with code %s, replacing it in %.0fs", pid, process.exitcode, delay
+                        )
+                        self.respawn_at.append(now + delay)
+            for due in [due for due in self.respawn_at if due <= now]:
+                self.respawn_at.remove(due)
+                if not self.stopping:
+                    self.spawn(sock)
+
+        self.shutdown()
+        sock.close()
+        return self.exit_code
+
+    def shutdown(self):
+        """SIGTERM every worker: fail readiness, stop accepting, finish in-flight requests, run lifespan shutdown"""
+        logger.info("Stopping %d workers", len(self.processes))
+        for process in self.processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.settings.drain_delay + self.settings.graceful_timeout + 5
+        for process in self.processes.values():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning("Worker %d did not stop in time, killing it", process.pid)
+                process.kill()
+                process.join()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    configure_logging(os.getenv("LOG_LEVEL", "INFO"), os.getenv("LOG_FORMAT", "json"))
+    sys.exit(Supervisor(WorkerSettings()).run())
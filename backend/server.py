@@ -1,20 +1,21 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Response, File, UploadFile
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, File, UploadFile, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import PlainTextResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
+import asyncio
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import FrozenSet, List, Optional, Tuple
 from datetime import datetime, timedelta
-import shutil
-import uuid as uuid_lib
 from functools import lru_cache
-import httpx
+from contextlib import asynccontextmanager
 
 from models import (
     ContactSubmission,
@@ -31,7 +32,18 @@ from models import (
     EmailSettings,
     SEOSettings,
     PageContent,
-    ContentUpdate
+    PageSnapshot,
+    ContentUpdate,
+    ContentPatch,
+    TicketSummary,
+    TicketListResponse,
+    TicketResponse,
+    SubmissionListResponse,
+    PageSummary,
+    ContentListResponse,
+    SettingsView,
+    SettingsResponse,
+    projection
 )
 from auth import (
     get_password_hash,
@@ -40,6 +52,31 @@ from auth import (
     verify_token
 )
 from email_service import EmailService
+from rate_limit import create_rate_limiter
+from recaptcha import create_recaptcha_verifier
+from response_cache import ResponseCache, CacheInvalidator, cached_json_response
+from metrics import MONGO_POOL_CHECKED_OUT, REGISTRY, MetricsMiddleware, MetricsPublisher, PoolMetricsListener, counter_family
+from query_monitor import QueryAccountingMiddleware, QueryMonitor
+from mongo import MongoSettings, create_client
+from migrations import run_migrations
+from health import HealthChecker, Warmup, probe_router, set_draining
+from server_timing import ServerTimingMiddleware, timed
+from loop_monitor import LoopWatchdog
+from log_config import RequestLogMiddleware, configure_logging, set_admin
+import profiler
+from content_patch import PatchError, build_update, parse_path
+from fast_json import FastJSONResponse, ModelJSONResponse
+from prerender import page_path, render_page
+from sitemap import MAX_URLS_PER_SITEMAP, build_sitemaps, latest
+from uploads import save_upload, referenced_uploads, collect_garbage, UploadLimitMiddleware
+from images import generate_variants, build_srcset, shutdown_pool
+from static_files import (
+    NegotiatingStaticFiles,
+    SelectiveGZipMiddleware,
+    write_precompressed,
+    precompress_directory,
+    COMPRESSIBLE_EXTENSIONS
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -47,20 +84,96 @@ load_dotenv(ROOT_DIR / '.env')
 # Create uploads directory
 UPLOAD_DIR = ROOT_DIR / 'static' / 'uploads'
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# In-progress uploads: outside /static so they are never served, same filesystem so the final move is a rename
+UPLOAD_TMP_DIR = Path(os.getenv("UPLOAD_TMP_DIR", str(ROOT_DIR / 'upload_tmp')))
+UPLOAD_TMP_DIR.mkdir(parents=True, exist_ok=True)
+LOGO_MAX_BYTES = 5 * 1024 * 1024
+FAVICON_MAX_BYTES = 1 * 1024 * 1024
+UPLOAD_GC_INTERVAL = int(os.getenv("UPLOAD_GC_INTERVAL_SECONDS", "21600"))  # 6 hours
+UPLOAD_GC_MIN_AGE = int(os.getenv("UPLOAD_GC_MIN_AGE_SECONDS", "3600"))  # 1 hour
+
+# URLs per sitemap file before switching to a sitemap index with gzipped chunks
+SITEMAP_MAX_URLS = min(int(os.getenv("SITEMAP_MAX_URLS", str(MAX_URLS_PER_SITEMAP))), MAX_URLS_PER_SITEMAP)
+
+# Built frontend index.html that pre-rendered pages are injected into (optional)
+FRONTEND_INDEX_HTML = os.getenv("FRONTEND_INDEX_HTML", "")
+
+# Mongo commands slower than this are logged with their query shape
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# MongoDB connection, opened by the lifespan handler (see connect_database)
+client: Optional[AsyncIOMotorClient] = None
+db = None
+mongo_settings: Optional[MongoSettings] = None
+
+# Rate limiting for public write endpoints (built with the connection)
+rate_limiter = None
+
+# Pre-serialized public responses, invalidated across workers via db.cache_versions
+response_cache = ResponseCache()
+CACHE_SYNC_INTERVAL = float(os.getenv("CACHE_SYNC_INTERVAL_SECONDS", "2"))
+cache_invalidator = None
+
+# Event loop stalls longer than this are logged with the blocking stack
+loop_watchdog = LoopWatchdog(float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100")))
+
+# Per-worker metrics, summed across workers through db.metrics_workers when scraped
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_PUBLISH_INTERVAL = float(os.getenv("METRICS_PUBLISH_INTERVAL_SECONDS", "15"))
+metrics_publisher = None
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+
+def collect_cache_metrics():
+    """Response cache hits and misses per key family (settings:branding, settings:seo, page, ...)"""
+    return [
+        counter_family(
+            "response_cache_hits_total", "Response cache hits", ("cache",),
+            {(family,): count for family, count in response_cache.family_hits.items()}
+        ),
+        counter_family(
+            "response_cache_misses_total", "Response cache misses", ("cache",),
+            {(family,): count for family, count in response_cache.family_misses.items()}
+        ),
+    ]
+
+
+REGISTRY.add_collector(collect_cache_metrics)
+
+# Shared reCAPTCHA client (opened at startup, closed at shutdown)
+recaptcha_verifier = create_recaptcha_verifier()
+
+def connect_database():
+    """Create the Motor client and everything bound to its collections"""
+    global client, db, mongo_settings, rate_limiter, cache_invalidator, metrics_publisher
+    # Raises a ValidationError naming the bad MONGO_* setting before anything connects
+    mongo_settings = MongoSettings.from_env()
+    client = create_client(mongo_settings, event_listeners=[PoolMetricsListener(), QueryMonitor(SLOW_QUERY_MS)])
+    db = client[mongo_settings.db_name]
+    rate_limiter = create_rate_limiter(db)
+    cache_invalidator = CacheInvalidator(db.cache_versions, response_cache, interval=CACHE_SYNC_INTERVAL)
+    metrics_publisher = MetricsPublisher(db.metrics_workers, interval=METRICS_PUBLISH_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
 
 # Create the main app without a prefix
-app = FastAPI()
+# orjson rendering for every route. Routes with a response_model return ModelJSONResponse,
+# which validates against the model (FastAPI does not for Response objects) in a single pass
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
 
-# Add GZip compression middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Add GZip compression middleware (static files use precompressed sidecars, sitemap chunks are .gz already)
+app.add_middleware(
+    SelectiveGZipMiddleware, minimum_size=1000, exclude_prefixes=("/static/", "/api/sitemaps/")
+)
 
-# Mount static files directory with caching
-app.mount("/static", StaticFiles(directory=str(ROOT_DIR / "static")), name="static")
+# Mount static files directory: AVIF/WebP negotiation, .br/.gz sidecars, immutable caching, ranges
+app.mount("/static", NegotiatingStaticFiles(directory=str(ROOT_DIR / "static")), name="static")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -68,59 +181,11 @@ api_router = APIRouter(prefix="/api")
 # Security
 security = HTTPBearer()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging: JSON lines written from a background thread, info lines sampled per request
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+configure_logging(os.getenv("LOG_LEVEL", "INFO"), os.getenv("LOG_FORMAT", "json"), LOG_SAMPLE_RATE)
 logger = logging.getLogger(__name__)
 
-# Cache for frequently accessed data
-_branding_cache = None
-_branding_cache_time = None
-_seo_cache = None
-_seo_cache_time = None
-CACHE_DURATION = 300  # 5 minutes
-
-async def get_cached_branding():
-    """Get branding with caching"""
-    global _branding_cache, _branding_cache_time
-    
-    now = datetime.utcnow()
-    if _branding_cache and _branding_cache_time:
-        if (now - _branding_cache_time).total_seconds() < CACHE_DURATION:
-            return _branding_cache
-    
-    settings = await db.settings.find_one()
-    if settings and settings.get('branding'):
-        _branding_cache = settings['branding']
-    else:
-        _branding_cache = {
-            "logo_url": "https://customer-assets.emergentagent.com/job_a08c0b50-0e68-4792-b6a6-4a15ac002d5c/artifacts/3mcpq5px_Logo.jpeg",
-            "favicon_url": "",
-            "company_name": "IXA Digital"
-        }
-    _branding_cache_time = now
-    return _branding_cache
-
-async def get_cached_seo():
-    """Get SEO config with caching"""
-    global _seo_cache, _seo_cache_time
-    
-    now = datetime.utcnow()
-    if _seo_cache and _seo_cache_time:
-        if (now - _seo_cache_time).total_seconds() < CACHE_DURATION:
-            return _seo_cache
-    
-    settings = await db.settings.find_one()
-    if settings and settings.get('seo_settings'):
-        _seo_cache = settings['seo_settings']
-    else:
-        from models import SEOSettings
-        _seo_cache = SEOSettings().dict()
-    _seo_cache_time = now
-    return _seo_cache
-
 async def verify_recaptcha(token: str) -> bool:
     """Verify Google reCAPTCHA token"""
     try:
@@ -136,29 +201,115 @@ async def verify_recaptcha(token: str) -> bool:
         if not secret_key:
             return True
         
-        # Verify with Google
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                'https://www.google.com/recaptcha/api/siteverify',
-                data={
-                    'secret': secret_key,
-                    'response': token
-                },
-                timeout=5.0
-            )
-            result = response.json()
-            return result.get('success', False)
+        # Verify with Google over the pooled client
+        with timed("recaptcha"):
+            return await recaptcha_verifier.verify(secret_key, token)
     except Exception as e:
         logger.error(f"reCAPTCHA verification error: {str(e)}")
         return True  # On error, allow submission (fail open)
 
-def clear_cache():
-    """Clear all caches"""
-    global _branding_cache, _branding_cache_time, _seo_cache, _seo_cache_time
-    _branding_cache = None
-    _branding_cache_time = None
-    _seo_cache = None
-    _seo_cache_time = None
+async def invalidate_settings_cache():
+    """Clear settings caches in this and every other worker"""
+    await cache_invalidator.publish("settings")
+    schedule_snapshot_refresh()
+
+DEFAULT_BRANDING = {
+    "logo_url": "https://customer-assets.emergentagent.com/job_a08c0b50-0e68-4792-b6a6-4a15ac002d5c/artifacts/3mcpq5px_Logo.jpeg",
+    "favicon_url": "",
+    "company_name": "IXA Digital"
+}
+
+async def load_public_settings() -> dict:
+    """Public parts of the settings document, read in one query"""
+    settings = await db.settings.find_one({}, {"branding": 1, "seo_settings": 1, "recaptcha_settings": 1}) or {}
+    recaptcha = settings.get('recaptcha_settings') or {}
+    return {
+        "branding": settings.get('branding') or DEFAULT_BRANDING,
+        "seo": settings.get('seo_settings') or SEOSettings().dict(),
+        # Never the secret key
+        "recaptcha": {"enabled": recaptcha.get('enabled', False), "site_key": recaptcha.get('site_key', '')}
+    }
+
+# Response body of each public settings endpoint
+PUBLIC_SETTINGS_PAYLOADS = {
+    "branding": lambda public: {"success": True, "branding": public["branding"]},
+    "seo": lambda public: public["seo"],
+    "recaptcha": lambda public: {"success": True, **public["recaptcha"]},
+}
+
+async def get_public_settings_entry(name: str):
+    """Cached response body of a public settings endpoint"""
+    cache_key = f"settings:{name}"
+    cached = response_cache.get(cache_key)
+    if cached is None:
+        generation = response_cache.generation()
+        public = await load_public_settings()
+        cached = response_cache.put(cache_key, PUBLIC_SETTINGS_PAYLOADS[name](public), generation=generation)
+    return cached
+
+async def attach_image_variants(kind: str, filename: str):
+    """Generate resized/modern-format variants of an upload and publish them in branding"""
+    try:
+        variants = await generate_variants(kind, UPLOAD_DIR / filename)
+        
+        # SVG and ICO files get .br/.gz sidecars for the static route
+        paths = [UPLOAD_DIR / filename] + [UPLOAD_DIR / variant["url"] for variant in variants]
+        await asyncio.to_thread(
+            write_precompressed,
+            [path for path in paths if path.suffix in COMPRESSIBLE_EXTENSIONS]
+        )
+    except Exception as e:
+        logger.error(f"Error generating {kind} variants for {filename}: {str(e)}")
+        return
+    
+    if not variants:
+        return
+    
+    for variant in variants:
+        variant["url"] = f"/static/uploads/{variant['url']}"
+    
+    update_data = {f"branding.{kind}_variants": variants}
+    if kind == "logo":
+        update_data["branding.logo_srcset"] = build_srcset(variants)
+    
+    # Only attach if this upload is still the current one
+    await db.settings.update_one(
+        {f"branding.{kind}_url": f"/static/uploads/{filename}"},
+        {"$set": update_data}
+    )
+    await invalidate_settings_cache()
+    logger.info("Generated %d %s variants for %s", len(variants), kind, filename)
+
+async def gc_uploads(min_age_seconds: int = UPLOAD_GC_MIN_AGE) -> List[str]:
+    """Delete uploaded files no longer referenced by settings.branding"""
+    settings = await db.settings.find_one({}, {"branding": 1})
+    if not settings:
+        return []
+    
+    referenced = referenced_uploads(settings.get('branding'))
+    deleted = await asyncio.to_thread(collect_garbage, UPLOAD_DIR, referenced, min_age_seconds)
+    # Temp files left behind by a worker that died mid-upload
+    await asyncio.to_thread(collect_garbage, UPLOAD_TMP_DIR, set(), min_age_seconds)
+    if deleted:
+        logger.info("Upload GC removed %d unreferenced files", len(deleted))
+    return deleted
+
+async def run_upload_gc():
+    """Background loop sweeping orphaned uploads"""
+    while True:
+        await asyncio.sleep(UPLOAD_GC_INTERVAL)
+        try:
+            await gc_uploads()
+        except Exception as e:
+            logger.error(f"Upload GC error: {str(e)}")
+
+_upload_gc_task = None
+_cache_sync_task = None
+_metrics_task = None
+_watchdog_task = None
+_precompress_task = None
+_warmup_task = None
+_migration_task = None
 
 # Helper function to get email service
 async def get_email_service():
@@ -170,90 +321,312 @@ async def get_email_service():
 # Dependency to verify admin token
 async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
-    payload = verify_token(token)
+    with timed("jwt"):
+        payload = verify_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    admin = await db.admins.find_one({"username": payload.get("sub")})
+    with timed("admin"):
+        admin = await db.admins.find_one({"username": payload.get("sub")})
     if not admin:
         raise HTTPException(status_code=401, detail="Admin not found")
     
+    set_admin(admin["username"])
     return admin
 
-# Initialize default admin and settings
-async def init_defaults():
-    """Create default admin user and settings if not exists"""
-    # Create admin
-    existing_admin = await db.admins.find_one({"username": "admin"})
-    if not existing_admin:
-        admin_data = {
-            "username": "admin",
-            "password_hash": get_password_hash("IXADigital@2026"),
-            "created_at": datetime.utcnow()
-        }
-        await db.admins.insert_one(admin_data)
+# Bump when the startup steps below change (new defaults or indexes) so they run again
+SCHEMA_VERSION = 3
+MIGRATION_RETRY_SECONDS = float(os.getenv("MIGRATION_RETRY_SECONDS", "5"))
+# Whether this worker's SCHEMA_VERSION is installed; /readyz fails until it is
+_schema_ready = False
+
+# Default admin, settings and homepage; upserts, so concurrent or repeated runs are harmless
+async def ensure_admin():
+    """Create the default admin user if missing"""
+    password_hash = await asyncio.to_thread(get_password_hash, "IXADigital@2026")
+    result = await db.admins.update_one(
+        {"username": "admin"},
+        {"$setOnInsert": {"username": "admin", "password_hash": password_hash, "created_at": datetime.utcnow()}},
+        upsert=True
+    )
+    if result.upserted_id:
         logger.info("Default admin user created")
-    
-    # Create default settings
-    existing_settings = await db.settings.find_one()
-    if not existing_settings:
-        default_settings = SystemSettings()
-        await db.settings.insert_one(default_settings.dict())
+
+async def ensure_settings():
+    """Create default settings if missing"""
+    result = await db.settings.update_one({}, {"$setOnInsert": SystemSettings().dict()}, upsert=True)
+    if result.upserted_id:
         logger.info("Default settings created")
-    
-    # Create default homepage content
-    existing_content = await db.page_content.find_one({"page": "homepage"})
-    if not existing_content:
-        from models import PageContent, HeroContent, AboutContent, FooterContent
-        default_content = PageContent(
-            page="homepage",
-            hero=HeroContent(),
-            about=AboutContent(),
-            footer=FooterContent(),
-            cta_section={
-                "headline": "Let's Build Your Digital Growth Engine",
-                "description": "Ready to scale your business with data-driven strategies and cutting-edge solutions?",
-                "button_text": "Start Your Project"
-            }
-        )
-        await db.page_content.insert_one(default_content.dict())
+
+async def ensure_homepage():
+    """Create default homepage content if missing"""
+    from models import PageContent, HeroContent, AboutContent, FooterContent
+    default_content = PageContent(
+        page="homepage",
+        hero=HeroContent(),
+        about=AboutContent(),
+        footer=FooterContent(),
+        cta_section={
+            "headline": "Let's Build Your Digital Growth Engine",
+            "description": "Ready to scale your business with data-driven strategies and cutting-edge solutions?",
+            "button_text": "Start Your Project"
+        }
+    )
+    result = await db.page_content.update_one(
+        {"page": "homepage"}, {"$setOnInsert": default_content.dict()}, upsert=True
+    )
+    if result.upserted_id:
         logger.info("Default homepage content created")
 
+async def publish_unpublished_pages():
+    """Publish the current content of every page that has no snapshot yet (the public site only serves snapshots)"""
+    async for doc in db.page_content.find({"published_version": None}, {"_id": 0, "page": 1}):
+        version = await publish_page_snapshot(doc["page"], "system")
+        logger.info("Published %s version %d", doc["page"], version)
+
+async def backfill_content_versions():
+    """Give pages saved before optimistic concurrency an explicit version 1, so saves can match on it"""
+    result = await db.page_content.update_many({"version": {"$exists": False}}, {"$set": {"version": 1}})
+    if result.modified_count:
+        logger.info("Set version 1 on %d pages", result.modified_count)
+
+async def ensure_pages():
+    """Default homepage, versions on older pages, then a first snapshot of every page"""
+    await ensure_homepage()
+    await backfill_content_versions()
+    await publish_unpublished_pages()
+
+# Draft fields that are not part of a published snapshot
+DRAFT_ONLY_FIELDS = ("_id", "version", "published_version", "published_at", "published_by")
+
+@lru_cache(maxsize=1)
+def load_frontend_shell() -> Optional[str]:
+    """The frontend's index.html, if configured and present"""
+    if FRONTEND_INDEX_HTML and Path(FRONTEND_INDEX_HTML).is_file():
+        return Path(FRONTEND_INDEX_HTML).read_text(encoding="utf-8")
+    return None
+
+async def render_page_snapshot(page: str):
+    """Render and cache the HTML snapshot of a page; None if the page does not exist"""
+    if page not in await published_pages():
+        return None
+    generation = response_cache.generation()
+    public, loaded = await asyncio.gather(load_public_settings(), load_page_payload(page))
+    if loaded is None:
+        return None
+    return put_page_snapshot(page, public, loaded, generation)
+
+def put_page_snapshot(page: str, public: dict, loaded: Tuple[dict, str], generation: int):
+    """Render a page's HTML snapshot from already loaded settings and content, and cache it"""
+    html = render_page(
+        page,
+        loaded[0]["content"],
+        public["seo"],
+        public["branding"],
+        os.getenv("FRONTEND_URL", "https://your-domain.com"),
+        load_frontend_shell()
+    )
+    # Dropped whenever the settings or this page are invalidated
+    return response_cache.put_body(f"html:{page}", html.encode(), generation=generation, tags=("settings", f"page:{page}"))
+
+async def refresh_page_snapshots(pages: Optional[List[str]] = None):
+    """Re-render HTML snapshots of the given pages, or of every page"""
+    try:
+        if pages is None:
+            pages = [doc["page"] async for doc in db.page_content.find({}, {"_id": 0, "page": 1})]
+        for page in pages:
+            await render_page_snapshot(page)
+    except Exception as e:
+        logger.error(f"Error rendering page snapshots: {str(e)}")
+
+_snapshot_tasks = set()
+
+def schedule_snapshot_refresh(pages: Optional[List[str]] = None):
+    """Re-render snapshots in the background so the next visitor gets a warm one"""
+    task = asyncio.create_task(refresh_page_snapshots(pages))
+    _snapshot_tasks.add(task)
+    task.add_done_callback(_snapshot_tasks.discard)
+
+async def set_published_version(page: str, version: int, published_by: str):
+    """Point the public page at a snapshot version"""
+    await db.page_content.update_one(
+        {"page": page},
+        {"$set": {
+            "published_version": version,
+            "published_at": datetime.utcnow(),
+            "published_by": published_by
+        }}
+    )
+    await cache_invalidator.publish(f"page:{page}")
+    await cache_invalidator.publish("sitemap")
+    schedule_snapshot_refresh([page])
+
+async def publish_page_snapshot(page: str, published_by: str) -> Optional[int]:
+    """Freeze the current draft of a page into the next snapshot version and publish it"""
+    draft = await db.page_content.find_one({"page": page})
+    if not draft:
+        return None
+    
+    latest = await db.page_snapshots.find_one({"page": page}, {"version": 1}, sort=[("version", -1)])
+    version = (latest["version"] if latest else 0) + 1
+    
+    snapshot = PageSnapshot(
+        page=page,
+        version=version,
+        content={key: value for key, value in draft.items() if key not in DRAFT_ONLY_FIELDS},
+        published_by=published_by
+    )
+    await db.page_snapshots.insert_one(snapshot.dict())
+    await set_published_version(page, version, published_by)
+    return version
+
 # Generate ticket number
 async def generate_ticket_number():
     count = await db.support_tickets.count_documents({})
     return f"TKT-{str(count + 1).zfill(6)}"
 
+# Projections matching the response models
+TICKET_PROJECTION = projection(SupportTicket)
+TICKET_SUMMARY_PROJECTION = projection(TicketSummary, reply_count={"$size": {"$ifNull": ["$replies", []]}})
+SUBMISSION_PROJECTION = projection(ContactSubmission)
+PAGE_SUMMARY_PROJECTION = projection(PageSummary)
+
+# Prometheus scrape target, outside /api like any other exporter
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Request, cache, email and Mongo pool metrics of every worker, one series per worker"""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    try:
+        body = await metrics_publisher.collect()
+    except Exception as e:
+        # Mongo being down is exactly when metrics are wanted; fall back to this worker alone
+        logger.error(f"Error aggregating metrics: {str(e)}")
+        body = metrics_publisher.local()
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Warm-up: a worker reports ready once the public caches are loaded
+async def warm_caches() -> int:
+    """Preload the public settings responses and each published page's content, bootstrap and HTML snapshot"""
+    generation = response_cache.generation()
+    # One settings read for everything, one content read per page
+    public = await load_public_settings()
+    for name, build in PUBLIC_SETTINGS_PAYLOADS.items():
+        response_cache.put(f"settings:{name}", build(public), generation=generation)
+    
+    pages = sorted(await published_pages())
+    for page in pages:
+        loaded = await load_page_payload(page)
+        if loaded is None:
+            continue
+        put_page_entry(page, loaded, generation)
+        put_bootstrap_entry(page, public, loaded, generation)
+        put_page_snapshot(page, public, loaded, generation)
+    return len(pages)
+
+warmup = Warmup(warm_caches, retry_seconds=float(os.getenv("WARMUP_RETRY_SECONDS", "2")))
+
+# Readiness thresholds
+READY_MAX_MONGO_PING_MS = float(os.getenv("READY_MAX_MONGO_PING_MS", "250"))
+READY_MAX_POOL_USAGE = float(os.getenv("READY_MAX_POOL_USAGE", "0.9"))
+READY_MAX_LOOP_LAG_MS = float(os.getenv("READY_MAX_LOOP_LAG_MS", "250"))
+
+async def check_mongo():
+    started = time.perf_counter()
+    await db.command("ping")
+    latency_ms = (time.perf_counter() - started) * 1000
+    return latency_ms <= READY_MAX_MONGO_PING_MS, {"ping_ms": round(latency_ms, 2)}
+
+async def check_pool():
+    # Busiest server's checked-out connections against maxPoolSize
+    in_use = max(MONGO_POOL_CHECKED_OUT.values().values(), default=0)
+    usage = in_use / mongo_settings.max_pool_size
+    return usage <= READY_MAX_POOL_USAGE, {"in_use": int(in_use), "max": mongo_settings.max_pool_size}
+
+async def check_event_loop():
+    lag_ms = loop_watchdog.lag * 1000
+    return lag_ms <= READY_MAX_LOOP_LAG_MS, {"lag_ms": round(lag_ms, 2)}
+
+async def check_caches():
+    return warmup.warmed, {"entries": response_cache.stats()["entries"]}
+
+async def check_schema():
+    return _schema_ready, {"version": SCHEMA_VERSION}
+
+# Probes hit this every few seconds per worker; results are reused for READY_CACHE_SECONDS
+health_checker = HealthChecker(
+    {
+        "mongo": check_mongo, "pool": check_pool, "event_loop": check_event_loop, "caches": check_caches,
+        "schema": check_schema
+    },
+    ttl=float(os.getenv("READY_CACHE_SECONDS", "2")),
+    timeout=float(os.getenv("READY_CHECK_TIMEOUT_SECONDS", "1"))
+)
+
+# /healthz and /readyz; /readyz fails as soon as the worker starts draining
+app.include_router(probe_router(health_checker))
+
 # Public Routes
 @api_router.get("/")
 async def root():
     return {"message": "IXA Digital API"}
 
 @api_router.get("/seo-config")
-async def get_seo_config():
+async def get_seo_config(request: Request):
     """Get SEO configuration for frontend"""
-    settings = await db.settings.find_one()
-    if settings and settings.get('seo_settings'):
-        return settings['seo_settings']
-    return SEOSettings().dict()
+    cached = await get_public_settings_entry("seo")
+    return cached_json_response(cached, request, "public, max-age=300")
 
-@api_router.post("/track-ticket")
-async def track_ticket(ticket_number: str, customer_email: str):
+@api_router.get("/render/{page}")
+async def get_prerendered_page(page: str, request: Request):
+    """Pre-rendered HTML of a published page with SEO metadata, for crawlers and first paint"""
+    try:
+        cached = response_cache.get(f"html:{page}") or await render_page_snapshot(page)
+        if cached is None:
+            # Unknown pages are answered from the published page set, without a DB read; the web server
+            # falls back to the SPA shell on this 404
+            raise HTTPException(status_code=404, detail="Page not found", headers={"Cache-Control": "public, max-age=60"})
+        
+        return cached_json_response(cached, request, "public, max-age=300", media_type="text/html; charset=utf-8")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error rendering page: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to render page")
+
+@api_router.get("/bootstrap")
+async def get_bootstrap(request: Request, page: str = "homepage"):
+    """Branding, SEO, reCAPTCHA config and page content for first paint in one cached response"""
+    try:
+        cached = await get_bootstrap_entry(page)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Page not found")
+        
+        return cached_json_response(cached, request, "public, max-age=300")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching bootstrap data: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch site data")
+
+@api_router.post("/track-ticket", response_model=TicketResponse)
+async def track_ticket(ticket_number: str, customer_email: str, request: Request):
     """Track a support ticket (public with verification)"""
     try:
-        ticket = await db.support_tickets.find_one({
-            "ticket_number": ticket_number,
-            "customer_email": customer_email
-        })
+        await rate_limiter.check(request, "track_ticket", customer_email)
+        
+        ticket = await db.support_tickets.find_one(
+            {"ticket_number": ticket_number, "customer_email": customer_email},
+            TICKET_PROJECTION
+        )
         
         if not ticket:
             raise HTTPException(status_code=404, detail="Ticket not found or email doesn't match")
         
-        ticket["_id"] = str(ticket["_id"])
-        return {
+        return ModelJSONResponse(TicketResponse, {
             "success": True,
             "ticket": ticket
-        }
+        })
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -264,10 +637,13 @@ async def track_ticket(ticket_number: str, customer_email: str):
 async def customer_reply_to_ticket(
     ticket_id: str,
     reply_message: str,
-    customer_email: str
+    customer_email: str,
+    request: Request
 ):
     """Customer reply to their own ticket (public with verification)"""
     try:
+        await rate_limiter.check(request, "customer_reply", customer_email)
+        
         ticket = await db.support_tickets.find_one({
             "id": ticket_id,
             "customer_email": customer_email
@@ -323,64 +699,191 @@ async def customer_reply_to_ticket(
         raise HTTPException(status_code=500, detail="Failed to add reply")
 
 @api_router.get("/recaptcha-config")
-async def get_recaptcha_config(response: Response):
+async def get_recaptcha_config(request: Request):
     """Get reCAPTCHA site key (public) with caching"""
     try:
-        response.headers["Cache-Control"] = "public, max-age=300"
-        
-        settings = await db.settings.find_one()
-        if settings and settings.get('recaptcha_settings'):
-            recaptcha = settings['recaptcha_settings']
-            return {
-                "success": True,
-                "enabled": recaptcha.get('enabled', False),
-                "site_key": recaptcha.get('site_key', '')
-            }
-        return {"success": True, "enabled": False, "site_key": ""}
+        cached = await get_public_settings_entry("recaptcha")
+        return cached_json_response(cached, request, "public, max-age=300")
     except Exception as e:
         logger.error(f"Error fetching reCAPTCHA config: {str(e)}")
         return {"success": True, "enabled": False, "site_key": ""}
 
 @api_router.get("/branding")
-async def get_branding():
+async def get_branding(request: Request):
     """Get branding configuration (logo, favicon) - public"""
     try:
-        settings = await db.settings.find_one()
-        if settings and settings.get('branding'):
-            return {"success": True, "branding": settings['branding']}
-        return {
-            "success": True,
-            "branding": {
-                "logo_url": "https://customer-assets.emergentagent.com/job_a08c0b50-0e68-4792-b6a6-4a15ac002d5c/artifacts/3mcpq5px_Logo.jpeg",
-                "favicon_url": "",
-                "company_name": "IXA Digital"
-            }
-        }
+        cached = await get_public_settings_entry("branding")
+        return cached_json_response(cached, request, "public, max-age=300")
     except Exception as e:
         logger.error(f"Error fetching branding: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch branding")
 
+def snapshot_etag(page: str, version: int) -> str:
+    return f'W/"{page}-v{version}"'
+
+async def load_page_payload(page: str) -> Optional[Tuple[dict, str]]:
+    """Published content of a page and its ETag, or None if the page does not exist"""
+    content = await db.page_content.find_one({"page": page}, {"_id": 0, "published_version": 1})
+    if not content:
+        return None
+    
+    version = content.get("published_version")
+    snapshot = None
+    if version:
+        snapshot = await db.page_snapshots.find_one({"page": page, "version": version})
+    
+    if not snapshot:
+        # Drafts are never public; the startup migration publishes pages that predate snapshots
+        return None
+    return {
+        "success": True,
+        "version": version,
+        "url": f"/api/page-content/{page}/v/{version}",
+        "content": snapshot["content"]
+    }, snapshot_etag(page, version)
+
+# Published page names, reloaded after any cache invalidation; lookups of unknown pages skip the DB
+_published_pages: Tuple[Optional[int], FrozenSet[str]] = (None, frozenset())
+
+async def published_pages() -> FrozenSet[str]:
+    global _published_pages
+    generation = response_cache.generation()
+    if _published_pages[0] != generation:
+        cursor = db.page_content.find({"published_version": {"$ne": None}}, {"_id": 0, "page": 1})
+        _published_pages = (generation, frozenset([doc["page"] async for doc in cursor]))
+    return _published_pages[1]
+
+async def get_page_entry(page: str):
+    """Cached published content of a page, or None if the page does not exist"""
+    if page not in await published_pages():
+        return None
+    cached = response_cache.get(f"page:{page}")
+    if cached is None:
+        generation = response_cache.generation()
+        loaded = await load_page_payload(page)
+        if loaded is None:
+            return None
+        cached = put_page_entry(page, loaded, generation)
+    return cached
+
+def put_page_entry(page: str, loaded: Tuple[dict, str], generation: int):
+    payload, etag = loaded
+    return response_cache.put(f"page:{page}", payload, etag, generation)
+
+async def get_bootstrap_entry(page: str):
+    """Cached bootstrap response of a page, or None if the page does not exist"""
+    if page not in await published_pages():
+        return None
+    cached = response_cache.get(f"bootstrap:{page}")
+    if cached is None:
+        generation = response_cache.generation()
+        public, loaded = await asyncio.gather(load_public_settings(), load_page_payload(page))
+        if loaded is None:
+            return None
+        cached = put_bootstrap_entry(page, public, loaded, generation)
+    return cached
+
+def put_bootstrap_entry(page: str, public: dict, loaded: Tuple[dict, str], generation: int):
+    """Cache a page's bootstrap response built from already loaded settings and content"""
+    payload = {
+        "success": True,
+        "page": page,
+        "branding": public["branding"],
+        "seo": public["seo"],
+        "recaptcha": public["recaptcha"],
+        "version": loaded[0]["version"],
+        "content_url": loaded[0]["url"],
+        "content": loaded[0]["content"]
+    }
+    # Dropped whenever the settings or this page are invalidated
+    return response_cache.put(f"bootstrap:{page}", payload, generation=generation, tags=("settings", f"page:{page}"))
+
 @api_router.get("/page-content/{page}")
-async def get_page_content(page: str, response: Response):
-    """Get page content (public) with caching"""
+async def get_page_content(page: str, request: Request):
+    """Get the published page content (public); clients that can should follow /current to /v/{version}"""
     try:
-        # Set cache headers
-        response.headers["Cache-Control"] = "public, max-age=300"  # 5 minutes
-        
-        content = await db.page_content.find_one({"page": page})
-        if not content:
+        # Served from pre-serialized bytes; a matching If-None-Match returns 304 without DB work.
+        # Revalidated every time so a publish shows up at once; the versioned URLs carry the long-lived caching
+        cached = await get_page_entry(page)
+        if cached is None:
             return {"success": False, "message": "Content not found"}
         
-        content["_id"] = str(content["_id"])
-        return {"success": True, "content": content}
+        return cached_json_response(cached, request, "public, no-cache")
     except Exception as e:
         logger.error(f"Error fetching page content: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch content")
 
+@api_router.get("/page-content/{page}/current")
+async def get_current_page_version(page: str, request: Request):
+    """Get the published version pointer of a page (public, always revalidated)"""
+    try:
+        # Unknown and unpublished pages are answered from the published page set, without a DB read
+        if page not in await published_pages():
+            raise HTTPException(status_code=404, detail="Page not published")
+        
+        cache_key = f"page:{page}:current"
+        cached = response_cache.get(cache_key)
+        if cached is None:
+            generation = response_cache.generation()
+            content = await db.page_content.find_one({"page": page}, {"published_version": 1})
+            if not content or not content.get("published_version"):
+                raise HTTPException(status_code=404, detail="Page not published")
+            
+            version = content["published_version"]
+            cached = response_cache.put(
+                cache_key,
+                {
+                    "success": True,
+                    "page": page,
+                    "version": version,
+                    "url": f"/api/page-content/{page}/v/{version}"
+                },
+                snapshot_etag(page, version),
+                generation
+            )
+        
+        return cached_json_response(cached, request, "public, no-cache")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching page version: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch page version")
+
+@api_router.get("/page-content/{page}/v/{version}")
+async def get_page_snapshot(page: str, version: int, request: Request):
+    """Get a published page snapshot (public, immutable)"""
+    try:
+        cache_key = f"snapshot:{page}:{version}"
+        cached = response_cache.get(cache_key)
+        if cached is None:
+            snapshot = await db.page_snapshots.find_one({"page": page, "version": version})
+            if not snapshot:
+                raise HTTPException(status_code=404, detail="Snapshot not found")
+            
+            # Snapshots never change, so no generation check is needed
+            cached = response_cache.put(
+                cache_key,
+                {"success": True, "version": version, "content": snapshot["content"]},
+                snapshot_etag(page, version)
+            )
+        
+        return cached_json_response(cached, request, "public, max-age=31536000, immutable")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error fetching page snapshot: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch snapshot")
+
 @api_router.post("/contact", response_model=ContactSubmissionResponse)
-async def submit_contact_form(submission: ContactSubmissionCreate, recaptcha_token: Optional[str] = None):
+async def submit_contact_form(
+    submission: ContactSubmissionCreate,
+    request: Request,
+    recaptcha_token: Optional[str] = None
+):
     """Submit a contact form"""
     try:
+        await rate_limiter.check(request, "contact", submission.email)
+        
         # Verify reCAPTCHA
         if not await verify_recaptcha(recaptcha_token):
             raise HTTPException(status_code=400, detail="reCAPTCHA verification failed. Please try again.")
@@ -388,7 +891,7 @@ async def submit_contact_form(submission: ContactSubmissionCreate, recaptcha_tok
         contact_data = ContactSubmission(**submission.dict())
         await db.contact_submissions.insert_one(contact_data.dict())
         
-        logger.info(f"New contact submission from {submission.email}")
+        logger.info("New contact submission from %s", submission.email)
         
         # Send email notification
         email_service = await get_email_service()
@@ -410,9 +913,15 @@ async def submit_contact_form(submission: ContactSubmissionCreate, recaptcha_tok
         raise HTTPException(status_code=500, detail="Failed to submit form")
 
 @api_router.post("/support-ticket")
-async def create_support_ticket(ticket_data: SupportTicketCreate, recaptcha_token: Optional[str] = None):
+async def create_support_ticket(
+    ticket_data: SupportTicketCreate,
+    request: Request,
+    recaptcha_token: Optional[str] = None
+):
     """Create a new support ticket (public)"""
     try:
+        await rate_limiter.check(request, "support_ticket", ticket_data.customer_email)
+        
         # Verify reCAPTCHA
         if not await verify_recaptcha(recaptcha_token):
             raise HTTPException(status_code=400, detail="reCAPTCHA verification failed. Please try again.")
@@ -424,7 +933,7 @@ async def create_support_ticket(ticket_data: SupportTicketCreate, recaptcha_toke
         )
         await db.support_tickets.insert_one(ticket.dict())
         
-        logger.info(f"New support ticket created: {ticket_number}")
+        logger.info("New support ticket created: %s", ticket_number)
         
         # Send email notification
         email_service = await get_email_service()
@@ -447,33 +956,61 @@ async def create_support_ticket(ticket_data: SupportTicketCreate, recaptcha_toke
         raise HTTPException(status_code=500, detail="Failed to create ticket")
 
 # Sitemap endpoint
-@api_router.get("/sitemap.xml", response_class=PlainTextResponse)
-async def get_sitemap():
-    """Generate sitemap.xml"""
+async def build_sitemap_cache():
+    """Build the sitemap and its chunks from the published pages, cached until content changes"""
+    generation = response_cache.generation()
     base_url = os.getenv("FRONTEND_URL", "https://your-domain.com")
     
-    sitemap = f"""<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    <url>
-        <loc>{base_url}/</loc>
-        <lastmod>{datetime.utcnow().strftime('%Y-%m-%d')}</lastmod>
-        <changefreq>weekly</changefreq>
-        <priority>1.0</priority>
-    </url>
-    <url>
-        <loc>{base_url}/admin/login</loc>
-        <lastmod>{datetime.utcnow().strftime('%Y-%m-%d')}</lastmod>
-        <changefreq>monthly</changefreq>
-        <priority>0.3</priority>
-    </url>
-</urlset>"""
+    # Drafts are not public (their URLs 404), and a draft edit is not a change crawlers can see
+    pages = await db.page_content.find(
+        {"published_version": {"$ne": None}}, {"_id": 0, "page": 1, "published_at": 1}
+    ).sort("page", 1).to_list(None)
+    entries = [(f"{base_url}{page_path(doc['page'])}", doc.get("published_at")) for doc in pages]
     
-    return sitemap
+    root, chunks = build_sitemaps(entries, f"{base_url}/api/sitemaps/sitemap-{{}}.xml.gz", SITEMAP_MAX_URLS)
+    modified = latest(entries)
+    chunk_entries = [
+        response_cache.put_body(f"sitemap:{number}", chunk, generation=generation, last_modified=modified)
+        for number, chunk in enumerate(chunks, start=1)
+    ]
+    return response_cache.put_body("sitemap", root, generation=generation, last_modified=modified), chunk_entries
+
+@api_router.get("/sitemap.xml")
+async def get_sitemap(request: Request):
+    """Generate sitemap.xml (a sitemap index once there are many pages)"""
+    try:
+        cached = response_cache.get("sitemap")
+        if cached is None:
+            cached, _ = await build_sitemap_cache()
+        return cached_json_response(cached, request, "public, max-age=3600", media_type="application/xml")
+    except Exception as e:
+        logger.error(f"Error generating sitemap: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to generate sitemap")
+
+@api_router.get("/sitemaps/sitemap-{number:int}.xml.gz")
+async def get_sitemap_chunk(number: int, request: Request):
+    """One gzip-compressed chunk of a sitemap index"""
+    try:
+        cached = response_cache.get(f"sitemap:{number}")
+        if cached is None:
+            _, chunks = await build_sitemap_cache()
+            cached = chunks[number - 1] if 0 < number <= len(chunks) else None
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Sitemap not found")
+        
+        return cached_json_response(cached, request, "public, max-age=3600", media_type="application/gzip")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error serving sitemap chunk: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to serve sitemap")
 
 # Admin Authentication Routes
 @api_router.post("/admin/login", response_model=AdminLoginResponse)
-async def admin_login(credentials: AdminLogin):
+async def admin_login(credentials: AdminLogin, request: Request):
     """Admin login endpoint"""
+    await rate_limiter.check(request, "admin_login", credentials.username)
+    
     admin = await db.admins.find_one({"username": credentials.username})
     
     if not admin or not verify_password(credentials.password, admin["password_hash"]):
@@ -492,7 +1029,7 @@ async def admin_login(credentials: AdminLogin):
     )
 
 # Admin Protected Routes - Contact Submissions
-@api_router.get("/admin/submissions")
+@api_router.get("/admin/submissions", response_model=SubmissionListResponse)
 async def get_all_submissions(
     status: Optional[str] = None,
     current_admin: dict = Depends(get_current_admin)
@@ -503,16 +1040,13 @@ async def get_all_submissions(
         if status:
             query["status"] = status
         
-        submissions = await db.contact_submissions.find(query).sort("created_at", -1).to_list(1000)
-        
-        for submission in submissions:
-            submission["_id"] = str(submission["_id"])
+        submissions = await db.contact_submissions.find(query, SUBMISSION_PROJECTION).sort("created_at", -1).to_list(1000)
         
-        return {
+        return ModelJSONResponse(SubmissionListResponse, {
             "success": True,
             "count": len(submissions),
             "submissions": submissions
-        }
+        })
     except Exception as e:
         logger.error(f"Error fetching submissions: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch submissions")
@@ -592,8 +1126,46 @@ async def get_admin_stats(current_admin: dict = Depends(get_current_admin)):
         logger.error(f"Error fetching stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch statistics")
 
+@api_router.get("/admin/recaptcha-stats")
+async def get_recaptcha_stats(current_admin: dict = Depends(get_current_admin)):
+    """Get reCAPTCHA verification metrics for this worker (Admin only)"""
+    return {"success": True, "recaptcha": recaptcha_verifier.stats()}
+
+@api_router.get("/admin/rate-limits")
+async def get_rate_limit_stats(current_admin: dict = Depends(get_current_admin)):
+    """Get rate limiter counters for this worker (Admin only)"""
+    return {"success": True, "rate_limits": rate_limiter.stats()}
+
+@api_router.post("/admin/profile")
+async def profile_worker(
+    seconds: float = 10,
+    interval_ms: float = 10,
+    format: str = "collapsed",
+    all_threads: bool = False,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Sample this worker's stacks for a few seconds; collapsed stacks or speedscope JSON (Admin only)"""
+    if format not in ("collapsed", "speedscope"):
+        raise HTTPException(status_code=400, detail="Format must be collapsed or speedscope")
+    try:
+        # The loop thread runs the handlers; executor threads (Motor, uploads) only on request
+        thread_ids = None if all_threads else [threading.get_ident()]
+        counts = await asyncio.to_thread(profiler.sample, seconds, interval_ms / 1000, thread_ids)
+        logger.info("Profiled worker %d for %ss by %s", os.getpid(), seconds, current_admin['username'])
+        if format == "speedscope":
+            return FastJSONResponse(
+                profiler.speedscope(counts, interval_ms / 1000, f"worker {os.getpid()}"),
+                headers={"Content-Disposition": f'attachment; filename="profile-{os.getpid()}.speedscope.json"'}
+            )
+        return Response(content=profiler.collapsed(counts), media_type="text/plain")
+    except profiler.ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+    except Exception as e:
+        logger.error(f"Error profiling worker: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to profile worker")
+
 # Admin Protected Routes - Support Tickets
-@api_router.get("/admin/tickets")
+@api_router.get("/admin/tickets", response_model=TicketListResponse)
 async def get_all_tickets(
     status: Optional[str] = None,
     current_admin: dict = Depends(get_current_admin)
@@ -604,33 +1176,35 @@ async def get_all_tickets(
         if status:
             query["status"] = status
         
-        tickets = await db.support_tickets.find(query).sort("created_at", -1).to_list(1000)
+        # Summaries only: replies are counted in the database and loaded with the ticket detail
+        tickets = await db.support_tickets.aggregate([
+            {"$match": query},
+            {"$sort": {"created_at": -1}},
+            {"$limit": 1000},
+            {"$project": TICKET_SUMMARY_PROJECTION}
+        ]).to_list(1000)
         
-        for ticket in tickets:
-            ticket["_id"] = str(ticket["_id"])
-        
-        return {
+        return ModelJSONResponse(TicketListResponse, {
             "success": True,
             "count": len(tickets),
             "tickets": tickets
-        }
+        })
     except Exception as e:
         logger.error(f"Error fetching tickets: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch tickets")
 
-@api_router.get("/admin/tickets/{ticket_id}")
+@api_router.get("/admin/tickets/{ticket_id}", response_model=TicketResponse)
 async def get_ticket(
     ticket_id: str,
     current_admin: dict = Depends(get_current_admin)
 ):
     """Get single ticket details (Admin only)"""
     try:
-        ticket = await db.support_tickets.find_one({"id": ticket_id})
+        ticket = await db.support_tickets.find_one({"id": ticket_id}, TICKET_PROJECTION)
         if not ticket:
             raise HTTPException(status_code=404, detail="Ticket not found")
         
-        ticket["_id"] = str(ticket["_id"])
-        return {"success": True, "ticket": ticket}
+        return ModelJSONResponse(TicketResponse, {"success": True, "ticket": ticket})
     except Exception as e:
         logger.error(f"Error fetching ticket: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch ticket")
@@ -719,17 +1293,24 @@ async def delete_ticket(
         raise HTTPException(status_code=500, detail="Failed to delete ticket")
 
 # Admin Protected Routes - Settings
-@api_router.get("/admin/settings")
+@api_router.get("/admin/settings", response_model=SettingsResponse)
 async def get_settings(current_admin: dict = Depends(get_current_admin)):
-    """Get system settings (Admin only)"""
+    """Get system settings without secrets (Admin only)"""
     try:
-        settings = await db.settings.find_one()
-        if not settings:
-            settings = SystemSettings().dict()
-        else:
-            settings["_id"] = str(settings["_id"])
-        
-        return {"success": True, "settings": settings}
+        settings = await db.settings.find_one({}, {"_id": 0}) or SystemSettings().dict()
+        email = settings.get("email_settings") or {}
+        recaptcha = settings.get("recaptcha_settings") or {}
+        
+        # The view models drop smtp_password and secret_key; only whether they are set is reported
+        view = SettingsView(
+            email_settings={**email, "smtp_password_set": bool(email.get("smtp_password"))},
+            seo_settings=settings.get("seo_settings") or SEOSettings(),
+            branding=settings.get("branding") or DEFAULT_BRANDING,
+            recaptcha_settings={**recaptcha, "secret_key_set": bool(recaptcha.get("secret_key"))},
+            updated_at=settings.get("updated_at"),
+            updated_by=settings.get("updated_by", "")
+        )
+        return ModelJSONResponse(SettingsResponse, {"success": True, "settings": view})
     except Exception as e:
         logger.error(f"Error fetching settings: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch settings")
@@ -749,6 +1330,8 @@ async def update_settings(
                 new_settings.email_settings = settings_update.email_settings
             if settings_update.seo_settings:
                 new_settings.seo_settings = settings_update.seo_settings
+            if settings_update.recaptcha_settings:
+                new_settings.recaptcha_settings = settings_update.recaptcha_settings.dict()
             new_settings.updated_by = current_admin["username"]
             
             await db.settings.insert_one(new_settings.dict())
@@ -756,11 +1339,25 @@ async def update_settings(
             update_data = {"updated_at": datetime.utcnow(), "updated_by": current_admin["username"]}
             if settings_update.email_settings:
                 update_data["email_settings"] = settings_update.email_settings.dict()
+                # The password is never sent to the client, so a blank one means "unchanged"
+                if not update_data["email_settings"]["smtp_password"]:
+                    update_data["email_settings"]["smtp_password"] = (
+                        existing_settings.get("email_settings") or {}
+                    ).get("smtp_password", "")
             if settings_update.seo_settings:
                 update_data["seo_settings"] = settings_update.seo_settings.dict()
+            if settings_update.recaptcha_settings:
+                update_data["recaptcha_settings"] = settings_update.recaptcha_settings.dict()
+                # Same for the reCAPTCHA secret
+                if not update_data["recaptcha_settings"]["secret_key"]:
+                    update_data["recaptcha_settings"]["secret_key"] = (
+                        existing_settings.get("recaptcha_settings") or {}
+                    ).get("secret_key", "")
             
             await db.settings.update_one({}, {"$set": update_data})
         
+        await invalidate_settings_cache()
+        
         return {"success": True, "message": "Settings updated successfully"}
     except Exception as e:
         logger.error(f"Error updating settings: {str(e)}")
@@ -798,42 +1395,21 @@ async def test_email_settings(current_admin: dict = Depends(get_current_admin)):
 # File Upload Routes (Admin)
 @api_router.post("/admin/upload-logo")
 async def upload_logo(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_admin: dict = Depends(get_current_admin)
 ):
     """Upload logo image (Admin only)"""
     try:
-        # Validate file type
-        allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp', 'image/svg+xml']
-        
-        content_type = file.content_type
-        if content_type not in allowed_types:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid file type: {content_type}. Supported: JPG, PNG, WebP, SVG"
-            )
-        
-        # Validate file size (max 5MB)
-        file_content = await file.read()
-        if len(file_content) > 5 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="File size must be less than 5MB")
-        
-        # Reset file pointer
-        await file.seek(0)
-        
-        # Determine file extension
-        if content_type == 'image/svg+xml':
-            file_extension = 'svg'
-        else:
-            file_extension = file.filename.split('.')[-1].lower()
-        
-        # Generate unique filename
-        unique_filename = f"logo_{uuid_lib.uuid4()}.{file_extension}"
-        file_path = UPLOAD_DIR / unique_filename
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream to disk, validating type (JPG, PNG, WebP, SVG) and size (max 5MB)
+        unique_filename = await save_upload(
+            file,
+            UPLOAD_DIR,
+            "logo",
+            allowed_types=["jpeg", "png", "webp", "svg"],
+            max_bytes=LOGO_MAX_BYTES,
+            tmp_dir=UPLOAD_TMP_DIR
+        )
         
         # Generate URL
         file_url = f"/static/uploads/{unique_filename}"
@@ -843,15 +1419,20 @@ async def upload_logo(
         if settings:
             branding = settings.get('branding', {})
             branding['logo_url'] = file_url
+            branding.pop('logo_variants', None)
+            branding.pop('logo_srcset', None)
             await db.settings.update_one(
                 {},
                 {"$set": {"branding": branding, "updated_at": datetime.utcnow()}}
             )
         
         # Clear cache
-        clear_cache()
+        await invalidate_settings_cache()
+        
+        # Resized, WebP/AVIF and precompressed copies are built after the response is sent
+        background_tasks.add_task(attach_image_variants, "logo", unique_filename)
         
-        logger.info(f"Logo uploaded: {unique_filename}")
+        logger.info("Logo uploaded: %s", unique_filename)
         return {
             "success": True, 
             "url": file_url, 
@@ -866,45 +1447,21 @@ async def upload_logo(
 
 @api_router.post("/admin/upload-favicon")
 async def upload_favicon(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_admin: dict = Depends(get_current_admin)
 ):
     """Upload favicon image (Admin only)"""
     try:
-        # Validate file type - accept more formats
-        allowed_types = [
-            'image/x-icon', 
-            'image/vnd.microsoft.icon', 
-            'image/png', 
-            'image/jpeg', 
-            'image/jpg',
-            'image/gif',
-            'image/svg+xml'
-        ]
-        
-        # Check content type
-        content_type = file.content_type
-        if content_type not in allowed_types:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid file type: {content_type}. Supported: ICO, PNG, JPG, GIF, SVG"
-            )
-        
-        # Determine file extension
-        if content_type in ['image/x-icon', 'image/vnd.microsoft.icon']:
-            file_extension = 'ico'
-        elif content_type == 'image/svg+xml':
-            file_extension = 'svg'
-        else:
-            file_extension = file.filename.split('.')[-1].lower()
-        
-        # Generate unique filename
-        unique_filename = f"favicon_{uuid_lib.uuid4()}.{file_extension}"
-        file_path = UPLOAD_DIR / unique_filename
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream to disk, validating type (ICO, PNG, JPG, GIF, SVG) and size (max 1MB)
+        unique_filename = await save_upload(
+            file,
+            UPLOAD_DIR,
+            "favicon",
+            allowed_types=["ico", "png", "jpeg", "gif", "svg"],
+            max_bytes=FAVICON_MAX_BYTES,
+            tmp_dir=UPLOAD_TMP_DIR
+        )
         
         # Generate URL (relative to match backend serving)
         file_url = f"/static/uploads/{unique_filename}"
@@ -914,15 +1471,19 @@ async def upload_favicon(
         if settings:
             branding = settings.get('branding', {})
             branding['favicon_url'] = file_url
+            branding.pop('favicon_variants', None)
             await db.settings.update_one(
                 {},
                 {"$set": {"branding": branding, "updated_at": datetime.utcnow()}}
             )
         
         # Clear cache
-        clear_cache()
+        await invalidate_settings_cache()
+        
+        # Multi-size ICO, PNG icons and precompressed copies are built after the response is sent
+        background_tasks.add_task(attach_image_variants, "favicon", unique_filename)
         
-        logger.info(f"Favicon uploaded: {unique_filename}")
+        logger.info("Favicon uploaded: %s", unique_filename)
         return {
             "success": True, 
             "url": file_url, 
@@ -935,27 +1496,42 @@ async def upload_favicon(
         logger.error(f"Error uploading favicon: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to upload favicon: {str(e)}")
 
+@api_router.post("/admin/uploads/gc")
+async def collect_upload_garbage(current_admin: dict = Depends(get_current_admin)):
+    """Delete uploaded files no longer referenced by branding (Admin only)"""
+    try:
+        deleted = await gc_uploads()
+        return {"success": True, "deleted": deleted, "count": len(deleted)}
+    except Exception as e:
+        logger.error(f"Error collecting upload garbage: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to clean up uploads")
+
 # Content Management Routes (Admin)
 @api_router.get("/admin/content/{page}")
 async def get_admin_page_content(page: str, current_admin: dict = Depends(get_current_admin)):
     """Get page content for editing (Admin only)"""
     try:
-        content = await db.page_content.find_one({"page": page})
+        content = await db.page_content.find_one({"page": page}, {"_id": 0})
         if not content:
             return {"success": False, "message": "Content not found", "content": None}
         
-        content["_id"] = str(content["_id"])
-        return {"success": True, "content": content}
+        return FastJSONResponse({"success": True, "content": content})
     except Exception as e:
         logger.error(f"Error fetching content: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch content")
 
+# Sections of PageContent that editors may change
+EDITABLE_CONTENT_FIELDS = (
+    "hero", "about", "services", "menu_items", "process_steps", "industries", "footer", "cta_section"
+)
+CONTENT_CONFLICT_MESSAGE = "Content was changed by someone else. Reload to get their changes."
+
 @api_router.put("/admin/content")
 async def update_page_content(
     content_update: ContentUpdate,
     current_admin: dict = Depends(get_current_admin)
 ):
-    """Update page content (Admin only)"""
+    """Update draft page content (Admin only); published pages change on publish"""
     try:
         existing_content = await db.page_content.find_one({"page": content_update.page})
         
@@ -983,34 +1559,149 @@ async def update_page_content(
             update_data["cta_section"] = content_update.cta_section
         
         if existing_content:
-            result = await db.page_content.update_one(
-                {"page": content_update.page},
-                {"$set": update_data}
+            query = {"page": content_update.page}
+            if content_update.version is not None:
+                query["version"] = content_update.version
+            updated = await db.page_content.find_one_and_update(
+                query,
+                {"$set": update_data, "$inc": {"version": 1}},
+                projection={"version": 1},
+                return_document=ReturnDocument.AFTER
             )
-            if result.modified_count == 0:
-                return {"success": False, "message": "No changes made"}
+            if not updated:
+                raise HTTPException(status_code=409, detail=CONTENT_CONFLICT_MESSAGE)
+            version = updated["version"]
         else:
             # Create new content
             new_content = PageContent(page=content_update.page, **update_data)
             await db.page_content.insert_one(new_content.dict())
+            version = new_content.version
         
-        # Clear cache when content is updated
-        clear_cache()
+        # Clear caches when content is updated, in this and every other worker
+        await cache_invalidator.publish(f"page:{content_update.page}")
         
-        return {"success": True, "message": "Content updated successfully"}
+        return {"success": True, "message": "Content updated successfully", "version": version}
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error updating content: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update content")
 
-@api_router.get("/admin/content-list")
+@api_router.patch("/admin/content")
+async def patch_page_content(
+    content_patch: ContentPatch,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Apply field-level edits to draft page content (Admin only)"""
+    try:
+        if not content_patch.operations:
+            raise HTTPException(status_code=400, detail="No operations given")
+        
+        # Only the sections being edited are read and validated
+        sections = {parse_path(operation.path)[0] for operation in content_patch.operations}
+        existing_content = await db.page_content.find_one(
+            {"page": content_patch.page},
+            {**{section: 1 for section in sections}, "version": 1}
+        )
+        if not existing_content:
+            raise HTTPException(status_code=404, detail="Content not found")
+        if existing_content.get("version") != content_patch.version:
+            raise HTTPException(status_code=409, detail=CONTENT_CONFLICT_MESSAGE)
+        
+        update, _ = build_update(
+            existing_content, content_patch.operations, PageContent, EDITABLE_CONTENT_FIELDS
+        )
+        update.setdefault("$set", {}).update({
+            "updated_at": datetime.utcnow(),
+            "updated_by": current_admin["username"],
+            "version": content_patch.version + 1
+        })
+        
+        # The version in the filter makes the read-check-write atomic against other editors
+        result = await db.page_content.update_one(
+            {"page": content_patch.page, "version": content_patch.version},
+            update
+        )
+        if result.matched_count == 0:
+            raise HTTPException(status_code=409, detail=CONTENT_CONFLICT_MESSAGE)
+        
+        await cache_invalidator.publish(f"page:{content_patch.page}")
+        
+        return {"success": True, "message": "Content updated successfully", "version": content_patch.version + 1}
+    except PatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error patching content: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update content")
+
+@api_router.post("/admin/content/{page}/publish")
+async def publish_page_content(page: str, current_admin: dict = Depends(get_current_admin)):
+    """Publish the current draft as a new immutable snapshot (Admin only)"""
+    try:
+        version = await publish_page_snapshot(page, current_admin["username"])
+        if version is None:
+            raise HTTPException(status_code=404, detail="Content not found")
+        
+        logger.info("Published %s version %d", page, version)
+        return {"success": True, "message": "Content published successfully", "version": version}
+    except HTTPException as e:
+        raise e
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Another publish is in progress, please retry")
+    except Exception as e:
+        logger.error(f"Error publishing content: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to publish content")
+
+@api_router.get("/admin/content/{page}/versions")
+async def get_page_versions(page: str, current_admin: dict = Depends(get_current_admin)):
+    """List published snapshots of a page (Admin only)"""
+    try:
+        versions = await db.page_snapshots.find(
+            {"page": page},
+            {"_id": 0, "version": 1, "published_at": 1, "published_by": 1}
+        ).sort("version", -1).to_list(100)
+        content = await db.page_content.find_one({"page": page}, {"published_version": 1})
+        
+        return {
+            "success": True,
+            "published_version": content.get("published_version") if content else None,
+            "versions": versions
+        }
+    except Exception as e:
+        logger.error(f"Error fetching page versions: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch versions")
+
+@api_router.post("/admin/content/{page}/rollback")
+async def rollback_page_content(
+    page: str,
+    version: int,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Point the public page at an earlier snapshot (Admin only)"""
+    try:
+        snapshot = await db.page_snapshots.find_one({"page": page, "version": version}, {"_id": 1})
+        if not snapshot:
+            raise HTTPException(status_code=404, detail="Snapshot not found")
+        
+        await set_published_version(page, version, current_admin["username"])
+        
+        logger.info("Rolled back %s to version %d", page, version)
+        return {"success": True, "message": f"Rolled back to version {version}", "version": version}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error rolling back content: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to roll back content")
+
+@api_router.get("/admin/content-list", response_model=ContentListResponse)
 async def get_content_list(current_admin: dict = Depends(get_current_admin)):
     """Get list of all editable pages (Admin only)"""
     try:
-        pages = await db.page_content.find().to_list(100)
-        for page in pages:
-            page["_id"] = str(page["_id"])
+        pages = await db.page_content.find({}, PAGE_SUMMARY_PROJECTION).to_list(100)
         
-        return {"success": True, "pages": pages}
+        return ModelJSONResponse(ContentListResponse, {"success": True, "pages": pages})
     except Exception as e:
         logger.error(f"Error fetching content list: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch content list")
@@ -1018,6 +1709,12 @@ async def get_content_list(current_admin: dict = Depends(get_current_admin)):
 # Include the router in the main app
 app.include_router(api_router)
 
+# Oversized uploads are refused before the multipart parser writes them to a temp file
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={"/api/admin/upload-logo": LOGO_MAX_BYTES, "/api/admin/upload-favicon": FAVICON_MAX_BYTES}
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -1026,35 +1723,101 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add database indexes for better performance
+# Server-Timing breakdown for admins sending X-Server-Timing; inside the DB accounting so it can report Mongo time
+app.add_middleware(ServerTimingMiddleware, authorize=lambda token: verify_token(token) is not None)
+
+# Per-request Mongo time and call counts by route
+app.add_middleware(QueryAccountingMiddleware)
+
+# Request ids and access lines; outside the DB accounting so slow-query logs carry the request id
+app.add_middleware(RequestLogMiddleware, sample_rate=LOG_SAMPLE_RATE)
+
+# Outermost, so latency includes every other middleware
+app.add_middleware(MetricsMiddleware)
+
+# Database indexes, one create_indexes round trip per collection
+INDEXES = {
+    "contact_submissions": [IndexModel("created_at"), IndexModel("status"), IndexModel("email")],
+    "support_tickets": [
+        IndexModel("ticket_number"), IndexModel("customer_email"), IndexModel("status"), IndexModel("created_at")
+    ],
+    "page_content": [IndexModel("page", unique=True)],
+    "page_snapshots": [IndexModel([("page", 1), ("version", -1)], unique=True)],
+    # Shared rate limit buckets expire once fully refilled
+    "rate_limits": [IndexModel("expires_at", expireAfterSeconds=0)],
+    # Snapshots of workers that stopped publishing expire
+    "metrics_workers": [IndexModel("updated_at", expireAfterSeconds=600)],
+}
+
 async def create_indexes():
     """Create database indexes for better query performance"""
     try:
-        # Contact submissions indexes
-        await db.contact_submissions.create_index("created_at")
-        await db.contact_submissions.create_index("status")
-        await db.contact_submissions.create_index("email")
-        
-        # Support tickets indexes
-        await db.support_tickets.create_index("ticket_number")
-        await db.support_tickets.create_index("customer_email")
-        await db.support_tickets.create_index("status")
-        await db.support_tickets.create_index("created_at")
-        
-        # Page content index
-        await db.page_content.create_index("page", unique=True)
-        
+        await asyncio.gather(*(db[name].create_indexes(models) for name, models in INDEXES.items()))
         logger.info("Database indexes created successfully")
     except Exception as e:
         logger.warning(f"Index creation warning: {str(e)}")
+        # Fails the step, so the schema marker stays put and the migration is retried
+        raise
+
+async def migrate_schema() -> bool:
+    """One migration attempt; False while it has to be retried"""
+    global _schema_ready
+    try:
+        # Skipped entirely once this schema version is installed; otherwise one worker runs it under a lease
+        status = await run_migrations(
+            db.schema_meta,
+            SCHEMA_VERSION,
+            {"admin": ensure_admin, "settings": ensure_settings, "pages": ensure_pages, "indexes": create_indexes}
+        )
+    except Exception as e:
+        # Mongo unreachable: keep serving what can be served, not ready until this succeeds
+        logger.error(f"Schema migration check failed: {str(e)}")
+        return False
+    # "running": another worker holds the lease; "failed": a step failed and the marker was not bumped
+    _schema_ready = status in ("current", "migrated")
+    if not _schema_ready:
+        logger.warning(
+            "Schema version %d not installed (%s), retrying in %.0fs", SCHEMA_VERSION, status, MIGRATION_RETRY_SECONDS
+        )
+    return _schema_ready
+
+async def run_schema_migrations():
+    """Retry the migration until this worker's schema version is installed"""
+    while True:
+        await asyncio.sleep(MIGRATION_RETRY_SECONDS)
+        if await migrate_schema():
+            return
 
-@app.on_event("startup")
 async def startup_event():
-    await init_defaults()
-    await create_indexes()
+    global _upload_gc_task, _cache_sync_task, _metrics_task, _watchdog_task, _precompress_task, _warmup_task
+    global _migration_task
+    # A previous lifespan in this process (tests) may have drained
+    set_draining(False)
+    connect_database()
+    _watchdog_task = asyncio.create_task(loop_watchdog.run())
+    await recaptcha_verifier.start()
+    # Startup never fails on Mongo; until the schema is installed the worker serves but reports not ready
+    _migration_task = None if await migrate_schema() else asyncio.create_task(run_schema_migrations())
+    _upload_gc_task = asyncio.create_task(run_upload_gc())
+    _cache_sync_task = asyncio.create_task(cache_invalidator.run())
+    _metrics_task = asyncio.create_task(metrics_publisher.run())
+    _precompress_task = asyncio.create_task(asyncio.to_thread(precompress_directory, UPLOAD_DIR))
+    # Serves (and answers /healthz) right away; /readyz turns ready when this finishes
+    _warmup_task = asyncio.create_task(warmup.run())
     logger.info("Application started")
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
+async def shutdown_event():
+    # Already set on SIGTERM under run.py; plain uvicorn only gets here after the drain
+    set_draining()
+    for task in (_upload_gc_task, _cache_sync_task, _metrics_task, _watchdog_task, _warmup_task, _migration_task):
+        if task:
+            task.cancel()
+    loop_watchdog.stop()
+    try:
+        await metrics_publisher.withdraw()
+    except Exception as e:
+        logger.warning(f"Metrics withdraw warning: {str(e)}")
+    await recaptcha_verifier.close()
+    shutdown_pool()
     client.close()
     logger.info("Application shutdown")
@@ -0,0 +1,100 @@
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from query_monitor import current_db_stats
+
+# Request header that asks for a Server-Timing breakdown (honoured only with a valid admin token)
+TIMING_HEADER = b"x-server-timing"
+
+
+class ServerTimings:
+    """Accumulated time per phase of one request"""
+
+    __slots__ = ("started", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float):
+        phase = self.phases.setdefault(name, [0.0, 0])
+        phase[0] += seconds
+        phase[1] += 1
+
+    def header(self) -> str:
+        entries = [
+            f'{name};dur={seconds * 1000:.2f};desc="{count}x"' for name, (seconds, count) in self.phases.items()
+        ]
+        stats = current_db_stats.get()
+        if stats is not None:
+            entries.append(f'db;dur={stats.seconds * 1000:.2f};desc="{stats.calls} queries"')
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+current_timings: ContextVar[Optional[ServerTimings]] = ContextVar("current_timings", default=None)
+
+
+class timed:
+    """Time a block as a Server-Timing phase; a no-op unless the request asked for timings"""
+
+    __slots__ = ("name", "timings", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = current_timings.get()
+        if self.timings is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def _bearer(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" else None
+    return None
+
+
+class ServerTimingMiddleware:
+    """Adds a Server-Timing header for admins who send X-Server-Timing"""
+
+    def __init__(self, app: ASGIApp, authorize: Callable[[str], bool]):
+        self.app = app
+        self.authorize = authorize
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not any(name == TIMING_HEADER for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        token = _bearer(scope)
+        if not token or not self.authorize(token):
+            await self.app(scope, receive, send)
+            return
+
+        timings = ServerTimings()
+        context_token = current_timings.set(timings)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.header())
+                headers.append("Timing-Allow-Origin", "*")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timings.reset(context_token)
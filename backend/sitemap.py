@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+import gzip
+
+# Protocol limit per sitemap file
+MAX_URLS_PER_SITEMAP = 50000
+
+SitemapEntry = Tuple[str, Optional[datetime]]
+
+
+def _lastmod(value: Optional[datetime]) -> str:
+    return f"<lastmod>{value.strftime('%Y-%m-%dT%H:%M:%S+00:00')}</lastmod>" if value else ""
+
+
+def build_urlset(entries: Sequence[SitemapEntry]) -> bytes:
+    """A <urlset> sitemap of (loc, lastmod) entries"""
+    urls = "".join(f"<url><loc>{escape(loc)}</loc>{_lastmod(lastmod)}</url>\n" for loc, lastmod in entries)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{urls}</urlset>\n'
+    ).encode()
+
+
+def build_index(sitemaps: Sequence[SitemapEntry]) -> bytes:
+    """A <sitemapindex> pointing at chunked sitemaps"""
+    items = "".join(
+        f"<sitemap><loc>{escape(loc)}</loc>{_lastmod(lastmod)}</sitemap>\n" for loc, lastmod in sitemaps
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{items}</sitemapindex>\n'
+    ).encode()
+
+
+def latest(entries: Sequence[SitemapEntry]) -> Optional[datetime]:
+    return max((lastmod for _, lastmod in entries if lastmod), default=None)
+
+
+def build_sitemaps(
+    entries: Sequence[SitemapEntry],
+    chunk_url: str,
+    max_urls: int = MAX_URLS_PER_SITEMAP
+) -> Tuple[bytes, List[bytes]]:
+    """The root sitemap, plus gzip-compressed chunks once there are more than max_urls entries"""
+    # Small sites get a plain urlset; chunk_url is formatted with the 1-based chunk number
+    if len(entries) <= max_urls:
+        return build_urlset(entries), []
+
+    chunks = [entries[i:i + max_urls] for i in range(0, len(entries), max_urls)]
+    index = build_index([(chunk_url.format(n), latest(chunk)) for n, chunk in enumerate(chunks, start=1)])
+    return index, [gzip.compress(build_urlset(chunk), mtime=0) for chunk in chunks]
@@ -0,0 +1,262 @@
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+import gzip
+import mimetypes
+import os
+import re
+import stat
+
+import anyio
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from images import MODERN_FORMATS
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz sidecars are written
+    brotli = None
+
+# Python's mimetypes table predates these formats
+mimetypes.add_type("image/avif", ".avif")
+mimetypes.add_type("image/webp", ".webp")
+
+NEGOTIABLE_EXTENSIONS: Tuple[str, ...] = (".jpg", ".jpeg", ".png", ".gif")
+
+# Formats worth compressing; raster images are already compressed
+COMPRESSIBLE_EXTENSIONS: Tuple[str, ...] = (".svg", ".ico", ".xml", ".txt", ".json", ".css", ".js", ".html")
+
+# Sidecar suffix per content coding, in order of preference
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+# Uploads named by content hash (see uploads.save_upload) never change
+CONTENT_ADDRESSED = re.compile(r"^[a-z]+_[0-9a-f]{32}[._]")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single "bytes=" range into inclusive (start, end); None means serve everything"""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start, sep, end = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not start:
+            suffix = int(end)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - suffix, 0), size - 1
+        first = int(start)
+        last = int(end) if end else size - 1
+    except ValueError:
+        return None
+
+    if first >= size:
+        raise RangeNotSatisfiable()
+    if first > last:
+        return None
+    return first, min(last, size - 1)
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """Content codings from Accept-Encoding, ignoring those sent with q=0"""
+    codings = []
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding.strip():
+            codings.append(coding.strip().lower())
+    return codings
+
+
+def write_precompressed(paths: Iterable[Path]):
+    """Write .gz (and .br when brotli is installed) sidecars next to each file"""
+    for path in paths:
+        data = path.read_bytes()
+        sidecars = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            sidecars.append((".br", brotli.compress(data, quality=11)))
+        for suffix, compressed in sidecars:
+            if len(compressed) >= len(data):
+                continue
+            target = path.with_name(path.name + suffix)
+            tmp_path = path.with_name(f".{target.name}.part")
+            tmp_path.write_bytes(compressed)
+            os.replace(tmp_path, target)
+
+
+def precompress_directory(directory: Path):
+    """Write sidecars for compressible files that do not have them yet (e.g. older uploads)"""
+    write_precompressed(
+        path for path in directory.iterdir()
+        if path.is_file()
+        and not path.name.startswith(".")
+        and path.suffix in COMPRESSIBLE_EXTENSIONS
+        and not path.with_name(path.name + ".gz").exists()
+    )
+
+
+class StaticFileResponse(FileResponse):
+    """FileResponse with single byte-range support and zero-copy sends where the server offers them"""
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        headers: Optional[dict] = None,
+        media_type: Optional[str] = None,
+        byte_range: Optional[Tuple[int, int]] = None
+    ):
+        super().__init__(
+            path,
+            status_code=206 if byte_range else 200,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result
+        )
+        self.byte_range = byte_range
+        self.headers["accept-ranges"] = "bytes"
+        if byte_range:
+            start, end = byte_range
+            self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+            self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        count = end - start + 1
+        extensions = scope.get("extensions") or {}
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if scope["method"].upper() == "HEAD" or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            # Server-side sendfile(2)
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send({"type": "http.response.zerocopysend", "file": file, "offset": start, "count": count})
+            finally:
+                file.close()
+        elif "http.response.pathsend" in extensions and self.byte_range is None:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class NegotiatingStaticFiles(StaticFiles):
+    """Static files with format/encoding negotiation, long-lived caching and Range support"""
+
+    async def _lookup_file(self, path: str):
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if stat_result and stat.S_ISREG(stat_result.st_mode):
+            return full_path, stat_result
+        return None, None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        request_headers = Headers(scope=scope)
+        name, extension = os.path.splitext(path)
+        extension = extension.lower()
+        vary = []
+        full_path = None
+
+        # Serve an AVIF/WebP sibling of a JPEG/PNG when the client accepts it
+        if extension in NEGOTIABLE_EXTENSIONS:
+            vary.append("Accept")
+            accept = request_headers.get("accept", "")
+            for fmt, media_type in MODERN_FORMATS.items():
+                if media_type in accept:
+                    full_path, stat_result = await self._lookup_file(f"{name}.{fmt}")
+                    if full_path:
+                        break
+
+        if full_path is None:
+            full_path, stat_result = await self._lookup_file(path)
+        if full_path is None:
+            return await super().get_response(path, scope)
+
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+
+        # Prebuilt .br/.gz sidecar chosen by Accept-Encoding
+        encoding = None
+        if extension in COMPRESSIBLE_EXTENSIONS:
+            vary.append("Accept-Encoding")
+            codings = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for coding, suffix in PRECOMPRESSED:
+                if coding in codings:
+                    sidecar_path, sidecar_stat = await self._lookup_file(path + suffix)
+                    if sidecar_path:
+                        full_path, stat_result, encoding = sidecar_path, sidecar_stat, coding
+                        break
+
+        headers = {
+            "cache-control": (
+                IMMUTABLE_CACHE_CONTROL if CONTENT_ADDRESSED.match(os.path.basename(path)) else DEFAULT_CACHE_CONTROL
+            )
+        }
+        if vary:
+            headers["vary"] = ", ".join(vary)
+        if encoding:
+            headers["content-encoding"] = encoding
+
+        response = StaticFileResponse(full_path, stat_result, headers=headers, media_type=media_type)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        # Byte ranges only apply to the identity representation
+        range_header = request_headers.get("range")
+        if range_header and encoding is None:
+            if_range = request_headers.get("if-range")
+            if if_range is None or if_range == response.headers["etag"]:
+                try:
+                    byte_range = parse_range(range_header, stat_result.st_size)
+                except RangeNotSatisfiable:
+                    return Response(
+                        status_code=416,
+                        headers={"content-range": f"bytes */{stat_result.st_size}", **headers}
+                    )
+                if byte_range:
+                    response = StaticFileResponse(
+                        full_path, stat_result, headers=headers, media_type=media_type, byte_range=byte_range
+                    )
+
+        return response
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip responses except under paths that handle their own encoding (and ranges)"""
+
+    def __init__(self, app: ASGIApp, exclude_prefixes: Tuple[str, ...] = (), **options):
+        super().__init__(app, **options)
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Make the backend modules importable when pytest runs from the repo or backend root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
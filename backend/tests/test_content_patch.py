@@ -0,0 +1,98 @@
+"""
+Field-level content patch tests (no running server required)
+"""
+import pytest
+
+from content_patch import PatchError, build_update, parse_path
+from models import ContentPatchOperation, PageContent
+
+EDITABLE = ("hero", "services", "cta_section")
+
+
+def op(op, path, value=None):
+    return ContentPatchOperation(op=op, path=path, value=value)
+
+
+def service(id, title="Title"):
+    return {"id": id, "title": title, "description": "d", "features": [], "image": "i"}
+
+
+@pytest.fixture
+def document():
+    return {
+        "page": "homepage",
+        "version": 3,
+        "hero": {"headline": "Old", "subheadline": "Sub", "cta_primary": "a", "cta_secondary": "b", "stats": []},
+        "services": [service(1), service(2), service(3)],
+        "cta_section": {"headline": "Go"},
+    }
+
+
+class TestParsePath:
+    """Path parsing and validation"""
+
+    def test_pointer_and_dotted(self):
+        assert parse_path("/services/2/title") == ["services", "2", "title"]
+        assert parse_path("services.2.title") == ["services", "2", "title"]
+        assert parse_path("/cta_section/a~1b") == ["cta_section", "a/b"]
+
+    @pytest.mark.parametrize("path", ["", "/", "hero..headline", "/cta_section/$where", "/cta_section/a.b"])
+    def test_rejects_unsafe_paths(self, path):
+        with pytest.raises(PatchError):
+            parse_path(path)
+
+
+class TestBuildUpdate:
+    """Patch operations translated to Mongo updates"""
+
+    def test_replace_leaf_sets_only_that_field(self, document):
+        update, patched = build_update(document, [op("replace", "/services/1/title", "Fixed")], PageContent, EDITABLE)
+        assert update == {"$set": {"services.1.title": "Fixed"}}
+        assert patched["services"][1]["title"] == "Fixed"
+
+    def test_append_and_insert_push(self, document):
+        update, _ = build_update(document, [op("add", "/services/-", service(4))], PageContent, EDITABLE)
+        assert update == {"$push": {"services": {"$each": [service(4)], "$position": 3}}}
+
+    def test_remove_list_item_pulls_it(self, document):
+        update, _ = build_update(document, [op("remove", "/services/0")], PageContent, EDITABLE)
+        assert update == {"$pull": {"services": service(1)}}
+
+    def test_remove_duplicate_item_rewrites_list(self, document):
+        document["services"].append(service(1))
+        update, patched = build_update(document, [op("remove", "/services/0")], PageContent, EDITABLE)
+        assert update == {"$set": {"services": patched["services"]}}
+        assert len(patched["services"]) == 3
+
+    def test_overlapping_operations_fold_into_ancestor(self, document):
+        operations = [op("add", "/services/0", service(9)), op("replace", "/services/1/title", "Shifted")]
+        update, patched = build_update(document, operations, PageContent, EDITABLE)
+        assert update == {"$set": {"services": patched["services"]}}
+        assert [s["id"] for s in patched["services"]] == [9, 1, 2, 3]
+        assert patched["services"][1]["title"] == "Shifted"
+
+    def test_free_form_dict_keys(self, document):
+        operations = [op("add", "/cta_section/button_text", "Start"), op("remove", "/cta_section/headline")]
+        update, _ = build_update(document, operations, PageContent, EDITABLE)
+        assert update == {"$set": {"cta_section.button_text": "Start"}, "$unset": {"cta_section.headline": ""}}
+
+    def test_value_is_validated_against_model(self, document):
+        with pytest.raises(PatchError):
+            build_update(document, [op("replace", "/services/0/id", "not a number")], PageContent, EDITABLE)
+        with pytest.raises(PatchError):
+            build_update(document, [op("add", "/services/-", {"title": "missing fields"})], PageContent, EDITABLE)
+
+    @pytest.mark.parametrize("operation", [
+        op("replace", "/version", 9),
+        op("replace", "/hero/unknown", "x"),
+        op("replace", "/services/7/title", "x"),
+        op("remove", "/hero/headline"),
+        op("replace", "/cta_section/missing", "x"),
+    ])
+    def test_rejects_invalid_operations(self, document, operation):
+        with pytest.raises(PatchError):
+            build_update(document, [operation], PageContent, EDITABLE)
+
+    def test_document_is_not_mutated(self, document):
+        build_update(document, [op("remove", "/services/0")], PageContent, EDITABLE)
+        assert len(document["services"]) == 3
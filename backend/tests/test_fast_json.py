@@ -0,0 +1,41 @@
+"""
+JSON response rendering tests (no running server required)
+"""
+from datetime import datetime
+
+import orjson
+import pytest
+from pydantic import ValidationError
+
+from fast_json import FastJSONResponse, ModelJSONResponse
+from models import SettingsResponse, TicketListResponse
+
+
+class TestModelJSONResponse:
+    """Response models enforced on directly returned responses"""
+
+    def test_drops_fields_outside_the_model(self):
+        response = ModelJSONResponse(SettingsResponse, {
+            "success": True,
+            "settings": {
+                "email_settings": {"smtp_host": "smtp.example.com", "smtp_password": "hunter2"},
+                "recaptcha_settings": {"site_key": "site", "secret_key": "secret", "secret_key_set": True}
+            }
+        })
+        body = orjson.loads(response.body)
+        assert "smtp_password" not in body["settings"]["email_settings"]
+        assert body["settings"]["recaptcha_settings"] == {"enabled": False, "site_key": "site", "secret_key_set": True}
+
+    def test_matches_orjson_output_for_valid_payloads(self):
+        payload = {"success": True, "count": 1, "tickets": [{
+            "id": "t1", "ticket_number": "TKT-000001", "customer_name": "Ada", "customer_email": "ada@example.com",
+            "category": "seo", "subject": "Help", "status": "open", "priority": "high",
+            "created_at": datetime(2026, 1, 2, 3, 4, 5, 123000), "updated_at": datetime(2026, 1, 2, 3, 4, 5),
+            "reply_count": 2
+        }]}
+        validated = orjson.loads(ModelJSONResponse(TicketListResponse, payload).body)
+        assert validated == orjson.loads(FastJSONResponse(payload).body)
+
+    def test_rejects_payloads_that_do_not_fit(self):
+        with pytest.raises(ValidationError):
+            ModelJSONResponse(TicketListResponse, {"success": True, "count": 1, "tickets": [{"id": "t1"}]})
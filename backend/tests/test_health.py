@@ -0,0 +1,111 @@
+"""
+Readiness checker unit tests (no running server required)
+"""
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from health import HealthChecker, Warmup, probe_router, set_draining
+
+
+def make_check(calls, ok=True, delay=0.0, **details):
+    async def check():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return ok, details
+    return check
+
+
+class TestHealthChecker:
+    """Check aggregation and caching"""
+
+    def test_ready_only_when_every_check_passes(self):
+        calls = []
+        checker = HealthChecker({"a": make_check(calls, ping_ms=1.5), "b": make_check(calls, ok=False)})
+        result = asyncio.run(checker.result())
+        assert result["ready"] is False
+        assert result["checks"]["a"]["ok"] and result["checks"]["a"]["ping_ms"] == 1.5
+        assert not result["checks"]["b"]["ok"]
+
+    def test_errors_and_timeouts_fail_the_check(self):
+        async def broken():
+            raise ConnectionError("no primary")
+
+        calls = []
+        checker = HealthChecker({"broken": broken, "slow": make_check(calls, delay=1)}, timeout=0.05)
+        checks = asyncio.run(checker.result())["checks"]
+        assert checks["broken"]["error"] == "no primary"
+        assert "timed out" in checks["slow"]["error"]
+
+    def test_results_are_cached_and_shared(self):
+        calls = []
+        checker = HealthChecker({"a": make_check(calls, delay=0.05)}, ttl=60)
+
+        async def scenario():
+            await asyncio.gather(*(checker.result() for _ in range(5)))
+            await checker.result()
+            checker.reset()
+            await checker.result()
+
+        asyncio.run(scenario())
+        assert len(calls) == 2
+
+
+class TestProbes:
+    """/healthz and /readyz through warm-up and shutdown"""
+
+    def make_client(self, warm):
+        warmup = Warmup(warm, retry_seconds=0.01)
+
+        async def check_caches():
+            return warmup.warmed, {}
+
+        app = FastAPI()
+        app.include_router(probe_router(HealthChecker({"caches": check_caches}, ttl=0)))
+        return TestClient(app), warmup
+
+    def test_ready_once_warm(self):
+        async def warm():
+            return 3
+
+        client, warmup = self.make_client(warm)
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["status"] == "not_ready"
+        assert client.get("/healthz").json() == {"status": "ok"}
+
+        asyncio.run(warmup.run())
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["checks"]["caches"]["ok"]
+
+    def test_warmup_retries_until_it_succeeds(self):
+        attempts = []
+
+        async def warm():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("no primary")
+            return 0
+
+        client, warmup = self.make_client(warm)
+        asyncio.run(warmup.run())
+        assert len(attempts) == 3
+        assert client.get("/readyz").status_code == 200
+
+    def test_draining_fails_readiness_but_not_liveness(self):
+        async def warm():
+            return 0
+
+        client, warmup = self.make_client(warm)
+        asyncio.run(warmup.run())
+        set_draining()
+        try:
+            response = client.get("/readyz")
+            assert response.status_code == 503
+            assert response.json()["status"] == "draining"
+            assert client.get("/healthz").status_code == 200
+        finally:
+            set_draining(False)
+        assert client.get("/readyz").status_code == 200
@@ -0,0 +1,55 @@
+"""
+Image derivative unit tests (no running server required)
+"""
+from PIL import Image
+
+from images import build_favicon_variants, build_logo_variants, build_srcset
+
+
+class TestLogoVariants:
+    """Resized and modern-format logo copies"""
+
+    def test_builds_heights_and_formats(self, tmp_path):
+        source = tmp_path / "logo_abc.jpg"
+        Image.new("RGB", (600, 400), "red").save(source, "JPEG")
+
+        variants = build_logo_variants(str(source))
+
+        assert {v["height"] for v in variants} == {48, 96, 192}
+        assert {v["format"] for v in variants} >= {"webp", "jpeg"}
+        for variant in variants:
+            with Image.open(tmp_path / variant["url"]) as image:
+                assert image.size == (variant["width"], variant["height"])
+        assert (tmp_path / "logo_abc.webp").exists()
+
+    def test_skips_upscaling(self, tmp_path):
+        source = tmp_path / "logo_small.png"
+        Image.new("RGBA", (100, 60)).save(source, "PNG")
+
+        variants = build_logo_variants(str(source))
+
+        assert {v["height"] for v in variants} == {48}
+        assert "png" in {v["format"] for v in variants}
+
+    def test_srcset_densities(self):
+        srcset = build_srcset([
+            {"url": "/a_h48.webp", "format": "webp", "height": 48},
+            {"url": "/a_h96.webp", "format": "webp", "height": 96},
+        ])
+        assert srcset == {"webp": "/a_h48.webp 1x, /a_h96.webp 2x"}
+
+
+class TestFaviconVariants:
+    """Multi-size ICO and PNG icon set"""
+
+    def test_builds_ico_and_pngs(self, tmp_path):
+        source = tmp_path / "favicon_abc.png"
+        Image.new("RGBA", (300, 200), "blue").save(source, "PNG")
+
+        variants = build_favicon_variants(str(source))
+
+        with Image.open(tmp_path / variants[0]["url"]) as ico:
+            assert ico.format == "ICO"
+            assert {(16, 16), (32, 32), (48, 48)} <= set(ico.info["sizes"])
+        with Image.open(tmp_path / "favicon_abc_180.png") as apple:
+            assert apple.size == (180, 180)
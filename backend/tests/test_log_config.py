@@ -0,0 +1,125 @@
+"""
+Structured logging unit tests (no running server required)
+"""
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from log_config import (
+    ContextFilter, DeferredQueueHandler, JSONFormatter, RequestLogMiddleware, configure_logging, request_context,
+    set_admin
+)
+
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestFormatting:
+    """JSON lines with request fields"""
+
+    def test_json_line_carries_request_context(self):
+        token = request_context.set({"request_id": "abc", "method": "GET", "path": "/x", "sampled": True})
+        try:
+            set_admin("admin")
+            record = make_record()
+            assert ContextFilter().filter(record)
+        finally:
+            request_context.reset(token)
+
+        entry = json.loads(JSONFormatter().format(record))
+        assert entry["message"] == "hello world"
+        assert entry["request_id"] == "abc"
+        assert entry["admin"] == "admin"
+        assert "sampled" not in entry
+        assert entry["ts"].endswith("Z")
+
+
+class TestQueueing:
+    """Records cross the queue unformatted"""
+
+    def test_traceback_is_formatted_by_the_listener(self):
+        stream = io.StringIO()
+        output = logging.StreamHandler(stream)
+        output.setFormatter(JSONFormatter())
+        handler = DeferredQueueHandler(queue.SimpleQueue())
+        logger = logging.getLogger("test.queueing")
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("failed %s", "here")
+            record = handler.queue.get_nowait()
+        finally:
+            logger.removeHandler(handler)
+
+        assert record.exc_info and record.args == ("here",)
+        listener = QueueListener(handler.queue, output)
+        listener.handle(record)
+        entry = json.loads(stream.getvalue())
+        assert entry["message"] == "failed here"
+        assert "ValueError: boom" in entry["exc"]
+
+    def test_uvicorn_access_lines_are_not_duplicated(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        listener = configure_logging("INFO")
+        try:
+            assert not logging.getLogger("uvicorn.access").propagate
+            assert logging.getLogger("uvicorn.error").propagate
+        finally:
+            listener.stop()
+            root.handlers[:] = handlers
+            root.setLevel(level)
+
+
+class TestSampling:
+    """Info lines sampled per request, warnings always kept"""
+
+    def test_unsampled_request_drops_info_but_keeps_warnings(self):
+        sampler = ContextFilter(sample_rate=0.1)
+        token = request_context.set({"request_id": "abc", "sampled": False})
+        try:
+            assert not sampler.filter(make_record())
+            assert sampler.filter(make_record(level=logging.WARNING))
+            assert sampler.filter(make_record(always=True))
+        finally:
+            request_context.reset(token)
+
+    def test_full_rate_keeps_everything(self):
+        token = request_context.set({"request_id": "abc", "sampled": False})
+        try:
+            assert ContextFilter(sample_rate=1.0).filter(make_record())
+        finally:
+            request_context.reset(token)
+
+
+class TestRequestLogMiddleware:
+    """Request ids and access lines"""
+
+    def test_access_line_and_request_id(self, caplog):
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: str):
+            logging.getLogger("handler").info("inside")
+            return {"id": item_id}
+
+        app.add_middleware(RequestLogMiddleware)
+        with caplog.at_level(logging.INFO):
+            response = TestClient(app).get("/items/1", headers={"X-Request-ID": "req-1"})
+
+        assert response.headers["x-request-id"] == "req-1"
+        access = [record for record in caplog.records if record.name == "access"][0]
+        assert access.status == 200
+        assert access.latency_ms >= 0
+        assert TestClient(app).get("/items/2").headers["x-request-id"]
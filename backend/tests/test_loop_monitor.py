@@ -0,0 +1,66 @@
+"""
+Event loop watchdog unit tests (no running server required)
+"""
+import asyncio
+import time
+
+from loop_monitor import LOOP_LAG, LOOP_STALLS, LoopWatchdog
+
+
+def block_the_loop():
+    time.sleep(0.3)
+
+
+class TestLoopWatchdog:
+    """Lag measurement and stall reports"""
+
+    def test_reports_blocking_call_stack(self, caplog):
+        async def scenario():
+            watchdog = LoopWatchdog(threshold_ms=50, interval=0.01)
+            task = asyncio.create_task(watchdog.run())
+            await asyncio.sleep(0.05)
+            block_the_loop()
+            await asyncio.sleep(0.05)
+            task.cancel()
+            watchdog.stop()
+            return watchdog
+
+        stalls = LOOP_STALLS.family()["samples"]
+        before = stalls[0][1] if stalls else 0
+        asyncio.run(scenario())
+
+        assert LOOP_STALLS.family()["samples"][0][1] == before + 1
+        assert "Event loop blocked" in caplog.text
+        assert "block_the_loop" in caplog.text
+
+    def test_observes_lag(self):
+        async def scenario():
+            watchdog = LoopWatchdog(threshold_ms=1000, interval=0.01)
+            task = asyncio.create_task(watchdog.run())
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)
+            await asyncio.sleep(0.03)
+            task.cancel()
+            watchdog.stop()
+
+        def total_lag():
+            samples = LOOP_LAG.family()["samples"]
+            return samples[0][1][1] if samples else 0.0
+
+        before = total_lag()
+        asyncio.run(scenario())
+        assert total_lag() - before >= 0.08
+
+    def test_restarts_after_stop(self):
+        async def scenario(watchdog):
+            task = asyncio.create_task(watchdog.run())
+            await asyncio.sleep(0.02)
+            alive = watchdog._thread.is_alive()
+            task.cancel()
+            watchdog.stop()
+            return alive
+
+        watchdog = LoopWatchdog(threshold_ms=50, interval=0.01)
+        assert asyncio.run(scenario(watchdog))
+        # A second lifespan in the same process (as in tests) gets a live watch thread again
+        assert asyncio.run(scenario(watchdog))
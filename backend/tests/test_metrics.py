@@ -0,0 +1,157 @@
+"""
+Metrics registry and middleware unit tests (no running server required)
+"""
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import HTTP_LATENCY, HTTP_REQUESTS, MetricsMiddleware, MetricsPublisher, Registry, merge_snapshots, render
+
+
+class TestRegistry:
+    """Counters, gauges and histograms"""
+
+    def test_counter_and_gauge_render(self):
+        registry = Registry()
+        requests = registry.counter("requests_total", "Requests", ("route",))
+        in_flight = registry.gauge("in_flight", "In flight")
+        requests.inc(("/a",))
+        requests.inc(("/a",), 2)
+        in_flight.inc()
+        in_flight.dec()
+
+        text = render(registry.snapshot())
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a"} 3.0' in text
+        assert "in_flight 0.0" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(("/a",), value)
+
+        text = render(registry.snapshot())
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+        assert 'latency_seconds_sum{route="/a"} 5.55' in text
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        registry.counter("errors_total", "Errors", ("reason",)).inc(('bad "quote"\n',))
+        assert 'errors_total{reason="bad \\"quote\\"\\n"} 1.0' in render(registry.snapshot())
+
+    def test_collectors_are_included(self):
+        registry = Registry()
+        registry.add_collector(lambda: [{
+            "name": "cache_hits_total", "type": "counter", "help": "Hits", "labels": ["cache"],
+            "samples": [[["page"], 4]]
+        }])
+        assert 'cache_hits_total{cache="page"} 4.0' in render(registry.snapshot())
+
+
+class TestMerge:
+    """Summing worker snapshots"""
+
+    def test_sums_counters_and_histograms(self):
+        snapshots = []
+        for _ in range(2):
+            registry = Registry()
+            registry.counter("requests_total", "Requests", ("route",)).inc(("/a",))
+            registry.histogram("latency_seconds", "Latency", (), buckets=(1.0,)).observe((), 0.5)
+            snapshots.append(registry.snapshot())
+
+        text = render(merge_snapshots(snapshots))
+        assert 'requests_total{route="/a"} 2.0' in text
+        assert 'latency_seconds_bucket{le="1.0"} 2' in text
+        assert "latency_seconds_sum 1.0" in text
+
+
+class FakeWorkers:
+    """Just enough of a Motor collection for MetricsPublisher"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = {"_id": query["_id"], **doc}
+
+    async def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+
+    async def delete_many(self, query):
+        cutoff = query["updated_at"]["$lte"]
+        for key in [key for key, doc in self.docs.items() if doc["updated_at"] <= cutoff]:
+            del self.docs[key]
+
+    def find(self, query, projection):
+        async def iterate():
+            for doc in list(self.docs.values()):
+                if doc["updated_at"] > query["updated_at"]["$gt"]:
+                    yield dict(doc)
+        return iterate()
+
+
+class TestPublisher:
+    """Series of every worker, labelled per worker"""
+
+    def make_worker(self, workers, worker_id, requests):
+        registry = Registry()
+        registry.counter("requests_total", "Requests", ("route",)).inc(("/a",), requests)
+        publisher = MetricsPublisher(workers, registry)
+        publisher.worker_id = worker_id
+        return publisher
+
+    def test_recycled_worker_does_not_lower_a_series(self):
+        workers = FakeWorkers()
+        first = self.make_worker(workers, "web:1", 5)
+        second = self.make_worker(workers, "web:2", 3)
+
+        async def run():
+            await first.publish()
+            before = await second.collect()
+            # web:1 is recycled and replaced by web:3
+            await first.withdraw()
+            after = await self.make_worker(workers, "web:3", 1).collect()
+            return before, after
+
+        before, after = asyncio.run(run())
+        assert 'requests_total{route="/a",worker="web:1"} 5.0' in before
+        assert 'requests_total{route="/a",worker="web:2"} 3.0' in before
+        # web:1's series ends rather than dropping, and web:2's is untouched
+        assert 'worker="web:1"' not in after
+        assert 'requests_total{route="/a",worker="web:2"} 3.0' in after
+        assert 'requests_total{route="/a",worker="web:3"} 1.0' in after
+
+    def test_local_fallback_uses_the_same_labels(self):
+        publisher = self.make_worker(FakeWorkers(), "web:1", 2)
+        assert 'requests_total{route="/a",worker="web:1"} 2.0' in publisher.local()
+
+
+class TestMiddleware:
+    """Per-route labels"""
+
+    def test_labels_by_route_template(self):
+        app = FastAPI()
+
+        @app.get("/api/items/{item_id}")
+        async def item(item_id: str):
+            return {"id": item_id}
+
+        app.add_middleware(MetricsMiddleware)
+        client = TestClient(app)
+
+        before = dict((tuple(labels), value) for labels, value in HTTP_REQUESTS.family()["samples"])
+        client.get("/api/items/1")
+        client.get("/api/items/2")
+        client.get("/nowhere")
+        after = dict((tuple(labels), value) for labels, value in HTTP_REQUESTS.family()["samples"])
+
+        route = ("GET", "/api/items/{item_id}", "200")
+        assert after[route] - before.get(route, 0) == 2
+        unmatched = ("GET", "unmatched", "404")
+        assert after[unmatched] - before.get(unmatched, 0) == 1
+        assert any(labels == ["GET", "/api/items/{item_id}"] for labels, _ in HTTP_LATENCY.family()["samples"])
@@ -0,0 +1,133 @@
+"""
+Startup migration unit tests (no running server required)
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+
+from migrations import Lease, run_migrations
+
+
+class FakeMeta:
+    """Just enough of a Motor collection for leases and the schema marker"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection=None):
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc else None
+
+    async def find_one_and_update(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is not None:
+            free = any(
+                ("expires_at" in clause and doc["expires_at"] < clause["expires_at"]["$lt"])
+                or ("holder" in clause and doc["holder"] == clause["holder"])
+                for clause in query["$or"]
+            )
+            if not free:
+                raise DuplicateKeyError("E11000 duplicate key")
+        self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+        return doc
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+    async def delete_one(self, query):
+        doc = self.docs.get(query["_id"])
+        if doc and doc.get("holder") == query["holder"]:
+            del self.docs[query["_id"]]
+
+
+def counting_step(calls, name):
+    async def step():
+        calls.append(name)
+    return step
+
+
+class TestLease:
+    """One holder at a time, until expiry"""
+
+    def test_exclusive_until_released_or_expired(self):
+        async def scenario():
+            meta = FakeMeta()
+            first, second = Lease(meta, "lease:x"), Lease(meta, "lease:x")
+            second.holder = "other:1"
+            assert await first.acquire()
+            assert await first.acquire()
+            assert not await second.acquire()
+            meta.docs["lease:x"]["expires_at"] = datetime(2000, 1, 1)
+            assert await second.acquire()
+            await first.release()
+            assert "lease:x" in meta.docs
+        asyncio.run(scenario())
+
+
+class TestRunMigrations:
+    """Version marker and concurrent steps"""
+
+    def test_runs_once_per_version(self):
+        async def scenario():
+            meta, calls = FakeMeta(), []
+            steps = {"a": counting_step(calls, "a"), "b": counting_step(calls, "b")}
+            assert await run_migrations(meta, 1, steps) == "migrated"
+            assert await run_migrations(meta, 1, steps) == "current"
+            assert await run_migrations(meta, 2, steps) == "migrated"
+            return calls, meta
+        calls, meta = asyncio.run(scenario())
+        assert sorted(calls) == ["a", "a", "b", "b"]
+        assert meta.docs["schema"]["version"] == 2
+        assert "lease:migrations" not in meta.docs
+
+    def test_failed_step_keeps_the_old_version(self):
+        async def broken():
+            raise RuntimeError("index build failed")
+
+        async def scenario():
+            meta, calls = FakeMeta(), []
+            meta.docs["schema"] = {"_id": "schema", "version": 1}
+            result = await run_migrations(meta, 2, {"ok": counting_step(calls, "ok"), "broken": broken})
+            return result, meta, calls
+        result, meta, calls = asyncio.run(scenario())
+        assert result == "failed"
+        assert calls == ["ok"]
+        assert meta.docs["schema"]["version"] == 1
+
+    def test_other_workers_keep_serving_during_an_upgrade(self):
+        async def scenario():
+            meta, calls = FakeMeta(), []
+            meta.docs["schema"] = {"_id": "schema", "version": 1}
+            holder = Lease(meta, "lease:migrations")
+            holder.holder = "other:1"
+            await holder.acquire()
+            return await run_migrations(meta, 2, {"a": counting_step(calls, "a")}), calls
+        result, calls = asyncio.run(scenario())
+        assert result == "running"
+        assert calls == []
+
+    def test_lease_is_renewed_while_steps_run(self):
+        async def scenario():
+            meta, expiries = FakeMeta(), []
+
+            async def slow():
+                for _ in range(3):
+                    await asyncio.sleep(0.1)
+                    expiries.append(meta.docs["lease:migrations"]["expires_at"])
+
+            return await run_migrations(meta, 1, {"slow": slow}, lease_ttl=0.15), expiries
+        result, expiries = asyncio.run(scenario())
+        assert result == "migrated"
+        assert expiries[-1] > expiries[0]
+
+    def test_unreachable_database_propagates(self):
+        class Down(FakeMeta):
+            async def find_one(self, query, projection=None):
+                raise ServerSelectionTimeoutError("no servers")
+
+        calls = []
+        with pytest.raises(ServerSelectionTimeoutError):
+            asyncio.run(run_migrations(Down(), 1, {"a": counting_step(calls, "a")}))
+        assert calls == []
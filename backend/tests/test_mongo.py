@@ -0,0 +1,45 @@
+"""
+Mongo client settings unit tests (no running server required)
+"""
+import pytest
+from pydantic import ValidationError
+
+from mongo import MongoSettings
+
+
+class TestMongoSettings:
+    """Validation and client options"""
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("MONGO_URL", "mongodb://db:27017")
+        monkeypatch.setenv("DB_NAME", "site")
+        monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "20")
+        monkeypatch.setenv("MONGO_COMPRESSORS", "zlib")
+        monkeypatch.setenv("MONGO_WRITE_CONCERN", "1")
+        settings = MongoSettings.from_env()
+
+        options = settings.client_options()
+        assert options["maxPoolSize"] == 20
+        assert options["compressors"] == "zlib"
+        assert options["w"] == 1
+        assert options["timeoutMS"] == 10000
+        assert options["appname"] == "ixa-digital-backend"
+
+    def test_requires_url_and_database(self, monkeypatch):
+        monkeypatch.delenv("MONGO_URL", raising=False)
+        monkeypatch.delenv("DB_NAME", raising=False)
+        with pytest.raises(ValidationError):
+            MongoSettings.from_env()
+
+    def test_rejects_bad_values(self):
+        with pytest.raises(ValidationError):
+            MongoSettings(url="mongodb://db", db_name="site", min_pool_size=10, max_pool_size=5)
+        with pytest.raises(ValidationError):
+            MongoSettings(url="mongodb://db", db_name="site", compressors="lz4")
+        with pytest.raises(ValidationError):
+            MongoSettings(url="mongodb://db", db_name="site", read_concern="strong")
+
+    def test_skips_compressors_that_are_not_installed(self, monkeypatch):
+        monkeypatch.setattr("mongo.find_spec", lambda name: name == "zlib")
+        settings = MongoSettings(url="mongodb://db", db_name="site")
+        assert settings.client_options()["compressors"] == "zlib"
@@ -0,0 +1,48 @@
+"""
+Pre-rendered page snapshot tests (no running server required)
+"""
+from prerender import page_path, render_page
+
+SEO = {
+    "site_title": "IXA <Digital>",
+    "site_description": "Growth & results",
+    "keywords": "seo",
+    "og_image": "",
+    "twitter_handle": "@ixa",
+    "google_site_verification": "abc",
+}
+BRANDING = {"company_name": "IXA Digital", "logo_url": "/static/uploads/logo_x.png", "favicon_url": ""}
+CONTENT = {
+    "hero": {"headline": "Grow </script> faster", "subheadline": "Sub", "stats": [{"value": "500+", "label": "Projects"}]},
+    "services": [{"title": "SEO", "description": "Rank", "features": ["Audits"]}],
+    "footer": {"company_description": "Partner", "social_links": {"linkedin": "https://linkedin.com/x", "facebook": "#"}},
+}
+SHELL = (
+    '<!doctype html><html><head><meta name="description" content="placeholder" />'
+    "<title>Placeholder</title></head><body><div id=\"root\"></div><script src=\"/main.js\"></script></body></html>"
+)
+
+
+class TestRenderPage:
+    """HTML snapshots with SEO metadata"""
+
+    def test_page_path(self):
+        assert page_path("homepage") == "/"
+        assert page_path("services") == "/services"
+
+    def test_standalone_document_has_meta_and_content(self):
+        html = render_page("homepage", CONTENT, SEO, BRANDING, "https://ixa.example")
+        assert "<title>IXA &lt;Digital&gt;</title>" in html
+        assert '<link rel="canonical" href="https://ixa.example/" />' in html
+        assert 'content="https://ixa.example/static/uploads/logo_x.png"' in html
+        assert '<meta name="google-site-verification" content="abc" />' in html
+        assert "<h1>Grow &lt;/script&gt; faster</h1>" in html
+        assert "<li>Audits</li>" in html
+        assert "linkedin.com/x" in html and 'href="#"' not in html
+
+    def test_injected_into_frontend_shell(self):
+        html = render_page("homepage", CONTENT, SEO, BRANDING, "https://ixa.example", shell=SHELL)
+        assert "Placeholder" not in html and "placeholder" not in html
+        assert html.count("<title>") == 1
+        assert '<div id="root"><header>' in html
+        assert '<script src="/main.js"></script>' in html
@@ -0,0 +1,55 @@
+"""
+Sampling profiler unit tests (no running server required)
+"""
+import threading
+import time
+
+import pytest
+
+import profiler
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def run_spinner():
+    stop = threading.Event()
+    thread = threading.Thread(target=spin, args=(stop,))
+    thread.start()
+    return stop, thread
+
+
+class TestSampler:
+    """Sampling and output formats"""
+
+    def test_collapsed_stacks_name_the_busy_function(self):
+        stop, thread = run_spinner()
+        try:
+            counts = profiler.sample(0.1, 0.005, [thread.ident])
+        finally:
+            stop.set()
+            thread.join()
+        text = profiler.collapsed(counts)
+        assert "spin (" in text
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in text.strip().splitlines())
+
+    def test_speedscope_shares_frames(self):
+        stack = (("main", "app.py", 1), ("work", "app.py", 10))
+        document = profiler.speedscope({stack: 3, stack[:1]: 1}, 0.01)
+        assert [frame["name"] for frame in document["shared"]["frames"]] == ["main", "work"]
+        assert document["profiles"][0]["samples"] == [[0, 1], [0]]
+        assert document["profiles"][0]["weights"] == [3, 1]
+        assert document["profiles"][0]["endValue"] == 4
+
+    def test_one_profile_at_a_time(self):
+        running = threading.Thread(target=profiler.sample, args=(0.2, 0.01))
+        running.start()
+        time.sleep(0.05)
+        try:
+            with pytest.raises(profiler.ProfilerBusy):
+                profiler.sample(0.01, 0.01)
+        finally:
+            running.join()
+        assert profiler.sample(0.01, 0.01) is not None
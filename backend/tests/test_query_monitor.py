@@ -0,0 +1,71 @@
+"""
+Mongo command monitoring unit tests (no running server required)
+"""
+from types import SimpleNamespace
+
+from query_monitor import QueryMonitor, RequestDBStats, command_shape, current_db_stats
+
+
+def started(request_id, command_name, command):
+    return SimpleNamespace(request_id=request_id, connection_id=("db", 27017), command_name=command_name, command=command)
+
+
+def finished(request_id, micros, reply=None):
+    return SimpleNamespace(request_id=request_id, connection_id=("db", 27017), duration_micros=micros, reply=reply)
+
+
+class TestCommandShape:
+    """Query shapes for the slow log"""
+
+    def test_blanks_values(self):
+        command = {"find": "support_tickets", "filter": {"status": "open", "priority": {"$in": ["high", "low"]}},
+                   "sort": {"created_at": -1}}
+        assert command_shape("find", command) == {
+            "filter": {"status": "?", "priority": {"$in": ["?"]}},
+            "sort": {"created_at": -1}
+        }
+
+    def test_update_statements_and_pipelines(self):
+        update = {"update": "settings", "updates": [{"q": {"_id": 1}, "u": {"$set": {"x": 2}}}]}
+        assert command_shape("update", update) == {"filter": {"_id": "?"}}
+        aggregate = {"aggregate": "support_tickets", "pipeline": [{"$match": {"a": 1}}, {"$project": {"b": 1}}]}
+        assert command_shape("aggregate", aggregate) == {"pipeline": ["$match", "$project"]}
+
+
+class TestQueryMonitor:
+    """Per-request attribution and slow logging"""
+
+    def test_attributes_commands_to_the_current_request(self):
+        monitor = QueryMonitor(slow_ms=100)
+        stats = RequestDBStats("GET", "/api/admin/stats")
+        token = current_db_stats.set(stats)
+        try:
+            monitor.started(started(1, "count", {"count": "support_tickets", "query": {}}))
+            monitor.started(started(2, "find", {"find": "settings", "filter": {}}))
+        finally:
+            current_db_stats.reset(token)
+        monitor.succeeded(finished(1, 2000, {"n": 40, "ok": 1}))
+        monitor.succeeded(finished(2, 3000, {"cursor": {"firstBatch": [{}], "id": 0}, "ok": 1}))
+
+        assert stats.calls == 2
+        assert abs(stats.seconds - 0.005) < 1e-9
+        assert stats.documents == 1
+
+    def test_logs_slow_commands_with_shape(self, caplog):
+        monitor = QueryMonitor(slow_ms=10)
+        monitor.started(started(3, "find", {"find": "page_content", "filter": {"page": "homepage"}}))
+        monitor.succeeded(finished(3, 50_000, {"cursor": {"firstBatch": [], "id": 0}, "ok": 1}))
+        assert "Slow Mongo find on page_content: 50.0ms" in caplog.text
+        assert "{'filter': {'page': '?'}}" in caplog.text
+        assert "homepage" not in caplog.text
+
+    def test_failed_commands_are_counted(self):
+        monitor = QueryMonitor()
+        stats = RequestDBStats()
+        token = current_db_stats.set(stats)
+        try:
+            monitor.started(started(4, "insert", {"insert": "contact_submissions"}))
+        finally:
+            current_db_stats.reset(token)
+        monitor.failed(finished(4, 1000))
+        assert stats.calls == 1
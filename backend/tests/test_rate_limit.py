@@ -0,0 +1,124 @@
+"""
+Rate limiter unit tests (no running server required)
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from rate_limit import MemoryBucketStore, RateLimiter, parse_limit
+
+
+def make_request(host="10.0.0.1", forwarded=None):
+    headers = []
+    if forwarded:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    return Request({"type": "http", "headers": headers, "client": (host, 1234)})
+
+
+class TestMemoryBucketStore:
+    """Token bucket behaviour"""
+
+    def test_burst_then_reject(self):
+        store = MemoryBucketStore()
+        assert store.take("k", 3, 60, now=0) == 0
+        assert store.take("k", 3, 60, now=0) == 0
+        assert store.take("k", 3, 60, now=0) == 0
+        assert store.take("k", 3, 60, now=0) == pytest.approx(20)
+
+    def test_refill_over_time(self):
+        store = MemoryBucketStore()
+        for _ in range(3):
+            store.take("k", 3, 60, now=0)
+        assert store.take("k", 3, 60, now=20) == 0
+        assert store.take("k", 3, 60, now=20) > 0
+
+    def test_evicts_least_recent_keys(self):
+        store = MemoryBucketStore(max_keys=2)
+        store.take("a", 1, 60, now=0)
+        store.take("b", 1, 60, now=0)
+        store.take("a", 1, 60, now=0)
+        store.take("c", 1, 60, now=0)
+        assert len(store) == 2
+        assert store.take("b", 1, 60, now=0) == 0
+
+
+class FakeSharedStore:
+    """Async wrapper over an in-memory store, standing in for MongoBucketStore"""
+
+    def __init__(self):
+        self.store = MemoryBucketStore()
+
+    async def take(self, key, capacity, period):
+        return self.store.take(key, capacity, period)
+
+    async def refund(self, key, capacity):
+        self.store.refund(key, capacity)
+
+
+def attempt(limiter, host, email):
+    try:
+        asyncio.run(limiter.check(make_request(host), "contact", email))
+        return True
+    except HTTPException:
+        return False
+
+
+class TestRateLimiter:
+    """Admission control for request scopes"""
+
+    def test_rejects_with_retry_after(self):
+        limiter = RateLimiter({"contact": {"ip": (2, 60), "email": (5, 60)}})
+        request = make_request()
+        asyncio.run(limiter.check(request, "contact", "a@example.com"))
+        asyncio.run(limiter.check(request, "contact", "b@example.com"))
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(limiter.check(request, "contact", "c@example.com"))
+        assert exc.value.status_code == 429
+        assert int(exc.value.headers["Retry-After"]) >= 1
+        assert limiter.stats()["scopes"]["contact"] == {"allowed": 2, "rejected": 1}
+
+    def test_email_limit_applies_across_ips(self):
+        limiter = RateLimiter({"contact": {"ip": (5, 60), "email": (1, 60)}})
+        asyncio.run(limiter.check(make_request("10.0.0.1"), "contact", "A@example.com"))
+        with pytest.raises(HTTPException):
+            asyncio.run(limiter.check(make_request("10.0.0.2"), "contact", "a@example.com"))
+
+    def test_email_rejection_does_not_charge_the_ip(self):
+        limiter = RateLimiter({"contact": {"ip": (2, 60), "email": (1, 60)}})
+        assert attempt(limiter, "10.0.0.1", "a@example.com")
+        for _ in range(5):
+            assert not attempt(limiter, "10.0.0.1", "a@example.com")
+        # The IP still has its second token
+        assert attempt(limiter, "10.0.0.1", "b@example.com")
+        assert not attempt(limiter, "10.0.0.1", "c@example.com")
+
+    def test_ip_rejection_does_not_charge_the_email(self):
+        limiter = RateLimiter({"contact": {"ip": (1, 60), "email": (2, 60)}})
+        assert attempt(limiter, "10.0.0.1", "a@example.com")
+        for _ in range(5):
+            assert not attempt(limiter, "10.0.0.1", "b@example.com")
+        assert attempt(limiter, "10.0.0.2", "b@example.com")
+        assert attempt(limiter, "10.0.0.3", "b@example.com")
+
+    def test_shared_rejection_refunds_every_bucket(self):
+        shared = FakeSharedStore()
+        limiter = RateLimiter({"contact": {"ip": (2, 60), "email": (1, 60)}}, shared_store=shared)
+        # Another worker used up the shared email bucket
+        shared.store.take("contact:email:a@example.com", 1, 60)
+        assert not attempt(limiter, "10.0.0.1", "a@example.com")
+        assert attempt(limiter, "10.0.0.1", "b@example.com")
+        assert attempt(limiter, "10.0.0.1", "c@example.com")
+        assert not attempt(limiter, "10.0.0.1", "d@example.com")
+
+    def test_trusted_proxy_hops(self):
+        limiter = RateLimiter({}, trusted_proxy_hops=1)
+        request = make_request("10.0.0.1", forwarded="1.2.3.4, 5.6.7.8")
+        assert limiter.client_ip(request) == "5.6.7.8"
+        assert RateLimiter({}).client_ip(request) == "10.0.0.1"
+
+    def test_parse_limit(self):
+        assert parse_limit("10/30", (1, 1)) == (10, 30.0)
+        assert parse_limit("bogus", (1, 1)) == (1, 1)
+        assert parse_limit(None, (3, 60)) == (3, 60)
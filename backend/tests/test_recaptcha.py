@@ -0,0 +1,110 @@
+"""
+reCAPTCHA verifier tests against a local stand-in for the siteverify API
+"""
+import asyncio
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from recaptcha import CircuitBreaker, RecaptchaVerifier
+
+
+def make_standin(healthy=True):
+    """Stand-in verifier: accepts the token "good", or fails with 503 when unhealthy"""
+    calls = []
+
+    async def siteverify(request):
+        form = await request.form()
+        calls.append(form["response"])
+        if not healthy:
+            return JSONResponse({"error": "unavailable"}, status_code=503)
+        return JSONResponse({"success": form["response"] == "good"})
+
+    app = Starlette(routes=[Route("/siteverify", siteverify, methods=["POST"])])
+    return httpx.ASGITransport(app=app), calls
+
+
+def make_verifier(transport, breaker=None):
+    return RecaptchaVerifier(
+        verify_url="http://standin/siteverify",
+        breaker=breaker or CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        transport=transport
+    )
+
+
+class TestRecaptchaVerifier:
+    """Verification against the stand-in"""
+
+    def test_accepts_and_rejects_tokens(self):
+        transport, calls = make_standin()
+        verifier = make_verifier(transport)
+
+        async def run():
+            await verifier.start()
+            try:
+                return await verifier.verify("secret", "good"), await verifier.verify("secret", "bad")
+            finally:
+                await verifier.close()
+
+        assert asyncio.run(run()) == (True, False)
+        assert calls == ["good", "bad"]
+        stats = verifier.stats()
+        assert stats["passed"] == 1 and stats["rejected"] == 1
+        assert stats["circuit_state"] == "closed"
+
+    def test_circuit_opens_and_skips_upstream(self):
+        transport, calls = make_standin(healthy=False)
+        verifier = make_verifier(transport)
+
+        async def run():
+            await verifier.start()
+            try:
+                return [await verifier.verify("secret", "bad") for _ in range(5)]
+            finally:
+                await verifier.close()
+
+        # Fails open, and stops calling upstream once the breaker trips
+        assert asyncio.run(run()) == [True] * 5
+        assert len(calls) == 2
+        stats = verifier.stats()
+        assert stats["errors"] == 2
+        assert stats["skipped_circuit_open"] == 3
+        assert stats["circuit_state"] == "open"
+
+
+class TestCircuitBreaker:
+    """Breaker state transitions"""
+
+    def test_half_open_allows_single_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.state == "half_open"
+        assert breaker.allow() is True
+        assert breaker.allow() is False
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow() is True
+
+    def test_cancelled_probe_frees_half_open_slot(self):
+        async def hang(request):
+            await asyncio.sleep(10)
+
+        app = Starlette(routes=[Route("/siteverify", hang, methods=["POST"])])
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        verifier = make_verifier(httpx.ASGITransport(app=app), breaker)
+
+        async def run():
+            try:
+                await asyncio.wait_for(verifier.verify("secret", "good"), 0.05)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                await verifier.close()
+
+        asyncio.run(run())
+        # A cancelled probe must not leave verification skipped forever
+        assert breaker.state == "half_open"
+        assert breaker.allow() is True
@@ -0,0 +1,183 @@
+"""
+Response cache unit tests (no running server required)
+"""
+import asyncio
+from datetime import datetime
+
+from pymongo.errors import OperationFailure
+from starlette.requests import Request
+
+from response_cache import CacheInvalidator, ResponseCache, cached_json_response
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers})
+
+
+class FakeVersions:
+    """Just enough of a Motor collection for CacheInvalidator"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "version": 0})
+        doc["version"] += update["$inc"]["version"]
+        return dict(doc)
+
+    def find(self, *args):
+        async def iterate():
+            for doc in list(self.docs.values()):
+                yield dict(doc)
+        return iterate()
+
+    def watch(self, **kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", 40573)
+
+
+class FakeChangeStream:
+    """Change events for every version bump, like Motor's change stream with updateLookup"""
+
+    def __init__(self):
+        self.events = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def try_next(self):
+        return None if self.events.empty() else self.events.get_nowait()
+
+    async def next(self):
+        return await self.events.get()
+
+
+class StreamingVersions(FakeVersions):
+    """A replica set: version changes are pushed to open change streams"""
+
+    def __init__(self):
+        super().__init__()
+        self.streams = []
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        doc = await super().find_one_and_update(query, update, **kwargs)
+        for stream in self.streams:
+            stream.events.put_nowait({"documentKey": {"_id": doc["_id"]}, "fullDocument": doc})
+        return doc
+
+    def watch(self, **kwargs):
+        stream = FakeChangeStream()
+        self.streams.append(stream)
+        return stream
+
+
+class TestResponseCache:
+    """Pre-serialized entries"""
+
+    def test_serializes_once_and_counts_hits(self):
+        cache = ResponseCache()
+        entry = cache.put("page:home", {"updated_at": datetime(2026, 1, 2, 3, 4, 5)}, 'W/"v1"')
+        assert entry.body == b'{"updated_at":"2026-01-02T03:04:05"}'
+        assert cache.get("page:home") is entry
+        assert cache.get("page:other") is None
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    def test_put_after_invalidation_is_dropped(self):
+        cache = ResponseCache()
+        generation = cache.generation()
+        cache.invalidate("page:home")
+        cache.put("page:home", {"stale": True}, 'W/"v1"', generation)
+        assert cache.get("page:home") is None
+
+    def test_invalidate_drops_nested_keys(self):
+        cache = ResponseCache()
+        cache.put("page:home", {}, 'W/"a"')
+        cache.put("page:home:current", {}, 'W/"b"')
+        cache.put("page:homepage", {}, 'W/"c"')
+        cache.invalidate("page:home")
+        assert cache.get("page:home:current") is None
+        assert cache.get("page:homepage") is not None
+
+    def test_invalidate_drops_tagged_entries(self):
+        cache = ResponseCache()
+        cache.put("bootstrap:home", {}, tags=("settings", "page:home"))
+        cache.put("bootstrap:about", {}, tags=("settings", "page:about"))
+        cache.invalidate("page:home")
+        assert cache.get("bootstrap:home") is None
+        assert cache.get("bootstrap:about") is not None
+        cache.invalidate("settings")
+        assert cache.get("bootstrap:about") is None
+
+    def test_default_etag_follows_body(self):
+        cache = ResponseCache()
+        first = cache.put("a", {"x": 1})
+        assert first.etag == cache.put("b", {"x": 1}).etag
+        assert first.etag != cache.put("c", {"x": 2}).etag
+        assert first.etag.startswith('W/"')
+
+    def test_not_modified(self):
+        entry = ResponseCache().put("k", {"a": 1}, 'W/"v1"')
+        assert cached_json_response(entry, make_request('"v1"'), "public").status_code == 304
+        response = cached_json_response(entry, make_request('W/"v0"'), "public")
+        assert response.status_code == 200
+        assert response.body == b'{"a":1}'
+        assert response.headers["etag"] == 'W/"v1"'
+
+
+class TestCacheInvalidator:
+    """Cross-worker invalidation"""
+
+    def test_other_worker_publish_invalidates(self):
+        versions = FakeVersions()
+        worker_a, worker_b = ResponseCache(), ResponseCache()
+        sync_a = CacheInvalidator(versions, worker_a)
+        publish_b = CacheInvalidator(versions, worker_b)
+
+        async def run():
+            await sync_a.sync()
+            worker_a.put("page:home", {"old": True}, 'W/"v1"')
+            await publish_b.publish("page:home")
+            assert worker_a.get("page:home") is not None
+            await sync_a.sync()
+
+        asyncio.run(run())
+        assert worker_a.get("page:home") is None
+
+    def test_change_stream_invalidates_without_polling(self):
+        versions = StreamingVersions()
+        worker_a, worker_b = ResponseCache(), ResponseCache()
+        watcher = CacheInvalidator(versions, worker_a, interval=3600)
+        publisher = CacheInvalidator(versions, worker_b)
+
+        async def run():
+            task = asyncio.create_task(watcher.run())
+            await asyncio.sleep(0.01)
+            worker_a.put("page:home", {"old": True}, 'W/"v1"')
+            await publisher.publish("page:home")
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(run())
+        assert watcher.mode == "change_stream"
+        assert worker_a.get("page:home") is None
+
+    def test_falls_back_to_polling_without_replica_set(self):
+        versions = FakeVersions()
+        worker_a, worker_b = ResponseCache(), ResponseCache()
+        watcher = CacheInvalidator(versions, worker_a, interval=0.01)
+        publisher = CacheInvalidator(versions, worker_b)
+
+        async def run():
+            task = asyncio.create_task(watcher.run())
+            await asyncio.sleep(0.02)
+            worker_a.put("page:home", {"old": True}, 'W/"v1"')
+            await publisher.publish("page:home")
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        asyncio.run(run())
+        assert watcher.mode == "polling"
+        assert worker_a.get("page:home") is None
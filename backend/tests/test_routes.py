@@ -0,0 +1,206 @@
+"""
+Route tests against server.app on an in-memory Mongo (mongomock-motor; no running server or database required)
+"""
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "ixa_routes_test")
+
+import server  # noqa: E402
+
+HERO = {"headline": "Draft headline", "subheadline": "Sub", "cta_primary": "Go", "cta_secondary": "More", "stats": []}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """A started app on a fresh in-memory database, with empty caches"""
+    monkeypatch.setattr(server, "create_client", lambda settings, **kwargs: AsyncMongoMockClient())
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+    server.response_cache.clear()
+    with TestClient(server.app) as test_client:
+        response = test_client.post("/api/admin/login", json={"username": "admin", "password": "IXADigital@2026"})
+        test_client.headers["Authorization"] = f"Bearer {response.json()['token']}"
+        yield test_client
+    server.response_cache.clear()
+
+
+def save(client, page, headline, version=None):
+    body = {"page": page, "hero": {**HERO, "headline": headline}}
+    if version is not None:
+        body["version"] = version
+    return client.put("/api/admin/content", json=body)
+
+
+def publish(client, page):
+    response = client.post(f"/api/admin/content/{page}/publish")
+    assert response.status_code == 200
+    return response.json()["version"]
+
+
+class TestPublishing:
+    """Drafts stay private; the public routes serve published snapshots"""
+
+    def test_draft_stays_hidden_until_published(self, client):
+        assert save(client, "services", "Our services").status_code == 200
+
+        assert client.get("/api/page-content/services").json()["success"] is False
+        assert client.get("/api/page-content/services/current").status_code == 404
+        assert client.get("/api/bootstrap", params={"page": "services"}).status_code == 404
+        assert client.get("/api/render/services").status_code == 404
+
+        version = publish(client, "services")
+        content = client.get("/api/page-content/services").json()
+        assert content["version"] == version
+        assert content["content"]["hero"]["headline"] == "Our services"
+        assert client.get("/api/page-content/services/current").json()["version"] == version
+        assert client.get("/api/bootstrap", params={"page": "services"}).status_code == 200
+        assert "Our services" in client.get("/api/render/services").text
+
+    def test_unknown_pages_are_answered_without_db_reads(self, client, monkeypatch):
+        client.get("/api/page-content/homepage/current")
+        collection = type(server.db.page_content)
+        reads = []
+        for name in ("find_one", "find"):
+            original = getattr(collection, name)
+
+            def counted(self, *args, _original=original, **kwargs):
+                reads.append(self.name)
+                return _original(self, *args, **kwargs)
+            monkeypatch.setattr(collection, name, counted)
+
+        for page in ("nope-1", "nope-2", "nope-3"):
+            assert client.get(f"/api/page-content/{page}/current").status_code == 404
+            assert client.get("/api/bootstrap", params={"page": page}).status_code == 404
+            assert client.get(f"/api/render/{page}").status_code == 404
+        assert reads == []
+
+    def test_saving_a_draft_leaves_the_published_page_alone(self, client):
+        save(client, "services", "First")
+        publish(client, "services")
+        save(client, "services", "Second")
+
+        assert client.get("/api/page-content/services").json()["content"]["hero"]["headline"] == "First"
+        assert client.get("/api/admin/content/services").json()["content"]["hero"]["headline"] == "Second"
+
+    def test_rollback_serves_the_earlier_snapshot(self, client):
+        save(client, "services", "First")
+        first = publish(client, "services")
+        save(client, "services", "Second")
+        publish(client, "services")
+
+        response = client.post("/api/admin/content/services/rollback", params={"version": first})
+        assert response.status_code == 200
+        assert client.get("/api/page-content/services/current").json()["version"] == first
+        assert client.get("/api/page-content/services").json()["content"]["hero"]["headline"] == "First"
+        assert client.post("/api/admin/content/services/rollback", params={"version": 99}).status_code == 404
+
+
+class TestSitemap:
+    """Only published pages are listed"""
+
+    def test_unpublished_page_is_left_out(self, client):
+        save(client, "services", "Our services")
+        sitemap = client.get("/api/sitemap.xml").text
+        assert "/services</loc>" not in sitemap
+        assert "<loc>" in sitemap
+
+        publish(client, "services")
+        sitemap = client.get("/api/sitemap.xml").text
+        assert "/services</loc><lastmod>" in sitemap
+
+
+class TestConcurrentEdits:
+    """Optimistic concurrency on draft saves"""
+
+    def test_stale_patch_is_rejected(self, client):
+        version = save(client, "services", "First").json()["version"]
+        operations = [{"op": "replace", "path": "/hero/headline", "value": "Edited"}]
+
+        body = {"page": "services", "version": version, "operations": operations}
+
+        assert client.patch("/api/admin/content", json=body).status_code == 200
+        # Made against the version the first patch replaced
+        assert client.patch("/api/admin/content", json=body).status_code == 409
+
+    def test_stale_put_is_rejected(self, client):
+        version = save(client, "services", "First").json()["version"]
+        assert save(client, "services", "Mine", version=version).status_code == 200
+        assert save(client, "services", "Theirs", version=version).status_code == 409
+
+
+    def test_two_writers_on_a_page_saved_before_versioning(self, client):
+        async def upgrade():
+            await server.db.page_content.insert_one({"page": "legacy", "hero": HERO})
+            # As if the database was last migrated by the release before optimistic concurrency
+            await server.db.schema_meta.update_one({"_id": "schema"}, {"$set": {"version": 2}})
+            return await server.migrate_schema()
+
+        assert client.portal.call(upgrade)
+        # Both editors load the page and see version 1
+        read = client.get("/api/admin/content/legacy").json()["content"]["version"]
+        assert read == 1
+
+        assert save(client, "legacy", "First editor", version=read).status_code == 200
+        assert save(client, "legacy", "Second editor", version=read).status_code == 409
+        operations = [{"op": "replace", "path": "/hero/headline", "value": "Second editor"}]
+        body = {"page": "legacy", "version": read, "operations": operations}
+        assert client.patch("/api/admin/content", json=body).status_code == 409
+        assert client.get("/api/admin/content/legacy").json()["content"]["hero"]["headline"] == "First editor"
+
+
+class TestBootstrap:
+    """One cached first-paint response per page"""
+
+    def test_etag_revalidates_and_changes_after_publish(self, client):
+        response = client.get("/api/bootstrap")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert client.get("/api/bootstrap", headers={"If-None-Match": etag}).status_code == 304
+
+        save(client, "homepage", "New headline")
+        # A draft save does not change what the public sees
+        assert client.get("/api/bootstrap", headers={"If-None-Match": etag}).status_code == 304
+
+        publish(client, "homepage")
+        response = client.get("/api/bootstrap", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["content"]["hero"]["headline"] == "New headline"
+
+    def test_settings_save_invalidates_cached_responses(self, client):
+        assert client.get("/api/seo-config").json()["site_title"].startswith("IXA Digital")
+        etag = client.get("/api/bootstrap").headers["etag"]
+
+        response = client.put("/api/admin/settings", json={"seo_settings": {"site_title": "Renamed"}})
+        assert response.status_code == 200
+        assert client.get("/api/seo-config").json()["site_title"] == "Renamed"
+        response = client.get("/api/bootstrap")
+        assert response.headers["etag"] != etag
+        assert response.json()["seo"]["site_title"] == "Renamed"
+
+
+class TestProbes:
+    """Liveness right away, readiness once warm, not ready while draining"""
+
+    def test_ready_after_warm_up(self, client):
+        assert client.get("/healthz").json() == {"status": "ok"}
+        deadline = time.monotonic() + 5
+        while not server.warmup.warmed and time.monotonic() < deadline:
+            time.sleep(0.05)
+        server.health_checker.reset()
+        response = client.get("/readyz")
+        assert response.json()["checks"]["caches"]["ok"]
+        assert response.json()["checks"]["schema"]["ok"]
+
+        server.set_draining()
+        try:
+            response = client.get("/readyz")
+            assert response.status_code == 503
+            assert response.json()["status"] == "draining"
+        finally:
+            server.set_draining(False)
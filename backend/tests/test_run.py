@@ -0,0 +1,132 @@
+"""
+Launcher unit tests: restart decisions and worker shutdown (no worker processes or sockets required)
+"""
+import asyncio
+import os
+import signal
+
+import pytest
+import uvicorn
+
+from health import is_draining, set_draining
+from run import EXIT_STARTUP_FAILED, DrainingServer, RestartPolicy, serve
+
+
+def make_app(fail_startup=False, on_startup=None):
+    """Minimal ASGI app that only speaks lifespan"""
+    async def app(scope, receive, send):
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            if fail_startup:
+                await send({"type": "lifespan.startup.failed", "message": "no database"})
+                return
+            if on_startup:
+                on_startup()
+            await send({"type": "lifespan.startup.complete"})
+        message = await receive()
+        await send({"type": "lifespan.shutdown.complete"})
+    return app
+
+
+def make_config(app=None):
+    return uvicorn.Config(app or make_app(), loop="asyncio", lifespan="on", log_config=None)
+
+
+class TestRestartPolicy:
+    """Recycle, back off or give up, depending on how a worker exited"""
+
+    def test_clean_exit_is_a_recycle(self):
+        policy = RestartPolicy()
+        for _ in range(3):
+            assert policy.on_exit(0, uptime=1) == (RestartPolicy.RECYCLE, 0)
+        assert policy.failures == 0
+
+    def test_crashes_back_off_up_to_the_max(self):
+        policy = RestartPolicy(backoff_max=10)
+        delays = [policy.on_exit(1, uptime=1) for _ in range(6)]
+        assert delays == [(RestartPolicy.RESTART, delay) for delay in (1, 2, 4, 8, 10, 10)]
+
+    def test_backoff_resets_after_a_stable_run_or_a_recycle(self):
+        policy = RestartPolicy(backoff_reset=60)
+        for _ in range(4):
+            policy.on_exit(-signal.SIGKILL, uptime=1)
+        assert policy.on_exit(-signal.SIGKILL, uptime=120) == (RestartPolicy.RESTART, 1)
+
+        policy.on_exit(1, uptime=1)
+        policy.on_exit(0, uptime=30)
+        assert policy.on_exit(1, uptime=1) == (RestartPolicy.RESTART, 1)
+
+    def test_repeated_startup_failures_abort(self):
+        policy = RestartPolicy(max_startup_failures=3)
+        assert policy.on_exit(EXIT_STARTUP_FAILED, uptime=1) == (RestartPolicy.RESTART, 1)
+        assert policy.on_exit(EXIT_STARTUP_FAILED, uptime=1) == (RestartPolicy.RESTART, 2)
+        assert policy.on_exit(EXIT_STARTUP_FAILED, uptime=1) == (RestartPolicy.ABORT, 0)
+
+    def test_only_consecutive_startup_failures_count(self):
+        policy = RestartPolicy(max_startup_failures=2)
+        policy.on_exit(EXIT_STARTUP_FAILED, uptime=1)
+        # This worker got through startup before it crashed
+        policy.on_exit(1, uptime=1)
+        assert policy.on_exit(EXIT_STARTUP_FAILED, uptime=1)[0] == RestartPolicy.RESTART
+        assert policy.on_exit(EXIT_STARTUP_FAILED, uptime=1)[0] == RestartPolicy.ABORT
+
+    def test_zero_max_startup_failures_keeps_retrying(self):
+        policy = RestartPolicy(backoff_max=4, max_startup_failures=0)
+        actions = {policy.on_exit(EXIT_STARTUP_FAILED, uptime=1) for _ in range(20)}
+        assert actions == {(RestartPolicy.RESTART, 1), (RestartPolicy.RESTART, 2), (RestartPolicy.RESTART, 4)}
+
+
+class TestDrainingServer:
+    """Readiness fails on the first stop signal; the stop itself waits out the drain delay"""
+
+    def teardown_method(self):
+        set_draining(False)
+
+    def test_sigterm_without_delay_stops_right_away(self):
+        server = DrainingServer(make_config())
+        server.handle_exit(signal.SIGTERM, None)
+        assert is_draining()
+        assert server.should_exit
+
+    def test_sigterm_waits_out_the_drain_delay(self):
+        server = DrainingServer(make_config(), drain_delay=0.05)
+
+        async def scenario():
+            server.handle_exit(signal.SIGTERM, None)
+            assert is_draining()
+            assert not server.should_exit
+            # The second SIGTERM (supervisord after the supervisor) does not cut the delay short
+            server.handle_exit(signal.SIGTERM, None)
+            assert not server.should_exit
+            await asyncio.sleep(0.1)
+            assert server.should_exit
+
+        asyncio.run(scenario())
+
+    def test_sigint_during_the_delay_stops_right_away(self):
+        server = DrainingServer(make_config(), drain_delay=60)
+
+        async def scenario():
+            server.handle_exit(signal.SIGTERM, None)
+            server.handle_exit(signal.SIGINT, None)
+            assert server.should_exit
+            server.delayed_exit.cancel()
+
+        asyncio.run(scenario())
+
+
+class TestServe:
+    """Worker exit codes the supervisor acts on"""
+
+    def teardown_method(self):
+        set_draining(False)
+
+    def test_failed_startup_exits_with_startup_failed(self):
+        with pytest.raises(SystemExit) as exit_info:
+            serve(make_config(make_app(fail_startup=True)), [])
+        assert exit_info.value.code == EXIT_STARTUP_FAILED
+
+    def test_sigterm_after_startup_exits_cleanly(self):
+        app = make_app(on_startup=lambda: os.kill(os.getpid(), signal.SIGTERM))
+        serve(make_config(app), [])
+        assert is_draining()
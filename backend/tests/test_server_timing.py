@@ -0,0 +1,49 @@
+"""
+Server-Timing middleware unit tests (no running server required)
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fast_json import FastJSONResponse
+from server_timing import ServerTimingMiddleware, timed
+
+
+def make_client():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/work")
+    async def work():
+        with timed("jwt"):
+            pass
+        with timed("jwt"):
+            pass
+        return {"ok": True}
+
+    app.add_middleware(ServerTimingMiddleware, authorize=lambda token: token == "admin-token")
+    return TestClient(app)
+
+
+class TestServerTiming:
+    """Opt-in per request, admins only"""
+
+    def test_absent_without_the_header(self):
+        response = make_client().get("/work", headers={"Authorization": "Bearer admin-token"})
+        assert "server-timing" not in response.headers
+
+    def test_absent_for_non_admins(self):
+        response = make_client().get("/work", headers={"X-Server-Timing": "1", "Authorization": "Bearer nope"})
+        assert "server-timing" not in response.headers
+
+    def test_reports_phases_for_admins(self):
+        response = make_client().get(
+            "/work", headers={"X-Server-Timing": "1", "Authorization": "Bearer admin-token"}
+        )
+        timing = response.headers["server-timing"]
+        assert 'jwt;dur=' in timing and 'desc="2x"' in timing
+        assert "serialize;dur=" in timing
+        assert "total;dur=" in timing
+
+    def test_timed_is_a_noop_outside_requests(self):
+        with timed("smtp") as block:
+            pass
+        assert block.timings is None
@@ -0,0 +1,39 @@
+"""
+Sitemap builder unit tests (no running server required)
+"""
+from datetime import datetime
+import gzip
+
+from sitemap import build_sitemaps
+
+ENTRIES = [
+    ("https://ixa.example/", datetime(2026, 3, 1, 10, 0, 0)),
+    ("https://ixa.example/services?a=1&b=2", datetime(2026, 4, 2, 8, 30, 0)),
+    ("https://ixa.example/about", None),
+]
+CHUNK_URL = "https://ixa.example/api/sitemaps/sitemap-{}.xml.gz"
+
+
+class TestBuildSitemaps:
+    """Plain urlset for small sites, an index of gzipped chunks for large ones"""
+
+    def test_small_site_gets_plain_urlset(self):
+        root, chunks = build_sitemaps(ENTRIES, CHUNK_URL)
+        assert chunks == []
+        xml = root.decode()
+        assert xml.startswith('<?xml version="1.0" encoding="UTF-8"?>\n<urlset')
+        assert "<loc>https://ixa.example/services?a=1&amp;b=2</loc>" in xml
+        assert "<lastmod>2026-03-01T10:00:00+00:00</lastmod>" in xml
+        assert "<url><loc>https://ixa.example/about</loc></url>" in xml
+
+    def test_large_site_gets_index_and_gzipped_chunks(self):
+        root, chunks = build_sitemaps(ENTRIES, CHUNK_URL, max_urls=2)
+        xml = root.decode()
+        assert "<sitemapindex" in xml
+        assert "<loc>https://ixa.example/api/sitemaps/sitemap-1.xml.gz</loc>" in xml
+        assert "<lastmod>2026-04-02T08:30:00+00:00</lastmod>" in xml
+        # The last chunk has no dated entries
+        assert "<sitemap><loc>https://ixa.example/api/sitemaps/sitemap-2.xml.gz</loc></sitemap>" in xml
+        assert len(chunks) == 2
+        assert gzip.decompress(chunks[0]).decode().count("<url>") == 2
+        assert gzip.decompress(chunks[1]).decode().count("<url>") == 1
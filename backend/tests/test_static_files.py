@@ -0,0 +1,95 @@
+"""
+Static file serving unit tests (no running server required)
+"""
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from static_files import (
+    NegotiatingStaticFiles,
+    RangeNotSatisfiable,
+    parse_range,
+    write_precompressed,
+)
+
+HASHED = "logo_" + "0123456789abcdef" * 2
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / f"{HASHED}.jpg").write_bytes(bytes(range(256)) * 4)
+    (tmp_path / f"{HASHED}.webp").write_bytes(b"W" * 10)
+    (tmp_path / "favicon.svg").write_bytes(b"<svg>" + b"<g/>" * 500 + b"</svg>")
+    write_precompressed([tmp_path / "favicon.svg"])
+
+    app = Starlette()
+    app.mount("/static", NegotiatingStaticFiles(directory=str(tmp_path)))
+    return TestClient(app)
+
+
+class TestParseRange:
+    """Range header parsing"""
+
+    def test_forms(self):
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+
+    def test_ignored_and_unsatisfiable(self):
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("items=0-1", 100) is None
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=100-", 100)
+
+
+class TestNegotiatingStaticFiles:
+    """Caching, negotiation and ranges"""
+
+    def test_content_addressed_files_are_immutable(self, client):
+        response = client.get(f"/static/{HASHED}.jpg", headers={"accept": "*/*"})
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["content-type"] == "image/jpeg"
+        assert "max-age=3600" in client.get("/static/favicon.svg").headers["cache-control"]
+
+    def test_accept_negotiation(self, client):
+        response = client.get(f"/static/{HASHED}.jpg", headers={"accept": "image/webp,*/*"})
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["vary"] == "Accept"
+
+    def test_precompressed_sidecar(self, client):
+        response = client.get("/static/favicon.svg", headers={"accept-encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("image/svg+xml")
+        assert response.content.startswith(b"<svg>")
+        plain = client.get("/static/favicon.svg", headers={"accept-encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+
+    def test_range_request(self, client):
+        response = client.get(f"/static/{HASHED}.jpg", headers={"range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 10-19/1024"
+        assert response.content == bytes(range(10, 20))
+        unsatisfiable = client.get(f"/static/{HASHED}.jpg", headers={"range": "bytes=5000-"})
+        assert unsatisfiable.status_code == 416
+
+    def test_if_none_match(self, client):
+        etag = client.get(f"/static/{HASHED}.jpg").headers["etag"]
+        response = client.get(f"/static/{HASHED}.jpg", headers={"if-none-match": etag})
+        assert response.status_code == 304
+
+    def test_missing_file(self, client):
+        assert client.get("/static/nope.png").status_code == 404
+
+
+class TestWritePrecompressed:
+    """Sidecar generation"""
+
+    def test_skips_incompressible(self, tmp_path):
+        (tmp_path / "tiny.svg").write_bytes(b"<svg/>")
+        (tmp_path / "big.svg").write_bytes(b"<svg>" + b"a" * 2000 + b"</svg>")
+        write_precompressed([tmp_path / "tiny.svg", tmp_path / "big.svg"])
+        assert not (tmp_path / "tiny.svg.gz").exists()
+        assert gzip.decompress((tmp_path / "big.svg.gz").read_bytes()).startswith(b"<svg>")
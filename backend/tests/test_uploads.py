@@ -0,0 +1,149 @@
+"""
+Upload pipeline unit tests (no running server required)
+"""
+import asyncio
+import io
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from uploads import UploadLimitMiddleware, collect_garbage, referenced_uploads, save_upload, sniff_image_type
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n" + b"\x00" * 24
+
+
+def tmp_dir(root):
+    """Separate directory for in-progress .part files, like UPLOAD_TMP_DIR"""
+    path = root / "parts"
+    path.mkdir()
+    return path
+
+
+class TestSniffImageType:
+    """Magic byte detection"""
+
+    def test_known_formats(self):
+        assert sniff_image_type(b"\xff\xd8\xff\xe0rest") == "jpeg"
+        assert sniff_image_type(PNG_HEADER) == "png"
+        assert sniff_image_type(b"GIF89a....") == "gif"
+        assert sniff_image_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+        assert sniff_image_type(b"\x00\x00\x01\x00\x01\x00") == "ico"
+        assert sniff_image_type(b'<?xml version="1.0"?>\n<svg xmlns="...">') == "svg"
+
+    def test_unknown_format(self):
+        assert sniff_image_type(b"<html><script>") is None
+        assert sniff_image_type(b"") is None
+
+
+class TestSaveUpload:
+    """Streaming to disk"""
+
+    def test_saves_with_sniffed_extension(self, tmp_path):
+        upload = UploadFile(io.BytesIO(PNG_HEADER * 10000), filename="logo.jpg")
+        filename = asyncio.run(save_upload(upload, tmp_path, "logo", ["png"], 1024 * 1024, tmp_dir=tmp_dir(tmp_path)))
+        assert filename.startswith("logo_") and filename.endswith(".png")
+        assert [p.name for p in tmp_path.iterdir() if p.is_file()] == [filename]
+        assert list((tmp_path / "parts").iterdir()) == []
+        assert (tmp_path / filename).read_bytes() == PNG_HEADER * 10000
+
+    def test_identical_content_is_deduplicated(self, tmp_path):
+        parts = tmp_dir(tmp_path)
+        first = asyncio.run(save_upload(UploadFile(io.BytesIO(PNG_HEADER)), tmp_path, "logo", ["png"], 1024, parts))
+        second = asyncio.run(save_upload(UploadFile(io.BytesIO(PNG_HEADER)), tmp_path, "logo", ["png"], 1024, parts))
+        assert first == second
+        assert [p.name for p in tmp_path.iterdir() if p.is_file()] == [first]
+        assert list(parts.iterdir()) == []
+
+    def test_rejects_oversized_upload_without_leftovers(self, tmp_path):
+        upload = UploadFile(io.BytesIO(PNG_HEADER + b"\x00" * (2 * 1024 * 1024)), filename="big.png")
+        parts = tmp_dir(tmp_path)
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(save_upload(upload, tmp_path, "logo", ["png"], 1024 * 1024, parts))
+        assert exc.value.status_code == 413
+        assert list(tmp_path.iterdir()) == [parts]
+        assert list(parts.iterdir()) == []
+
+    def test_rejects_disallowed_type(self, tmp_path):
+        upload = UploadFile(io.BytesIO(b"GIF89a" + b"\x00" * 100), filename="x.png")
+        parts = tmp_dir(tmp_path)
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(save_upload(upload, tmp_path, "logo", ["png", "jpeg"], 1024, parts))
+        assert exc.value.status_code == 400
+        assert list(parts.iterdir()) == []
+
+
+class TestUploadLimitMiddleware:
+    """Body caps applied before the multipart parser runs"""
+
+    def make_client(self, max_bytes):
+        app = FastAPI()
+        received = []
+
+        @app.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            received.append(len(await file.read()))
+            return {"ok": True}
+
+        app.add_middleware(UploadLimitMiddleware, limits={"/upload": max_bytes})
+        return TestClient(app), received
+
+    def test_allows_uploads_under_the_cap(self):
+        client, received = self.make_client(1024 * 1024)
+        response = client.post("/upload", files={"file": ("logo.png", PNG_HEADER * 100)})
+        assert response.status_code == 200
+        assert received == [len(PNG_HEADER) * 100]
+
+    def test_rejects_on_content_length_before_parsing(self):
+        client, received = self.make_client(1024 * 1024)
+        response = client.post("/upload", files={"file": ("big.png", b"\x00" * (2 * 1024 * 1024))})
+        assert response.status_code == 413
+        assert response.json()["detail"] == "File size must be less than 1MB"
+        assert received == []
+
+    def test_rejects_chunked_body_past_the_cap(self):
+        client, received = self.make_client(1024 * 1024)
+        boundary = "x" * 16
+        body = (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.png\"\r\n\r\n".encode()
+            + b"\x00" * (2 * 1024 * 1024)
+            + f"\r\n--{boundary}--\r\n".encode()
+        )
+
+        def chunks():
+            for start in range(0, len(body), 64 * 1024):
+                yield body[start:start + 64 * 1024]
+
+        response = client.post(
+            "/upload", content=chunks(), headers={"content-type": f"multipart/form-data; boundary={boundary}"}
+        )
+        assert response.status_code == 413
+        assert received == []
+
+
+class TestUploadGarbageCollection:
+    """Orphaned upload cleanup"""
+
+    def test_referenced_uploads(self):
+        branding = {
+            "logo_url": "/static/uploads/logo_a.jpg",
+            "favicon_url": "https://cdn.example.com/favicon.ico",
+            "logo_srcset": {"webp": "/static/uploads/logo_a_h48.webp 1x, /static/uploads/logo_a_h96.webp 2x"},
+            "favicon_variants": [{"url": "/static/uploads/favicon_b_32.png"}],
+        }
+        assert referenced_uploads(branding) == {
+            "logo_a.jpg", "logo_a_h48.webp", "logo_a_h96.webp", "favicon_b_32.png"
+        }
+
+    def test_keeps_referenced_files_and_derivatives(self, tmp_path):
+        for name in ["logo_a.jpg", "logo_a.webp", "logo_a_h48.avif", "logo_ab.jpg", "favicon_old.png"]:
+            (tmp_path / name).write_bytes(b"x")
+
+        deleted = collect_garbage(tmp_path, {"logo_a.jpg"}, min_age_seconds=0)
+
+        assert sorted(deleted) == ["favicon_old.png", "logo_ab.jpg"]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["logo_a.jpg", "logo_a.webp", "logo_a_h48.avif"]
+
+    def test_keeps_recent_files(self, tmp_path):
+        (tmp_path / "logo_new.jpg").write_bytes(b"x")
+        assert collect_garbage(tmp_path, set(), min_age_seconds=3600) == []
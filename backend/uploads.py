@@ -0,0 +1,199 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import hashlib
+import re
+import time
+import uuid as uuid_lib
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+CHUNK_SIZE = 64 * 1024
+
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+# Length of the content hash used in stored filenames
+HASH_LENGTH = 32
+
+UPLOAD_URL_PATTERN = re.compile(r"/static/uploads/([^\s,\"']+)")
+
+# File extension stored for each detected image type
+IMAGE_EXTENSIONS: Dict[str, str] = {
+    "jpeg": "jpg",
+    "png": "png",
+    "gif": "gif",
+    "webp": "webp",
+    "ico": "ico",
+    "svg": "svg",
+}
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Detect the image format from its leading bytes"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[:4] == b"\x00\x00\x01\x00":
+        return "ico"
+
+    text = head[:1024].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith((b"<?xml", b"<svg", b"<!--", b"<!doctype svg")) and b"<svg" in head.lower():
+        return "svg"
+    return None
+
+
+def too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File size must be less than {max_bytes // (1024 * 1024)}MB")
+
+
+class UploadLimitMiddleware:
+    """Cap upload request bodies per path before the multipart parser spools them to disk"""
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        error = too_large(max_bytes)
+        limit = max_bytes + MULTIPART_OVERHEAD
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > limit:
+            # Refused from the headers alone; the body is never read
+            response = JSONResponse({"detail": error.detail}, status_code=413, headers={"connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            # Chunked or understated bodies are cut off once they pass the cap
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise error
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _discard(path: Path):
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload(
+    file: UploadFile,
+    upload_dir: Path,
+    prefix: str,
+    allowed_types: Iterable[str],
+    max_bytes: int,
+    tmp_dir: Path
+) -> str:
+    """Stream an uploaded image to a temp file, then atomically move it into upload_dir
+
+    tmp_dir must not be publicly served and must be on upload_dir's filesystem, so the final move is a rename.
+    """
+    tmp_path = tmp_dir / f"{prefix}_{uuid_lib.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    image_type = None
+    size = 0
+
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                # Trust the magic bytes, not the client's content type
+                if image_type is None:
+                    image_type = sniff_image_type(chunk)
+                    if image_type not in allowed_types:
+                        supported = ", ".join(t.upper() for t in allowed_types)
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Invalid file type. Supported: {supported}"
+                        )
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise too_large(max_bytes)
+                digest.update(chunk)
+                await out.write(chunk)
+
+        if image_type is None:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+        # Named by content hash: identical uploads share a file and names never change content
+        filename = f"{prefix}_{digest.hexdigest()[:HASH_LENGTH]}.{IMAGE_EXTENSIONS[image_type]}"
+        if await aiofiles.os.path.exists(upload_dir / filename):
+            await _discard(tmp_path)
+        else:
+            # Same-filesystem rename, so a partial upload is never visible
+            await aiofiles.os.replace(tmp_path, upload_dir / filename)
+        return filename
+    except BaseException:
+        await _discard(tmp_path)
+        raise
+
+
+def referenced_uploads(branding: dict) -> Set[str]:
+    """Filenames under /static/uploads referenced anywhere in the branding settings"""
+    found: Set[str] = set()
+
+    def walk(value):
+        if isinstance(value, str):
+            found.update(UPLOAD_URL_PATTERN.findall(value))
+        elif isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(branding or {})
+    return found
+
+
+def collect_garbage(upload_dir: Path, referenced: Set[str], min_age_seconds: float) -> List[str]:
+    """Delete uploads no longer referenced by branding (blocking, run in a thread)"""
+    # Derivatives share their source's stem (logo_<hash>_h48.webp, logo_<hash>.avif)
+    keep_stems = {Path(name).stem for name in referenced}
+    cutoff = time.time() - min_age_seconds
+    deleted = []
+
+    for path in upload_dir.iterdir():
+        if not path.is_file() or path.name in referenced:
+            continue
+        stem = path.name.lstrip(".").split(".", 1)[0]
+        if any(stem == keep or stem.startswith(f"{keep}_") for keep in keep_stems):
+            continue
+        # Leave recent files alone in case their settings update is still in flight
+        if path.stat().st_mtime > cutoff:
+            continue
+        try:
+            path.unlink()
+            deleted.append(path.name)
+        except FileNotFoundError:
+            pass
+
+    return deleted
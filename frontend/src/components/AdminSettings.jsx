@@ -65,8 +65,9 @@ const AdminSettings = () => {
         headers: { Authorization: `Bearer ${token}` }
       });
 
+      // Secrets are never returned; their inputs stay blank unless the admin types a new one
       if (response.data.settings.email_settings) {
-        setEmailSettings(response.data.settings.email_settings);
+        setEmailSettings(prev => ({ ...prev, ...response.data.settings.email_settings, smtp_password: '' }));
       }
       if (response.data.settings.seo_settings) {
         setSeoSettings(response.data.settings.seo_settings);
@@ -75,7 +76,7 @@ const AdminSettings = () => {
         setBranding(response.data.settings.branding);
       }
       if (response.data.settings.recaptcha_settings) {
-        setRecaptchaSettings(response.data.settings.recaptcha_settings);
+        setRecaptchaSettings(prev => ({ ...prev, ...response.data.settings.recaptcha_settings, secret_key: '' }));
       }
     } catch (error) {
       if (error.response?.status === 401) {
@@ -435,7 +436,7 @@ const AdminSettings = () => {
                   type="password"
                   value={emailSettings.smtp_password}
                   onChange={(e) => handleEmailChange('smtp_password', e.target.value)}
-                  placeholder="16-character app password"
+                  placeholder={emailSettings.smtp_password_set ? 'Saved (leave blank to keep)' : '16-character app password'}
                 />
                 <p className="text-xs text-gray-500 mt-1">
                   For Gmail: Go to Google Account → Security → App passwords
@@ -622,7 +623,7 @@ const AdminSettings = () => {
                   type="password"
                   value={recaptchaSettings.secret_key}
                   onChange={(e) => setRecaptchaSettings({ ...recaptchaSettings, secret_key: e.target.value })}
-                  placeholder="6Lc..."
+                  placeholder={recaptchaSettings.secret_key_set ? 'Saved (leave blank to keep)' : '6Lc...'}
                   className="mt-1"
                 />
                 <p className="text-xs text-gray-500 mt-1">
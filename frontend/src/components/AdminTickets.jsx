@@ -238,7 +238,7 @@ const AdminTickets = () => {
                           {ticket.status.replace('_', ' ')}
                         </Badge>
                         <span className="text-xs text-gray-500">
-                          {ticket.replies?.length || 0} replies
+                          {ticket.reply_count || 0} replies
                         </span>
                       </div>
                     </div>
@@ -7,8 +7,9 @@ import { Label } from './ui/label';
 import { Textarea } from './ui/textarea';
 import { toast } from 'sonner';
 import axios from 'axios';
-import { Save, Plus, Trash2, ArrowLeft, Edit } from 'lucide-react';
+import { Save, Plus, Trash2, ArrowLeft, Edit, Upload } from 'lucide-react';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from './ui/tabs';
+import { diffContent } from '../lib/contentPatch';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -16,7 +17,10 @@ const ContentEditor = () => {
   const navigate = useNavigate();
   const [isLoading, setIsLoading] = useState(true);
   const [isSaving, setIsSaving] = useState(false);
+  const [isPublishing, setIsPublishing] = useState(false);
   const [content, setContent] = useState(null);
+  // Last content known to be on the server; saves send only the difference
+  const [savedContent, setSavedContent] = useState(null);
 
   useEffect(() => {
     const token = localStorage.getItem('adminToken');
@@ -36,6 +40,7 @@ const ContentEditor = () => {
 
       if (response.data.content) {
         setContent(response.data.content);
+        setSavedContent(response.data.content);
       } else {
         // Initialize with default structure
         setContent({
@@ -88,20 +93,64 @@ const ContentEditor = () => {
     }
   };
 
+  // Returns false if the draft could not be saved
+  const saveDraft = async () => {
+    const token = localStorage.getItem('adminToken');
+    const headers = { Authorization: `Bearer ${token}` };
+    try {
+      let response;
+      if (savedContent) {
+        const operations = diffContent(savedContent, content);
+        if (operations.length === 0) return true;
+        response = await axios.patch(
+          `${BACKEND_URL}/api/admin/content`,
+          { page: content.page, version: savedContent.version || 1, operations },
+          { headers }
+        );
+      } else {
+        response = await axios.put(`${BACKEND_URL}/api/admin/content`, content, { headers });
+      }
+      const saved = { ...content, version: response.data.version };
+      setContent(saved);
+      setSavedContent(saved);
+      return true;
+    } catch (error) {
+      if (error.response?.status === 409) {
+        toast.error('Someone else changed this page. Reload to get their changes.');
+      } else {
+        toast.error('Failed to save content');
+      }
+      return false;
+    }
+  };
+
   const handleSave = async () => {
     setIsSaving(true);
     try {
+      if (await saveDraft()) {
+        toast.success('Draft saved. Publish to make it live.');
+      }
+    } finally {
+      setIsSaving(false);
+    }
+  };
+
+  const handlePublish = async () => {
+    setIsPublishing(true);
+    try {
+      // Save the draft first so what is published matches the editor
+      if (!(await saveDraft())) return;
       const token = localStorage.getItem('adminToken');
-      await axios.put(
-        `${BACKEND_URL}/api/admin/content`,
-        content,
+      const response = await axios.post(
+        `${BACKEND_URL}/api/admin/content/${content.page || 'homepage'}/publish`,
+        {},
         { headers: { Authorization: `Bearer ${token}` } }
       );
-      toast.success('Content saved successfully!');
+      toast.success(`Published version ${response.data.version}`);
     } catch (error) {
-      toast.error('Failed to save content');
+      toast.error('Failed to publish content');
     } finally {
-      setIsSaving(false);
+      setIsPublishing(false);
     }
   };
 
@@ -205,7 +254,11 @@ const ContentEditor = () => {
             </Button>
             <Button onClick={handleSave} disabled={isSaving} className="bg-red-600 hover:bg-red-700">
               <Save size={16} className="mr-2" />
-              {isSaving ? 'Saving...' : 'Save Changes'}
+              {isSaving ? 'Saving...' : 'Save Draft'}
+            </Button>
+            <Button onClick={handlePublish} disabled={isSaving || isPublishing} className="bg-green-600 hover:bg-green-700">
+              <Upload size={16} className="mr-2" />
+              {isPublishing ? 'Publishing...' : 'Publish'}
             </Button>
           </div>
         </div>
@@ -483,6 +536,10 @@ const ContentEditor = () => {
             <Save size={20} className="mr-2" />
             {isSaving ? 'Saving All Changes...' : 'Save All Changes'}
           </Button>
+          <Button onClick={handlePublish} disabled={isSaving || isPublishing} className="bg-green-600 hover:bg-green-700 px-12 py-6 text-lg ml-4">
+            <Upload size={20} className="mr-2" />
+            {isPublishing ? 'Publishing...' : 'Publish'}
+          </Button>
         </div>
       </div>
     </div>
@@ -18,11 +18,16 @@ const Footer = ({ onCTAClick, onTicketClick }) => {
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-8 mb-8">
           {/* Company Info */}
           <div>
-            <img
-              src={branding.logo_url}
-              alt={branding.company_name}
-              className="h-12 w-auto mb-4 bg-white p-2 rounded"
-            />
+            <picture>
+              {branding.logo_srcset?.avif && <source type="image/avif" srcSet={branding.logo_srcset.avif} />}
+              {branding.logo_srcset?.webp && <source type="image/webp" srcSet={branding.logo_srcset.webp} />}
+              <img
+                src={branding.logo_url}
+                srcSet={branding.logo_srcset?.jpeg || branding.logo_srcset?.png}
+                alt={branding.company_name}
+                className="h-12 w-auto mb-4 bg-white p-2 rounded"
+              />
+            </picture>
             <p className="text-gray-400 mb-4 leading-relaxed">
               Results-driven digital growth partner delivering SEO, marketing, web & app development solutions.
             </p>
@@ -34,11 +34,16 @@ const Header = ({ onCTAClick }) => {
         <div className="flex justify-between items-center h-20">
           {/* Logo */}
           <div className="flex-shrink-0">
-            <img
-              src={branding.logo_url}
-              alt={branding.company_name}
-              className="h-12 w-auto"
-            />
+            <picture>
+              {branding.logo_srcset?.avif && <source type="image/avif" srcSet={branding.logo_srcset.avif} />}
+              {branding.logo_srcset?.webp && <source type="image/webp" srcSet={branding.logo_srcset.webp} />}
+              <img
+                src={branding.logo_url}
+                srcSet={branding.logo_srcset?.jpeg || branding.logo_srcset?.png}
+                alt={branding.company_name}
+                className="h-12 w-auto"
+              />
+            </picture>
           </div>
 
           {/* Desktop Navigation */}
@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback } from 'react';
-import axios from 'axios';
+import { fetchBootstrap } from '../lib/bootstrap';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -8,6 +8,15 @@ let brandingCache = null;
 let cacheTimestamp = null;
 const CACHE_DURATION = 5 * 60 * 1000; // 5 minutes
 
+const toAbsoluteUrl = (url) => (url.startsWith('http') ? url : `${BACKEND_URL}${url}`);
+
+// Prefix every URL in a "url 1x, url 2x" srcset string
+const toAbsoluteSrcset = (srcset) =>
+  srcset
+    .split(', ')
+    .map((entry) => toAbsoluteUrl(entry))
+    .join(', ');
+
 export const useBranding = () => {
   const [branding, setBranding] = useState({
     logo_url: 'https://customer-assets.emergentagent.com/job_a08c0b50-0e68-4792-b6a6-4a15ac002d5c/artifacts/3mcpq5px_Logo.jpeg',
@@ -26,9 +35,9 @@ export const useBranding = () => {
     }
 
     try {
-      const response = await axios.get(`${BACKEND_URL}/api/branding`);
-      if (response.data.success && response.data.branding) {
-        const brandingData = { ...response.data.branding };
+      const data = await fetchBootstrap();
+      if (data.success && data.branding) {
+        const brandingData = { ...data.branding };
         
         // Convert relative URLs to absolute URLs
         if (brandingData.logo_url) {
@@ -37,12 +46,23 @@ export const useBranding = () => {
           }
         }
         
+        // Resized WebP/AVIF logo variants, generated after upload
+        if (brandingData.logo_srcset) {
+          brandingData.logo_srcset = Object.fromEntries(
+            Object.entries(brandingData.logo_srcset).map(([format, srcset]) => [format, toAbsoluteSrcset(srcset)])
+          );
+        }
+        
         if (brandingData.favicon_url) {
           if (!brandingData.favicon_url.startsWith('http')) {
             brandingData.favicon_url = `${BACKEND_URL}${brandingData.favicon_url}`;
           }
+          const variants = (brandingData.favicon_variants || []).map((variant) => ({
+            ...variant,
+            url: toAbsoluteUrl(variant.url)
+          }));
           // Update favicon in document head
-          updateFavicon(brandingData.favicon_url);
+          updateFavicon(brandingData.favicon_url, variants);
         }
         
         // Update cache
@@ -67,12 +87,25 @@ export const useBranding = () => {
     fetchBranding();
   }, [fetchBranding]);
 
-  const updateFavicon = (url) => {
+  const updateFavicon = (url, variants = []) => {
     try {
       // Remove all existing favicon links
       const existingLinks = document.querySelectorAll('link[rel*="icon"]');
       existingLinks.forEach(link => link.remove());
 
+      // Prefer the generated multi-size ICO and PNG icons when available
+      if (variants.length > 0) {
+        variants.forEach((variant) => {
+          const link = document.createElement('link');
+          link.rel = variant.sizes === '180x180' ? 'apple-touch-icon' : 'icon';
+          link.type = variant.type;
+          link.sizes = variant.sizes;
+          link.href = variant.url;
+          document.head.appendChild(link);
+        });
+        return;
+      }
+
       // Determine favicon type based on URL
       let type = 'image/x-icon';
       if (url.endsWith('.png')) {
@@ -0,0 +1,25 @@
+import { useState, useEffect } from 'react';
+import { fetchPageContent } from '../lib/pageContent';
+
+// Published content of a page, or null until it arrives (components keep their built-in copy meanwhile)
+export const usePageContent = (page = 'homepage') => {
+  const [content, setContent] = useState(null);
+
+  useEffect(() => {
+    let active = true;
+    fetchPageContent(page)
+      .then((data) => {
+        if (active) {
+          setContent(data);
+        }
+      })
+      .catch((error) => {
+        console.error('Failed to fetch page content:', error);
+      });
+    return () => {
+      active = false;
+    };
+  }, [page]);
+
+  return content;
+};
@@ -1,7 +1,5 @@
 import { useState, useEffect } from 'react';
-import axios from 'axios';
-
-const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+import { fetchBootstrap } from '../lib/bootstrap';
 
 // Cache for reCAPTCHA config
 let recaptchaConfigCache = null;
@@ -26,11 +24,11 @@ export const useRecaptcha = () => {
       }
 
       try {
-        const response = await axios.get(`${BACKEND_URL}/api/recaptcha-config`);
-        if (response.data.success) {
+        const data = await fetchBootstrap();
+        if (data.success && data.recaptcha) {
           const configData = {
-            enabled: response.data.enabled,
-            site_key: response.data.site_key
+            enabled: data.recaptcha.enabled,
+            site_key: data.recaptcha.site_key
           };
           
           // Update cache
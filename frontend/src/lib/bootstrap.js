@@ -0,0 +1,31 @@
+import axios from 'axios';
+import { rememberSnapshot } from './pageContent';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const CACHE_DURATION = 5 * 60 * 1000; // 5 minutes
+
+// Branding, SEO, reCAPTCHA config and page content arrive in one request,
+// shared by every hook that asks for them
+const requests = {};
+
+export const fetchBootstrap = (page = 'homepage') => {
+  const now = Date.now();
+  const cached = requests[page];
+  if (cached && now - cached.timestamp < CACHE_DURATION) {
+    return cached.promise;
+  }
+
+  const promise = axios
+    .get(`${BACKEND_URL}/api/bootstrap`, { params: { page } })
+    .then((response) => {
+      // The embedded page content is the published snapshot at content_url
+      rememberSnapshot(response.data.content_url, response.data.content);
+      return response.data;
+    })
+    .catch((error) => {
+      delete requests[page];
+      throw error;
+    });
+  requests[page] = { promise, timestamp: now };
+  return promise;
+};
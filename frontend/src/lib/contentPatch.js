@@ -0,0 +1,71 @@
+// Sections of page content the editor may change (mirrors EDITABLE_CONTENT_FIELDS on the backend)
+const EDITABLE_SECTIONS = [
+  'hero', 'about', 'services', 'menu_items', 'process_steps', 'industries', 'footer', 'cta_section'
+];
+
+const escapeKey = (key) => String(key).replace(/~/g, '~0').replace(/\//g, '~1');
+
+const isEqual = (a, b) => JSON.stringify(a) === JSON.stringify(b);
+
+const isObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+const diffValue = (before, after, path, operations) => {
+  if (isEqual(before, after)) return;
+
+  if (isObject(before) && isObject(after)) {
+    Object.keys(after).forEach((key) => {
+      const childPath = `${path}/${escapeKey(key)}`;
+      if (key in before) {
+        diffValue(before[key], after[key], childPath, operations);
+      } else {
+        operations.push({ op: 'add', path: childPath, value: after[key] });
+      }
+    });
+    Object.keys(before)
+      .filter((key) => !(key in after))
+      .forEach((key) => operations.push({ op: 'remove', path: `${path}/${escapeKey(key)}` }));
+    return;
+  }
+
+  if (Array.isArray(before) && Array.isArray(after)) {
+    if (before.length === after.length) {
+      after.forEach((item, index) => diffValue(before[index], item, `${path}/${index}`, operations));
+      return;
+    }
+    // Items appended at the end
+    if (after.length > before.length && isEqual(before, after.slice(0, before.length))) {
+      after.slice(before.length).forEach((item) => operations.push({ op: 'add', path: `${path}/-`, value: item }));
+      return;
+    }
+    // A single item removed
+    if (after.length === before.length - 1) {
+      const index = after.findIndex((item, i) => !isEqual(item, before[i]));
+      const removedAt = index === -1 ? after.length : index;
+      if (isEqual(after.slice(removedAt), before.slice(removedAt + 1))) {
+        operations.push({ op: 'remove', path: `${path}/${removedAt}` });
+        return;
+      }
+    }
+  }
+
+  operations.push({ op: 'replace', path, value: after });
+};
+
+// JSON-Patch operations that turn the saved content into the edited content
+export const diffContent = (saved, edited) => {
+  const operations = [];
+  EDITABLE_SECTIONS.forEach((section) => {
+    const before = saved[section];
+    const after = edited[section];
+    if (after === undefined || after === null) {
+      if (before !== undefined && before !== null) {
+        operations.push({ op: 'remove', path: `/${section}` });
+      }
+    } else if (before === undefined || before === null) {
+      operations.push({ op: 'add', path: `/${section}`, value: after });
+    } else {
+      diffValue(before, after, `/${section}`, operations);
+    }
+  });
+  return operations;
+};
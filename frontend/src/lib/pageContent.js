@@ -0,0 +1,33 @@
+import axios from 'axios';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+
+// Published snapshots never change: each version is fetched once per session,
+// and the browser keeps /v/{version} responses (Cache-Control: immutable) across visits
+const snapshots = {};
+
+const fetchSnapshot = (url) => {
+  if (!snapshots[url]) {
+    snapshots[url] = axios
+      .get(`${BACKEND_URL}${url}`)
+      .then((response) => response.data.content)
+      .catch((error) => {
+        delete snapshots[url];
+        throw error;
+      });
+  }
+  return snapshots[url];
+};
+
+// Seed from a response that already carried a snapshot (e.g. /api/bootstrap)
+export const rememberSnapshot = (url, content) => {
+  if (url && content && !snapshots[url]) {
+    snapshots[url] = Promise.resolve(content);
+  }
+};
+
+// The /current pointer is tiny and always revalidated, so a publish shows up on the next load
+export const fetchPageContent = async (page = 'homepage') => {
+  const response = await axios.get(`${BACKEND_URL}/api/page-content/${page}/current`);
+  return fetchSnapshot(response.data.url);
+};
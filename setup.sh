@@ -200,6 +200,9 @@ JWT_SECRET_KEY=$JWT_SECRET
 # URLs
 FRONTEND_URL=https://$DOMAIN
 
+# Built frontend shell that pre-rendered pages are injected into
+FRONTEND_INDEX_HTML=$APP_DIR/frontend/build/index.html
+
 # Optional - Configure these in admin panel later
 SMTP_HOST=smtp.gmail.com
 SMTP_PORT=587
@@ -317,6 +320,32 @@ server {
         add_header Cache-Control "public, immutable";
     }
 
+    # Page URLs get the backend's pre-rendered snapshot (SEO tags and content for crawlers and first paint,
+    # injected into the built index.html); anything the backend does not know falls back to the SPA shell
+    location = / {
+        proxy_pass http://backend_api/api/render/homepage;
+        proxy_set_header Host $host;
+        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto $scheme;
+        proxy_intercept_errors on;
+        error_page 404 500 502 503 504 = @spa;
+    }
+
+    location ~ ^/([a-z0-9_-]+)/?$ {
+        proxy_pass http://backend_api/api/render/$1;
+        proxy_set_header Host $host;
+        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto $scheme;
+        proxy_intercept_errors on;
+        error_page 404 500 502 503 504 = @spa;
+    }
+
+    location @spa {
+        try_files /index.html =404;
+        expires -1;
+        add_header Cache-Control "no-store, no-cache, must-revalidate, proxy-revalidate, max-age=0";
+    }
+
     # React app (SPA routing)
     location / {
         try_files $uri $uri/ /index.html;
@@ -357,14 +386,18 @@ cat > /etc/supervisor/conf.d/ixadigital.conf << EOF
 programs=ixadigital_backend
 
 [program:ixadigital_backend]
-command=$APP_DIR/backend/venv/bin/uvicorn server:app --host 0.0.0.0 --port 8001 --workers 2
+command=$APP_DIR/backend/venv/bin/python run.py
 directory=$APP_DIR/backend
 user=www-data
 autostart=true
 autorestart=true
+stopsignal=TERM
+stopwaitsecs=40
+stopasgroup=true
+killasgroup=true
 stderr_logfile=/var/log/supervisor/ixadigital_backend.err.log
 stdout_logfile=/var/log/supervisor/ixadigital_backend.out.log
-environment=PATH="$APP_DIR/backend/venv/bin"
+environment=PATH="$APP_DIR/backend/venv/bin",PORT="8001"
 EOF
 
 # Update supervisor